@@ -0,0 +1,110 @@
+"""
+End-to-end crawl throughput against the local stand-in site
+
+Usage: python scripts/benchmarks/bench_crawl.py [runs=v6,v6-async,non-drive] [shows=10] [per_page=4]
+                                                [seasons=2] [episodes=8] [latency=0.05] [bandwidth=0]
+                                                [error_rate=0] [reset_rate=0] [rate=200] [parse_workers=0]
+
+Starts standin.py in-process and crawls all three of its categories
+with each extractor:
+
+    v6          WorthCreteExtractor.extract_all_categories (sequential)
+    v6-async    WorthCreteExtractor.extract_all_categories_async
+    non-drive   NonDriveVideoExtractor.extract_category per category
+
+Each run gets a fresh session, so no page, cache, breaker or limiter
+state carries over, and runs in its own temporary directory for the
+history, checkpoint and inventory files. The session's per-host limiter
+starts at `rate` requests per second (rate=0 keeps the production
+pacing, which starts at 0.5/s). parse_workers=0 means one per core.
+
+Reports episode pages fetched per second, episodes extracted and where
+the time went (see crawler/metrics.py).
+"""
+
+import contextlib
+import importlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crawler import BreakerRegistry, CrawlMetrics, CrawlSession, RateLimiterRegistry
+from standin import StandInSite, parse_options
+from universalv6 import WorthCreteExtractor
+
+NonDriveVideoExtractor = importlib.import_module('extract-non-drive-videos').NonDriveVideoExtractor
+
+RUNS = ('v6', 'v6-async', 'non-drive')
+
+
+def count_episodes(results):
+    """Episodes in {category: {show: {season: [episodes]}}}"""
+    return sum(len(episodes) for shows in results.values() for seasons in shows.values()
+               for episodes in seasons.values())
+
+
+def crawl(run, site, rate, parse_workers):
+    """Run one extractor over the whole site and return (extracted episodes, metrics)"""
+    limiters = RateLimiterRegistry(rate=rate, max_rate=max(rate, 50.0), burst=max(4, int(rate))) if rate \
+        else RateLimiterRegistry()
+    metrics = CrawlMetrics()
+    session = CrawlSession(limiters=limiters, breakers=BreakerRegistry(), metrics=metrics)
+    categories = site.category_urls()
+    if run == 'non-drive':
+        extractor = NonDriveVideoExtractor(site.base, session=session)
+        results = {name: extractor.extract_category(url) for name, url in categories.items()}
+    else:
+        extractor = WorthCreteExtractor(site.base + '/', session=session)
+        if run == 'v6-async':
+            results = extractor.extract_all_categories_async(categories, force=True,
+                                                             parse_workers=parse_workers or None)
+        else:
+            results = extractor.extract_all_categories(categories, force=True)
+    return count_episodes(results), metrics
+
+
+def main():
+    options = parse_options(sys.argv[1:], {'runs': ','.join(RUNS), 'shows': 10, 'per_page': 4, 'seasons': 2,
+                                           'episodes': 8, 'latency': 0.05, 'bandwidth': 0.0, 'error_rate': 0.0,
+                                           'reset_rate': 0.0, 'rate': 200.0, 'parse_workers': 0})
+    runs = options.pop('runs').split(',')
+    rate = options.pop('rate')
+    parse_workers = options.pop('parse_workers')
+    for run in runs:
+        if run not in RUNS:
+            raise SystemExit(f"Unknown run {run!r}; expected one of {', '.join(RUNS)}")
+
+    os.environ['CRAWL_CACHE'] = 'off'
+    site = StandInSite(**options)
+    server = site.start()
+    print(f"🌐 {site.base}: {site.episode_count} episodes, {options['latency']}s latency, "
+          f"{options['bandwidth'] or 'unlimited'} B/s, {options['error_rate']:.0%} errors, "
+          f"{options['reset_rate']:.0%} resets")
+    print(f"{'run':<12}{'seconds':>9}{'episodes/s':>12}{'pages':>8}{'extracted':>11}")
+
+    cwd = os.getcwd()
+    for run in runs:
+        site.requests.clear()
+        with tempfile.TemporaryDirectory() as workdir:
+            os.chdir(workdir)
+            try:
+                started = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    extracted, metrics = crawl(run, site, rate, parse_workers)
+                seconds = time.perf_counter() - started
+            finally:
+                os.chdir(cwd)
+        fetched = site.requests['episode']
+        requests = sum(n for kind, n in site.requests.items() if kind not in ('error', 'reset'))
+        print(f"{run:<12}{seconds:>9.2f}{fetched / seconds:>12.1f}{requests:>8}{extracted:>11}")
+        print(f"{'':<12}{metrics.summary()}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Drive ID lookup time per page: sequential regexes vs the prefiltered matcher
+
+Usage: python scripts/benchmarks/bench_drive_id.py [saved_page.html ...]
+
+Without arguments the synthetic pages from pages.py are used.
+"""
+
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crawler import driveid
+from crawler.driveid import DRIVE_ID_PATTERNS, DriveIdMatcher
+from pages import corpus
+
+
+def sequential(content):
+    """The previous implementation, one re.search per pattern over the page"""
+    for pattern in DRIVE_ID_PATTERNS:
+        match = re.search(pattern, content, re.IGNORECASE)
+        if match:
+            return match.group(1)
+    return None
+
+
+def time_per_page(func, content, repeat=5):
+    call = lambda: func(content)
+    number = max(1, int(0.2 / max(timeit.timeit(call, number=1), 1e-6)))
+    return min(timeit.repeat(call, number=number, repeat=repeat)) / number
+
+
+def main():
+    if len(sys.argv) > 1:
+        pages = {}
+        for path in sys.argv[1:]:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                pages[os.path.basename(path)] = f.read()
+    else:
+        pages = corpus()
+
+    candidates = [('sequential', sequential)]
+    if driveid.ahocorasick is not None:
+        candidates.append(('aho-corasick', DriveIdMatcher(automaton=True).search))
+    candidates.append(('str.find', DriveIdMatcher().search))
+
+    print(f"{'page':<18}{'KB':>6}" + ''.join(f"{name:>16}" for name, _ in candidates) + "  drive id")
+    totals = [0.0] * len(candidates)
+    for name, content in pages.items():
+        row = f"{name:<18}{len(content) / 1024:>6.0f}"
+        for i, (_, func) in enumerate(candidates):
+            seconds = time_per_page(func, content)
+            totals[i] += seconds
+            row += f"{seconds * 1e6:>13.0f} us"
+        print(row + f"  {sequential(content)}")
+
+    print(f"{'total':<24}" + ''.join(f"{t * 1e6:>13.0f} us" for t in totals))
+    print(f"{'speedup':<24}" + ''.join(f"{totals[0] / t:>15.1f}x" for t in totals))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+Micro-benchmarks of the parser and detector hot paths, with a baseline
+
+Usage:
+    python scripts/benchmarks/bench_micro.py [corpus=DIR] [baseline=FILE] [threshold=0.1] [save=0]
+    python scripts/benchmarks/bench_micro.py record DIR URL [URL ...]
+
+Times each function over the pages of the kind it parses and reports
+calls per second (best of 7 repeats, with the spread of the repeats as
+a noise estimate) and the peak memory one call allocates (tracemalloc):
+
+    extract_video_source       episode pages
+    extract_google_drive_id    episode pages
+    extract_video_urls         episode pages
+    parse_show_links           category pages
+    parse_season_links         show pages
+    parse_episode_links        season pages (the episode link filtering)
+    extract_season_number      every link on the season pages
+    extract_episode_number     every link on the season pages
+
+The corpus is the synthetic pages from pages.py unless corpus= names a
+directory of saved pages. `record` freezes live pages into such a
+directory: each page is saved as <kind>-N.html, named by
+crawler.urls.classify_url, and its URL is kept in urls.json.
+
+save=1 writes the results to the baseline file (default
+bench_micro_baseline.json next to this script). Later runs compare
+against it and flag functions that got slower, or allocate more, by more
+than the threshold, and exit with status 1 if any did. A slowdown
+within the run's own noise is not flagged. Baselines only compare runs
+on the same corpus and machine: the committed baseline was saved from
+the synthetic corpus, so save your own before comparing on another box.
+"""
+
+import hashlib
+import json
+import os
+import platform
+import sys
+import tempfile
+import timeit
+import tracemalloc
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crawler import CrawlSession, build_session, detectors, parsing
+from crawler.urls import classify_url
+from pages import BASE, CATEGORY_PATH, corpus
+from standin import parse_options
+from universalv6 import WorthCreteExtractor
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+KINDS = ('category', 'show', 'season', 'episode')
+
+# Where the synthetic pages live on the site, for the parsers that need the page URL
+SYNTHETIC_URLS = {
+    'category': f"{BASE}{CATEGORY_PATH}",
+    'show': f"{BASE}{CATEGORY_PATH}show-1-online-english/",
+    'season': f"{BASE}{CATEGORY_PATH}show-1-online-english/show-1-seasons-1-online-english/",
+}
+
+
+def load_corpus(directory=None):
+    """[(kind, url, html)] from a recorded directory, or the synthetic pages"""
+    if directory is None:
+        return [(name.split('-')[0], SYNTHETIC_URLS.get(name.split('-')[0], BASE + '/'), html_content)
+                for name, html_content in corpus().items()]
+    with open(os.path.join(directory, 'urls.json'), encoding='utf-8') as f:
+        urls = json.load(f)
+    pages = []
+    for name in sorted(urls):
+        with open(os.path.join(directory, name), encoding='utf-8', errors='replace') as f:
+            pages.append((name.split('-')[0], urls[name], f.read()))
+    return pages
+
+
+def record(directory, urls):
+    """Save live pages into a corpus directory"""
+    os.makedirs(directory, exist_ok=True)
+    index_path = os.path.join(directory, 'urls.json')
+    index = {}
+    if os.path.exists(index_path):
+        with open(index_path, encoding='utf-8') as f:
+            index = json.load(f)
+    session = build_session()
+    for url in urls:
+        kind = classify_url(url)
+        if kind not in KINDS:
+            print(f"⚠️  Skipping {url}: not a category, show, season or episode page")
+            continue
+        response = session.get(url, timeout=30)
+        response.raise_for_status()
+        number = 1 + sum(1 for name in index if name.startswith(kind + '-'))
+        name = f"{kind}-{number}.html"
+        with open(os.path.join(directory, name), 'w', encoding='utf-8') as f:
+            f.write(response.text)
+        index[name] = url
+        print(f"💾 {name}: {url} ({len(response.content) / 1024:.0f} KB)")
+    with open(index_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=2)
+
+
+def benchmarks(pages, extractor):
+    """{name: (func, [args, ...])}"""
+    of_kind = lambda kind: [(url, html_content) for page_kind, url, html_content in pages if page_kind == kind]
+    episodes = [html_content for _, html_content in of_kind('episode')]
+    links = [href for _, html_content in of_kind('season') for href in parsing.iter_hrefs(html_content)]
+    return {
+        'extract_video_source': (detectors.extract_video_source, [(page, BASE + '/') for page in episodes]),
+        'extract_google_drive_id': (detectors.extract_google_drive_id, [(page,) for page in episodes]),
+        'extract_video_urls': (detectors.extract_video_urls, [(page,) for page in episodes]),
+        'parse_show_links': (extractor.parse_show_links, [(page,) for _, page in of_kind('category')]),
+        'parse_season_links': (extractor.parse_season_links, [(page,) for _, page in of_kind('show')]),
+        'parse_episode_links': (extractor.parse_episode_links, [(page, url) for url, page in of_kind('season')]),
+        'extract_season_number': (extractor.extract_season_number, [(href,) for href in links]),
+        'extract_episode_number': (extractor.extract_episode_number, [(href,) for href in links]),
+    }
+
+
+def measure(func, inputs, repeat=7):
+    """(calls per second, spread of the repeats, peak KB allocated by the largest call)"""
+    def run():
+        for args in inputs:
+            func(*args)
+
+    number = max(1, int(0.2 / max(timeit.timeit(run, number=1), 1e-6)))
+    times = sorted(timeit.repeat(run, number=number, repeat=repeat))
+    seconds = times[0] / number
+    spread = times[len(times) // 2] / times[0] - 1
+
+    peak = 0
+    tracemalloc.start()
+    for args in inputs:
+        tracemalloc.reset_peak()
+        current = tracemalloc.get_traced_memory()[0]
+        func(*args)
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - current)
+    tracemalloc.stop()
+    return len(inputs) / seconds, spread, peak / 1024
+
+
+def corpus_digest(pages):
+    digest = hashlib.sha1()
+    for kind, url, html_content in pages:
+        digest.update(f"{kind}\0{url}\0".encode())
+        digest.update(html_content.encode('utf-8', 'replace'))
+    return digest.hexdigest()[:16]
+
+
+@contextmanager
+def make_extractor():
+    """A WorthCreteExtractor whose state files go to a throwaway directory, removed afterwards"""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            extractor = WorthCreteExtractor(BASE + '/', session=CrawlSession())
+        finally:
+            os.chdir(cwd)
+        yield extractor
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == 'record':
+        if len(sys.argv) < 4:
+            print(__doc__)
+            return
+        record(sys.argv[2], sys.argv[3:])
+        return
+
+    options = parse_options(sys.argv[1:], {'corpus': '', 'baseline': os.path.join(HERE, 'bench_micro_baseline.json'),
+                                           'threshold': 0.1, 'save': 0})
+    pages = load_corpus(options['corpus'] or None)
+    digest = corpus_digest(pages)
+    baseline = None
+    if os.path.exists(options['baseline']):
+        with open(options['baseline'], encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline['corpus'] != digest:
+            print(f"⚠️  Baseline was recorded on another corpus ({baseline['corpus']}), not comparing")
+            baseline = None
+
+    counts = {kind: sum(1 for page_kind, _, _ in pages if page_kind == kind) for kind in KINDS}
+    print(f"📄 Corpus {digest}: " + ", ".join(f"{n} {kind}" for kind, n in counts.items()))
+    print(f"{'function':<26}{'calls':>7}{'calls/s':>14}{'noise':>7}{'peak KB':>10}" + ("  vs baseline" if baseline else ""))
+
+    results = {}
+    regressions = []
+    with make_extractor() as extractor:
+        for name, (func, inputs) in benchmarks(pages, extractor).items():
+            if not inputs:
+                print(f"{name:<26}{'no pages':>7}")
+                continue
+            ops, spread, peak_kb = measure(func, inputs)
+            results[name] = {'calls_per_sec': round(ops, 1), 'peak_kb': round(peak_kb, 1)}
+            row = f"{name:<26}{len(inputs):>7}{ops:>14,.0f}{spread:>6.0%}{peak_kb:>10.1f}"
+            previous = (baseline or {}).get('results', {}).get(name)
+            if previous:
+                change = ops / previous['calls_per_sec'] - 1
+                row += f"  {change:+.0%}"
+                if change < -max(options['threshold'], spread):
+                    row += "  ⚠️  SLOWER"
+                    regressions.append(name)
+                if peak_kb > previous['peak_kb'] * (1 + options['threshold']) and peak_kb - previous['peak_kb'] > 1:
+                    row += f"  ⚠️  MORE MEMORY (was {previous['peak_kb']:.1f} KB)"
+                    regressions.append(name)
+            print(row)
+
+    if options['save']:
+        with open(options['baseline'], 'w', encoding='utf-8') as f:
+            json.dump({'corpus': digest, 'python': platform.python_version(), 'machine': platform.node(),
+                       'results': results}, f, indent=2)
+        print(f"💾 Baseline saved to {options['baseline']}")
+    if regressions:
+        print(f"❌ {len(set(regressions))} regressions beyond {options['threshold']:.0%}: {', '.join(sorted(set(regressions)))}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
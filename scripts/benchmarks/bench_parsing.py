@@ -0,0 +1,73 @@
+"""
+Parse time per page: full BeautifulSoup tree vs the crawler parser backends
+
+Usage: python scripts/benchmarks/bench_parsing.py [saved_page.html ...]
+
+Without arguments the synthetic pages from pages.py are used. Saved
+episode pages should be named episode-*.html so they are timed on the
+player lookup rather than the link scan.
+"""
+
+import os
+import sys
+import timeit
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crawler import parsing
+from pages import corpus
+
+
+def full_tree(html_content, players):
+    """What every extractor did before: build the whole tree, then search it"""
+    soup = BeautifulSoup(html_content, 'html.parser')
+    if players:
+        return [iframe['src'] for iframe in soup.find_all('iframe', src=True)], soup.find('video')
+    return [link['href'] for link in soup.find_all('a', href=True)]
+
+
+def scoped(backend):
+    def run(html_content, players):
+        if players:
+            return parsing.find_players(html_content, backend)
+        return list(parsing.iter_hrefs(html_content, backend))
+    return run
+
+
+def time_per_page(func, html_content, players, repeat=5):
+    call = lambda: func(html_content, players)
+    number = max(1, int(0.2 / max(timeit.timeit(call, number=1), 1e-6)))
+    return min(timeit.repeat(call, number=number, repeat=repeat)) / number
+
+
+def load_pages(paths):
+    pages = {}
+    for path in paths:
+        with open(path, 'rb') as f:
+            pages[os.path.basename(path)] = f.read()
+    return pages
+
+
+def main():
+    pages = load_pages(sys.argv[1:]) if len(sys.argv) > 1 else {name: html.encode('utf-8') for name, html in corpus().items()}
+    candidates = [('bs4 full tree', full_tree)] + [(backend, scoped(backend)) for backend in parsing.available_backends()]
+
+    print(f"{'page':<18}{'KB':>6}" + ''.join(f"{name:>16}" for name, _ in candidates))
+    totals = [0.0] * len(candidates)
+    for name, html_content in pages.items():
+        row = f"{name:<18}{len(html_content) / 1024:>6.0f}"
+        for i, (_, func) in enumerate(candidates):
+            # Episode pages are searched for players, index pages for links
+            seconds = time_per_page(func, html_content, players=name.startswith('episode'))
+            totals[i] += seconds
+            row += f"{seconds * 1000:>13.2f} ms"
+        print(row)
+
+    print(f"{'total':<24}" + ''.join(f"{t * 1000:>13.2f} ms" for t in totals))
+    print(f"{'speedup':<24}" + ''.join(f"{totals[0] / t:>15.1f}x" for t in totals))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Parse stage scaling: episode pages per second by number of worker processes
+
+Usage: python scripts/benchmarks/bench_pipeline.py [max_workers] [pages]
+
+Runs detectors.detect_all over synthetic episode pages from pages.py on
+a ParseStage of 1, 2, 4, ... workers up to max_workers (default: the
+core count) and reports throughput and scaling efficiency against one
+worker. Pool start-up is excluded.
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crawler import detectors
+from crawler.pipeline import ParseStage
+from pages import PLAYERS, episode_page
+
+
+async def parse_all(stage, pages):
+    return await asyncio.gather(*[stage.run(detectors.detect_all, html_content, 'https://www.worthcrete.com/')
+                                  for html_content in pages])
+
+
+def pages_per_second(workers, pages):
+    stage = ParseStage(workers)
+    try:
+        asyncio.run(parse_all(stage, pages[:workers * 2]))  # start the workers
+        started = time.perf_counter()
+        asyncio.run(parse_all(stage, pages))
+        return len(pages) / (time.perf_counter() - started)
+    finally:
+        stage.close()
+
+
+def main():
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count()
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 400
+    pages = [episode_page(PLAYERS[i % len(PLAYERS)], seed=i) for i in range(count)]
+
+    counts = []
+    workers = 1
+    while workers < max_workers:
+        counts.append(workers)
+        workers *= 2
+    counts.append(max_workers)
+
+    print(f"📄 {count} episode pages, {os.cpu_count()} cores")
+    print(f"{'workers':>8}{'pages/s':>12}{'speedup':>10}{'efficiency':>12}")
+    base = None
+    for workers in counts:
+        rate = pages_per_second(workers, pages)
+        base = base or rate
+        print(f"{workers:>8}{rate:>12.1f}{rate / base:>9.1f}x{rate / base / workers:>11.0%}")
+
+
+if __name__ == "__main__":
+    main()
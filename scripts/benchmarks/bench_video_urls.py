@@ -0,0 +1,69 @@
+"""
+Throughput of the video URL scanner in MB of HTML per second
+
+Usage: python scripts/benchmarks/bench_video_urls.py [saved_page.html ...]
+
+Compares the single-pass compiled scanner against the previous five
+uncompiled re.findall passes plus a separate dedupe pass.
+"""
+
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crawler import detectors
+from pages import corpus
+
+FIVE_PASS_PATTERNS = {
+    'mega': r'https?://mega\.nz/[^\s\'"<>]+',
+    'direct_video': r'https?://[^\s\'"<>]+\.(mp4|m3u8|webm|mkv|avi|mov)(?:\?[^\s\'"<>]*)?',
+    'iframe_src': r'<iframe[^>]+src=["\']([^"\']+)["\']',
+    'video_src': r'<video[^>]+src=["\']([^"\']+)["\']',
+    'source_src': r'<source[^>]+src=["\']([^"\']+)["\']',
+}
+
+
+def five_pass(html_content):
+    """The previous implementation, one findall per pattern"""
+    video_urls = []
+    for pattern_name, pattern in FIVE_PASS_PATTERNS.items():
+        for match in re.findall(pattern, html_content, re.IGNORECASE):
+            url = match[0] if isinstance(match, tuple) else match
+            if detectors.is_google_drive_url(url):
+                continue
+            if any(domain in url.lower() for domain in detectors.SKIP_DOMAINS):
+                continue
+            video_urls.append({'url': url, 'type': pattern_name})
+    return detectors.unique_video_urls(video_urls)
+
+
+def throughput(func, pages, repeat=5):
+    """MB of HTML scanned per second"""
+    megabytes = sum(len(html_content.encode('utf-8')) for html_content in pages) / (1024 * 1024)
+    run = lambda: [func(html_content) for html_content in pages]
+    number = max(1, int(0.5 / max(timeit.timeit(run, number=1), 1e-6)))
+    return megabytes * number / min(timeit.repeat(run, number=number, repeat=repeat))
+
+
+def main():
+    if len(sys.argv) > 1:
+        pages = []
+        for path in sys.argv[1:]:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                pages.append(f.read())
+    else:
+        pages = [html for name, html in corpus().items() if name.startswith('episode')]
+
+    before = throughput(five_pass, pages)
+    after = throughput(detectors.extract_video_urls, pages)
+    print(f"📄 {len(pages)} pages")
+    print(f"five findall passes:   {before:8.1f} MB/s")
+    print(f"single-pass scanner:   {after:8.1f} MB/s")
+    print(f"speedup:               {after / before:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
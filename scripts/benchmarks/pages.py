@@ -0,0 +1,107 @@
+"""
+Synthetic WorthCrete pages for the crawler benchmarks.
+
+The pages mimic the structure of the live WordPress theme: a large header
+menu, sidebar widgets, inline scripts and a footer wrapped around the
+handful of show, season and episode links or the player the extractors
+look for. Real pages can be saved and passed to the benchmarks instead.
+Links point at https://www.worthcrete.com unless another base is given,
+as the stand-in server (standin.py) does.
+"""
+
+import random
+
+BASE = "https://www.worthcrete.com"
+CATEGORY_PATH = "/literature/seasons/english-seasons/"
+
+PLAYERS = ['drive', 'mega', 'html5', 'youtube', 'none']
+
+
+def _chrome(rng, body):
+    """Wrap page content in theme markup of realistic size"""
+    menu = ''.join(
+        f'<li class="menu-item menu-item-type-taxonomy menu-item-{rng.randint(1000, 9999)}">'
+        f'<a href="https://www.worthcrete.com/literature/category-{i}/">Category {i}</a></li>'
+        for i in range(120))
+    widgets = ''.join(
+        f'<div class="widget"><h3 class="widget-title">Recent {i}</h3><ul>'
+        + ''.join(f'<li><a href="https://www.worthcrete.com/post-{rng.randint(1, 99999)}/" title="Post">Post {j}</a></li>'
+                  for j in range(15))
+        + '</ul></div>'
+        for i in range(6))
+    scripts = ''.join(
+        f'<script type="text/javascript">var wpData{i} = {{"ajaxurl": "https://www.worthcrete.com/wp-admin/admin-ajax.php", '
+        f'"nonce": "{rng.getrandbits(64):x}", "items": [{",".join(str(rng.randint(0, 999)) for _ in range(80))}]}};</script>'
+        for i in range(8))
+    paragraphs = ''.join(
+        f'<p class="entry">{" ".join(rng.choice(["lorem", "ipsum", "dolor", "season", "online", "watch", "drama"]) for _ in range(60))}</p>'
+        for _ in range(12))
+    return (
+        '<!DOCTYPE html><html lang="en-US"><head><meta charset="UTF-8">'
+        '<title>WorthCrete</title><link rel="stylesheet" href="/wp-content/themes/theme/style.css">'
+        f'{scripts}</head><body class="page-template"><header id="masthead"><nav><ul class="menu">{menu}</ul></nav></header>'
+        f'<div id="content"><main id="main"><article>{body}{paragraphs}</article></main>'
+        f'<aside id="secondary">{widgets}</aside></div>'
+        '<footer id="colophon"><div class="site-info">&copy; WorthCrete</div></footer></body></html>'
+    )
+
+
+def category_page(shows=40, seed=1, start=0, last_page=5, base=BASE, category_path=CATEGORY_PATH, prefix='show'):
+    """Category listing with show links `start` .. `start + shows - 1` and a pagination widget up to last_page"""
+    rng = random.Random(seed)
+    links = ''.join(
+        f'<div class="show-card"><a href="{base}{category_path}{prefix}-{i}-online-english/">'
+        f'<img src="/wp-content/uploads/{prefix}-{i}.jpg" alt="Show {i}"></a>'
+        f'<h2><a href="{base}{category_path}{prefix}-{i}-online-english/">Show {i}</a></h2></div>'
+        for i in range(start, start + shows))
+    pagination = ('<div class="pagination">' + ''.join(f'<a href="?pg={i}">{i}</a>' for i in range(1, last_page + 1))
+                  + '</div>') if last_page > 1 else ''
+    return _chrome(rng, links + pagination)
+
+
+def show_page(show='show-1', seasons=4, seed=2, base=BASE, category_path=CATEGORY_PATH):
+    """Show page linking each season"""
+    rng = random.Random(seed)
+    base = f"{base}{category_path}{show}-online-english/"
+    links = ''.join(f'<a class="season" href="{base}{show}-seasons-{n}-online-english/">Season {n}</a>'
+                    for n in range(1, seasons + 1))
+    return _chrome(rng, links)
+
+
+def season_page(show='show-1', season=1, episodes=16, seed=3, base=BASE, category_path=CATEGORY_PATH):
+    """Season page linking each episode"""
+    rng = random.Random(seed)
+    base = f"{base}{category_path}{show}-online-english/{show}-seasons-{season}-online-english/"
+    links = ''.join(f'<a class="episode" href="{base}{show}-seasons-{season}-episode-{n}-online-english/">Episode {n}</a>'
+                    for n in range(1, episodes + 1))
+    return _chrome(rng, links)
+
+
+def episode_page(player='drive', seed=4):
+    """Episode page embedding one kind of player"""
+    rng = random.Random(seed)
+    file_id = ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz0123456789_-') for _ in range(33))
+    if player == 'drive':
+        embed = f'<iframe id="drive-video-{file_id}" src="https://drive.google.com/file/d/{file_id}/preview" allowfullscreen></iframe>'
+    elif player == 'mega':
+        embed = (f'<iframe src="https://mega.nz/embed/{file_id[:8]}#{file_id[8:30]}" allowfullscreen></iframe>'
+                 f'<a href="https://cdn.worthcrete.com/media/{file_id}.mp4">Download</a>')
+    elif player == 'html5':
+        embed = f'<video controls><source src="/wp-content/uploads/{file_id}.mp4" type="video/mp4"></video>'
+    elif player == 'youtube':
+        embed = f'<iframe src="https://www.youtube.com/embed/{file_id[:11]}" allowfullscreen></iframe>'
+    else:
+        embed = '<div class="notice">Links coming soon</div>'
+    return _chrome(rng, f'<div class="player">{embed}</div>')
+
+
+def corpus():
+    """{name: html} covering every page type the extractors parse"""
+    pages = {
+        'category': category_page(),
+        'show': show_page(),
+        'season': season_page(),
+    }
+    for i, player in enumerate(PLAYERS):
+        pages[f'episode-{player}'] = episode_page(player, seed=10 + i)
+    return pages
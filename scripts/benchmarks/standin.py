@@ -0,0 +1,225 @@
+"""
+Local stand-in for www.worthcrete.com, for end-to-end crawl benchmarks
+
+Usage: python scripts/benchmarks/standin.py [port=8765] [shows=40] [per_page=20] [seasons=2]
+                                            [episodes=8] [latency=0.05] [bandwidth=0]
+                                            [error_rate=0] [reset_rate=0] [seed=1]
+
+Serves a synthetic catalog built from the pages.py templates with the
+URL shapes the extractors walk:
+
+    /literature/seasons/<category>/                        category, ?pg=N pages
+    .../<show>-online-english/                             show
+    .../<show>-seasons-N-online-english/                   season
+    .../<show>-seasons-N-episode-M-online-english/         episode
+
+Each of the three categories has `shows` shows, `per_page` to a listing
+page. Shows cycle through the players in pages.PLAYERS (Drive, Mega,
+HTML5 <video>, YouTube iframe, none), so every detector gets work.
+Season pages of Mega and HTML5 shows name their server, which is what
+NonDriveVideoExtractor's quick check looks for before it opens episodes.
+
+latency is seconds before each response, bandwidth caps each response
+in bytes per second (0: unlimited), error_rate is the share of requests
+answered with a 503 and reset_rate the share whose connection is closed
+without a response.
+"""
+
+import http.server
+import random
+import re
+import sys
+import threading
+import time
+import zlib
+from collections import Counter
+
+from pages import PLAYERS, category_page, episode_page, season_page, show_page
+
+CATEGORIES = {
+    "English Seasons": "english-seasons",
+    "Hindi Seasons": "hindi-seasons",
+    "Hindi Dubbed Seasons": "hindi-dubbed-seasons",
+}
+
+SERVER_NOTES = {'mega': 'mega.nz', 'html5': 'direct .mp4'}
+
+PATH_RE = re.compile(
+    r'^/literature/seasons/(?P<category>[a-z-]+)/'
+    r'(?:(?P<show>[a-z-]+-show-\d+)-online-english/'
+    r'(?:(?P=show)-seasons-(?P<season>\d+)-online-english/'
+    r'(?:(?P=show)-seasons-(?P=season)-episode-(?P<episode>\d+)-online-english/)?)?)?$')
+
+
+class QuietServer(http.server.ThreadingHTTPServer):
+    """ThreadingHTTPServer that does not print clients hanging up mid-request"""
+
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class StandInSite:
+    """Synthetic catalog and the fault model it is served with"""
+
+    def __init__(self, shows=40, per_page=20, seasons=2, episodes=8, latency=0.05, bandwidth=0,
+                 error_rate=0.0, reset_rate=0.0, seed=1):
+        self.shows = shows
+        self.per_page = per_page
+        self.seasons = seasons
+        self.episodes = episodes
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.error_rate = error_rate
+        self.reset_rate = reset_rate
+        self.rng = random.Random(seed)
+        self.base = None
+        self.requests = Counter()
+        self.bytes_sent = 0
+        self._pages = {}
+        self._lock = threading.Lock()
+
+    @property
+    def episode_count(self):
+        return len(CATEGORIES) * self.shows * self.seasons * self.episodes
+
+    def category_urls(self):
+        """{category name: listing URL} for the extractors"""
+        return {name: f"{self.base}/literature/seasons/{slug}/" for name, slug in CATEGORIES.items()}
+
+    def player(self, show):
+        return PLAYERS[int(show.rsplit('-', 1)[1]) % len(PLAYERS)]
+
+    def render(self, path, page):
+        """(page kind, HTML) for a path, or (None, None) if the site has no such page"""
+        match = PATH_RE.match(path)
+        if not match or match['category'] not in CATEGORIES.values():
+            return None, None
+        category, show, season, episode = match['category'], match['show'], match['season'], match['episode']
+        category_path = f"/literature/seasons/{category}/"
+        prefix = category.replace('-seasons', '') + '-show'
+        if show and not (show.rsplit('-', 1)[0] == prefix and int(show.rsplit('-', 1)[1]) < self.shows):
+            return None, None
+        if season and not 1 <= int(season) <= self.seasons:
+            return None, None
+        if episode and not 1 <= int(episode) <= self.episodes:
+            return None, None
+
+        key = (path, page)
+        with self._lock:
+            if key in self._pages:
+                return self._pages[key]
+        seed = zlib.crc32(f"{path}?pg={page}".encode())
+        if episode:
+            rendered = 'episode', episode_page(self.player(show), seed=seed)
+        elif season:
+            html_content = season_page(show, int(season), self.episodes, seed, self.base, category_path)
+            server = SERVER_NOTES.get(self.player(show))
+            if server:
+                html_content = html_content.replace('</article>', f'<p class="servers">Server: {server}</p></article>', 1)
+            rendered = 'season', html_content
+        elif show:
+            rendered = 'show', show_page(show, self.seasons, seed, self.base, category_path)
+        else:
+            pages = max(1, -(-self.shows // self.per_page))
+            start = (page - 1) * self.per_page
+            count = max(0, min(self.per_page, self.shows - start))
+            rendered = 'category', category_page(count, seed, start, pages, self.base, category_path, prefix)
+        with self._lock:
+            self._pages[key] = rendered
+        return rendered
+
+    def handler(self):
+        site = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                path, _, query = self.path.partition('?')
+                page = int(re.search(r'pg=(\d+)', query).group(1)) if 'pg=' in query else 1
+                kind, html_content = site.render(path, page)
+                time.sleep(site.latency)
+                with site._lock:
+                    site.requests[kind or 'missing'] += 1
+                    roll = site.rng.random()
+                if roll < site.reset_rate:
+                    with site._lock:
+                        site.requests['reset'] += 1
+                    self.close_connection = True
+                    return
+                if roll < site.reset_rate + site.error_rate:
+                    with site._lock:
+                        site.requests['error'] += 1
+                    self.send_response(503)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                if html_content is None:
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+
+                body = html_content.encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=UTF-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                chunk = 16384
+                for offset in range(0, len(body), chunk):
+                    try:
+                        self.wfile.write(body[offset:offset + chunk])
+                    except (BrokenPipeError, ConnectionResetError):
+                        return  # the client stopped reading (streamed episode fetches)
+                    if site.bandwidth:
+                        time.sleep(min(chunk, len(body) - offset) / site.bandwidth)
+                with site._lock:
+                    site.bytes_sent += len(body)
+
+        return Handler
+
+    def start(self, port=0):
+        """Serve on 127.0.0.1 from a background thread and return the server"""
+        server = QuietServer(('127.0.0.1', port), self.handler())
+        self.base = f"http://127.0.0.1:{server.server_address[1]}"
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+def parse_options(args, defaults):
+    """key=value arguments over a dict of defaults, converted to the defaults' types"""
+    options = dict(defaults)
+    for arg in args:
+        key, _, value = arg.partition('=')
+        if key not in defaults:
+            raise SystemExit(f"Unknown option {key!r}; expected one of {', '.join(defaults)}")
+        options[key] = type(defaults[key])(value)
+    return options
+
+
+def main():
+    options = parse_options(sys.argv[1:], {'port': 8765, 'shows': 40, 'per_page': 20, 'seasons': 2, 'episodes': 8,
+                                           'latency': 0.05, 'bandwidth': 0.0, 'error_rate': 0.0, 'reset_rate': 0.0,
+                                           'seed': 1})
+    port = options.pop('port')
+    site = StandInSite(**options)
+    server = site.start(port)
+    print(f"🌐 Stand-in WorthCrete on {site.base}: {site.episode_count} episodes")
+    for name, url in site.category_urls().items():
+        print(f"   {name}: {url}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+        print(f"\n📊 Served: {dict(site.requests)}, {site.bytes_sent / (1024 * 1024):.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
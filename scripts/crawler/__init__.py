@@ -0,0 +1,68 @@
+"""
+Shared crawling helpers for the WorthCrete extractor scripts.
+
+The extractors import this package as `crawler` when run from scripts/
+and as `scripts.crawler` when the root copy of universalv6.py is run
+from the repository root.
+"""
+
+from .aio import AsyncFetcher
+from .breaker import BreakerRegistry, CircuitOpenError
+from .cache import ResponseCache
+from .detectors import (
+    detect_all,
+    extract_google_drive_id,
+    extract_video_source,
+    extract_video_urls,
+    is_google_drive_url,
+    unique_video_urls,
+)
+from .driveid import DriveIdMatcher
+from .frontier import Frontier
+from .inventory import InventoryStore
+from .journal import Journal
+from .metrics import CrawlMetrics
+from .pagestore import PageStore
+from .ratelimit import HostRateLimiter, RateLimiterRegistry, backoff_delay
+from .retryqueue import RetryQueue
+from .session import CrawlSession, ReplaySession, build_session, call_with_retries, is_transient, print_run_summary
+from .sitemap import SitemapDiscovery
+from .urls import WorthCreteUrl, classify_url, episode_number, parse_url, season_number
+from .warc import WarcArchive, WarcWriter
+
+__all__ = [
+    'AsyncFetcher',
+    'BreakerRegistry',
+    'CircuitOpenError',
+    'CrawlMetrics',
+    'CrawlSession',
+    'DriveIdMatcher',
+    'Frontier',
+    'HostRateLimiter',
+    'InventoryStore',
+    'Journal',
+    'PageStore',
+    'RateLimiterRegistry',
+    'ReplaySession',
+    'ResponseCache',
+    'RetryQueue',
+    'SitemapDiscovery',
+    'WarcArchive',
+    'WarcWriter',
+    'WorthCreteUrl',
+    'backoff_delay',
+    'build_session',
+    'call_with_retries',
+    'classify_url',
+    'detect_all',
+    'episode_number',
+    'extract_google_drive_id',
+    'extract_video_source',
+    'extract_video_urls',
+    'is_google_drive_url',
+    'is_transient',
+    'parse_url',
+    'print_run_summary',
+    'season_number',
+    'unique_video_urls',
+]
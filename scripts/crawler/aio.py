@@ -0,0 +1,146 @@
+"""
+Concurrent fetching on top of a blocking requests.Session.
+
+Requests are issued from a thread pool and awaited from asyncio, so the
+extractors keep a single shared session while many pages are in flight.
+A global semaphore caps the total number of requests and a per-host
+semaphore keeps any single origin from being flooded.
+
+With a ParseStage (see pipeline.py), fetch_and_parse hands each page to
+a process pool for extraction, with a bound on the pages in between.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .breaker import CircuitOpenError
+from .pipeline import StageStats, timed_call
+
+
+class AsyncFetcher:
+    """Fetch pages concurrently under a global and a per-host limit"""
+
+    def __init__(self, session, max_concurrency=32, per_host_limit=8, timeout=15, pages=None, parse_stage=None):
+        self.session = session
+        self.pages = pages
+        self.parse_stage = parse_stage
+        self.fetch_stats = StageStats('fetch', max_concurrency)
+        self.started = time.perf_counter()
+        self.max_concurrency = max_concurrency
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        self._global = None
+        self._between = None
+        self._hosts = {}
+
+        # Let the connection pool hold as many sockets as we have workers
+        adapter = HTTPAdapter(pool_connections=max_concurrency, pool_maxsize=max_concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def _host_semaphore(self, url):
+        """Return the semaphore guarding the host of a URL"""
+        host = urlparse(url).netloc
+        if host not in self._hosts:
+            self._hosts[host] = asyncio.Semaphore(self.per_host_limit)
+        return self._hosts[host]
+
+    async def run(self, func, *args):
+        """Run a blocking callable on the fetcher's thread pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(func, *args))
+
+    async def get(self, url):
+        """GET a URL and return the response, raising on HTTP errors"""
+        if self._global is None:
+            self._global = asyncio.Semaphore(self.max_concurrency)
+        async with self._global:
+            async with self._host_semaphore(url):
+                if self.pages is not None:
+                    # Coalesces concurrent requests for the same URL
+                    response, seconds = await self.run(timed_call, self.pages.get, (url,))
+                    self.fetch_stats.add(seconds, len(response.content))
+                    return response
+                response, seconds = await self.run(timed_call, partial(self.session.get, url, timeout=self.timeout), ())
+                self.fetch_stats.add(seconds, len(response.content))
+        response.raise_for_status()
+        return response
+
+    async def get_text(self, url, retries=3):
+        """GET a URL and return its text, retrying on request errors
+
+        Backoff between attempts comes from the session's per-host limiter.
+        A host whose circuit breaker is open fails at once, without retries.
+        """
+        for attempt in range(retries):
+            try:
+                response = await self.get(url)
+                return response.text
+            except CircuitOpenError:
+                raise
+            except requests.exceptions.RequestException:
+                if attempt == retries - 1:
+                    raise
+
+    async def fetch_and_parse(self, url, func, *args, watch=None, retries=3):
+        """Fetch a page and return func(text, *args) from the parse stage
+
+        With a watch (see streaming.py) only as much of the page is
+        downloaded as the watch needs. Without a parse stage func runs on
+        the thread pool. At most max_concurrency pages plus two per parse
+        worker are between fetch and parse at any time.
+        """
+        if self.parse_stage is None:
+            text = await self.text_until(url, watch, retries) if watch else await self.get_text(url, retries)
+            result, seconds = await self.run(timed_call, func, (text,) + args)
+            metrics = getattr(self.session, 'metrics', None)
+            if metrics is not None:
+                metrics.observe_parse(func.__name__, seconds, bool(result))
+            return result
+
+        if self._between is None:
+            self._between = asyncio.Semaphore(self.max_concurrency + 2 * self.parse_stage.workers)
+        async with self._between:
+            text = await self.text_until(url, watch, retries) if watch else await self.get_text(url, retries)
+            return await self.parse_stage.run(func, text, *args)
+
+    async def text_until(self, url, watch, retries=3):
+        """Page text up to the point a fresh watch() is done, retrying on request errors
+
+        Needs a PageStore; see PageStore.text_until.
+        """
+        for attempt in range(retries):
+            try:
+                if self._global is None:
+                    self._global = asyncio.Semaphore(self.max_concurrency)
+                async with self._global:
+                    async with self._host_semaphore(url):
+                        text, seconds = await self.run(timed_call, self.pages.text_until, (url, watch))
+                self.fetch_stats.add(seconds, len(text))
+                return text
+            except CircuitOpenError:
+                raise
+            except requests.exceptions.RequestException:
+                if attempt == retries - 1:
+                    raise
+
+    def stage_summary(self):
+        """Throughput lines for the fetch stage and, if used, the parse stage"""
+        wall = time.perf_counter() - self.started
+        lines = [self.fetch_stats.summary(wall)]
+        if self.parse_stage is not None:
+            lines.append(self.parse_stage.stats.summary(wall))
+        return lines
+
+    def close(self):
+        """Shut down the worker threads and the parse processes"""
+        self.executor.shutdown(wait=True)
+        if self.parse_stage is not None:
+            self.parse_stage.close()
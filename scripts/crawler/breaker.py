@@ -0,0 +1,129 @@
+"""
+Per-host circuit breakers.
+
+Every request outcome is recorded against its host. Once enough of the
+recent requests to a host failed (timeouts, connection errors, 429s and
+5xx), the host's breaker opens and further requests fail immediately
+with CircuitOpenError instead of waiting out their timeouts. After a
+cooldown the breaker lets a single probe request through (half-open):
+success closes it, failure opens it again with a doubled cooldown. A
+probe that ends in an error that says nothing about the host (a bad
+URL, too many redirects) is handed back for the next request.
+
+CircuitOpenError is a requests RequestException, so the extractors'
+existing error handling applies: the episode is queued for retry or the
+frontier row is parked until the host may have recovered.
+
+Every transition is kept as an event for the run summary.
+"""
+
+import threading
+import time
+from collections import deque
+from urllib.parse import urlparse
+
+import requests
+
+CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half-open'
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of sending a request to a host whose breaker is open"""
+
+    def __init__(self, host, retry_in):
+        super().__init__(f"circuit open for {host}, next probe in {retry_in:.0f}s")
+        self.host = host
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Failure-rate circuit breaker for one host"""
+
+    def __init__(self, host, window=20, min_requests=10, failure_rate=0.5,
+                 cooldown=30.0, max_cooldown=600.0, events=None):
+        self.host = host
+        self.window = deque(maxlen=window)
+        self.min_requests = min_requests
+        self.failure_rate = failure_rate
+        self.base_cooldown = cooldown
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.probing = False
+        self.events = events if events is not None else []
+        self._lock = threading.Lock()
+
+    def _transition(self, state, reason):
+        self.state = state
+        self.events.append((time.time(), self.host, state, reason))
+
+    def before_request(self):
+        """Raise CircuitOpenError unless a request to the host may go out now"""
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            retry_in = self.opened_at + self.cooldown - time.monotonic()
+            if self.state == OPEN and retry_in <= 0:
+                self._transition(HALF_OPEN, 'cooldown over, probing')
+            if self.state == HALF_OPEN and not self.probing:
+                self.probing = True
+                return
+            raise CircuitOpenError(self.host, max(retry_in, 0.0))
+
+    def on_success(self):
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self.probing = False
+                self.window.clear()
+                self.cooldown = self.base_cooldown
+                self._transition(CLOSED, 'probe succeeded')
+            self.window.append(True)
+
+    def release(self):
+        """Give back the probe of a request that ended without telling anything about the host"""
+        with self._lock:
+            self.probing = False
+
+    def on_failure(self, reason='error'):
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self.probing = False
+                self.cooldown = min(self.max_cooldown, self.cooldown * 2)
+                self.opened_at = time.monotonic()
+                self._transition(OPEN, f"probe failed ({reason}), cooling down {self.cooldown:.0f}s")
+                return
+            self.window.append(False)
+            failures = self.window.count(False)
+            if (self.state == CLOSED and len(self.window) >= self.min_requests
+                    and failures / len(self.window) >= self.failure_rate):
+                self.opened_at = time.monotonic()
+                self._transition(OPEN, f"{failures}/{len(self.window)} recent requests failed ({reason}), "
+                                       f"cooling down {self.cooldown:.0f}s")
+
+
+class BreakerRegistry:
+    """One CircuitBreaker per host, shared by every session that uses the registry"""
+
+    def __init__(self, **breaker_options):
+        self.breaker_options = breaker_options
+        self.breakers = {}
+        self.events = []
+        self._lock = threading.Lock()
+
+    def for_url(self, url):
+        """Return the breaker for the host of a URL"""
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            if host not in self.breakers:
+                self.breakers[host] = CircuitBreaker(host, events=self.events, **self.breaker_options)
+            return self.breakers[host]
+
+    def summary_lines(self):
+        """Open/close events of the run, oldest first (empty if no breaker ever opened)"""
+        return [f"{time.strftime('%H:%M:%S', time.localtime(at))} {host}: {state} - {reason}"
+                for at, host, state, reason in list(self.events)]
+
+
+# Process-wide registry so every extractor in a run trips and recovers together
+default_breakers = BreakerRegistry()
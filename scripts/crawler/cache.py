@@ -0,0 +1,153 @@
+"""
+Persistent on-disk HTTP response cache.
+
+Bodies are stored once per content hash as zlib-compressed blobs, and a
+SQLite index maps each URL to its blob together with the ETag and
+Last-Modified validators. Entries younger than the TTL of their URL
+class are served without touching the network. Older entries are
+revalidated with If-None-Match / If-Modified-Since, so an unchanged page
+costs a 304 instead of a full download.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from .urls import classify_url
+
+HOUR = 60 * 60
+DAY = 24 * HOUR
+
+# Category listings change whenever a show is added; episode pages almost never do
+DEFAULT_TTLS = {
+    'category': 1 * HOUR,
+    'show': 6 * HOUR,
+    'season': 12 * HOUR,
+    'episode': 30 * DAY,
+    'other': 1 * DAY,
+}
+
+
+class CacheEntry:
+    """Index row for one cached URL"""
+
+    __slots__ = ('url', 'digest', 'content_type', 'encoding', 'etag', 'last_modified', 'stored_at')
+
+    def __init__(self, url, digest, content_type, encoding, etag, last_modified, stored_at):
+        self.url = url
+        self.digest = digest
+        self.content_type = content_type
+        self.encoding = encoding
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = stored_at
+
+
+class ResponseCache:
+    """Content-addressed, compressed response cache with conditional revalidation"""
+
+    def __init__(self, directory='.crawl_cache', ttls=None):
+        self.directory = directory
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.blob_dir = os.path.join(directory, 'blobs')
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(directory, 'index.db'), check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('''
+            CREATE TABLE IF NOT EXISTS entries (
+                url TEXT PRIMARY KEY,
+                digest TEXT NOT NULL,
+                content_type TEXT,
+                encoding TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL NOT NULL
+            )
+        ''')
+        self._db.commit()
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    def _blob_path(self, digest):
+        return os.path.join(self.blob_dir, digest[:2], f"{digest}.zz")
+
+    def lookup(self, url):
+        """Return the CacheEntry for a URL, or None"""
+        with self._lock:
+            row = self._db.execute(
+                'SELECT url, digest, content_type, encoding, etag, last_modified, stored_at '
+                'FROM entries WHERE url = ?', (url,)).fetchone()
+        if row is None or not os.path.exists(self._blob_path(row[1])):
+            return None
+        return CacheEntry(*row)
+
+    def is_fresh(self, entry):
+        """True if the entry is younger than the TTL of its URL class"""
+        return time.time() - entry.stored_at < self.ttls[classify_url(entry.url)]
+
+    def conditional_headers(self, entry):
+        """Validators to send when revalidating an entry"""
+        headers = {}
+        if entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def store(self, url, response):
+        """Cache a 200 response body and its validators"""
+        body = response.content
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._blob_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(zlib.compress(body, 6))
+            os.replace(tmp_path, path)
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (url, digest, response.headers.get('Content-Type'), response.encoding,
+                 response.headers.get('ETag'), response.headers.get('Last-Modified'), time.time()))
+            self._db.commit()
+
+    def touch(self, entry):
+        """Mark an entry as freshly revalidated"""
+        entry.stored_at = time.time()
+        with self._lock:
+            self._db.execute('UPDATE entries SET stored_at = ? WHERE url = ?', (entry.stored_at, entry.url))
+            self._db.commit()
+
+    def build_response(self, entry, request=None):
+        """Rebuild a requests.Response from a cache entry"""
+        with open(self._blob_path(entry.digest), 'rb') as f:
+            body = zlib.decompress(f.read())
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = 'OK'
+        response.url = entry.url
+        response.request = request
+        response._content = body
+        response.encoding = entry.encoding
+        response.headers = CaseInsensitiveDict()
+        if entry.content_type:
+            response.headers['Content-Type'] = entry.content_type
+        if entry.etag:
+            response.headers['ETag'] = entry.etag
+        if entry.last_modified:
+            response.headers['Last-Modified'] = entry.last_modified
+        response.from_cache = True
+        return response
+
+    def summary(self):
+        """One-line hit/revalidation/miss summary"""
+        return f"{self.hits} fresh hits, {self.revalidated} revalidated (304), {self.misses} downloaded"
@@ -0,0 +1,220 @@
+"""
+Video source detectors shared by every extractor.
+
+These are plain functions of the page HTML so one downloaded page can be
+run through all of them (see extract_all_sources.py), and so the parse
+stage can later be moved off the fetching threads.
+"""
+
+import re
+from urllib.parse import urljoin
+
+from . import parsing
+from .driveid import DRIVE_ID_PATTERNS, DriveIdMatcher
+
+VIDEO_URL_PATTERNS = {
+    'mega': r'https?://mega\.nz/[^\s\'"<>]+',
+    'direct_video': r'https?://[^\s\'"<>]+\.(?:mp4|m3u8|webm|mkv|avi|mov)(?:\?[^\s\'"<>]*)?',
+    'iframe_src': r'<iframe[^>]+src=["\']([^"\']+)["\']',
+    'video_src': r'<video[^>]+src=["\']([^"\']+)["\']',
+    'source_src': r'<source[^>]+src=["\']([^"\']+)["\']',
+}
+VIDEO_URL_RES = {name: re.compile(pattern, re.IGNORECASE) for name, pattern in VIDEO_URL_PATTERNS.items()}
+TAG_SRC_TYPES = {'i': 'iframe_src', 'v': 'video_src', 's': 'source_src'}
+
+# Every place one of the patterns can start; run over the lower-cased page.
+# Bare URLs are only worth visiting if the page mentions Mega or a video extension.
+VIDEO_URL_SCANNER = re.compile(r'https?://|<(?:iframe|video|source)')
+TAG_SCANNER = re.compile(r'<(?:iframe|video|source)')
+VIDEO_HINTS = ('mega.nz/', '.mp4', '.m3u8', '.webm', '.mkv', '.avi', '.mov')
+
+PLAYER_IFRAME_RE = re.compile(r'(drive\.google\.com|mega\.nz|youtube\.com|youtu\.be|vimeo\.com)', re.I)
+
+SKIP_DOMAINS = ['google.com', 'facebook.com', 'twitter.com', 'instagram.com',
+                'youtube.com', 'doubleclick.net', 'googletagmanager.com']
+
+
+_drive_id_matchers = {}
+
+
+def extract_google_drive_id(content, patterns=DRIVE_ID_PATTERNS):
+    """Extract Google Drive file ID from content with multiple patterns"""
+    key = tuple(patterns)
+    matcher = _drive_id_matchers.get(key)
+    if matcher is None:
+        matcher = _drive_id_matchers[key] = DriveIdMatcher(patterns)
+    return matcher.search(content)
+
+
+def google_drive_source(drive_id):
+    """Video source record for a Google Drive file"""
+    embed_src = f"https://drive.google.com/file/d/{drive_id}/preview"
+    return {
+        'type': 'google_drive',
+        'embed_code': f'<iframe src="{embed_src}" width="100%" height="480" allowfullscreen></iframe>',
+        'direct_link': f"https://drive.google.com/file/d/{drive_id}/view"
+    }
+
+
+def extract_video_source(html_content, base_url):
+    """Detect and extract video source from HTML content for various players"""
+    iframe_srcs, video_src = parsing.find_players(html_content)
+    
+    # Look for iframe with video sources
+    iframes = [src for src in iframe_srcs if PLAYER_IFRAME_RE.search(src)]
+    if iframes:
+        src = iframes[0]  # Take the first matching iframe
+        if 'drive.google.com' in src:
+            drive_id = extract_google_drive_id(src)
+            if drive_id:
+                return google_drive_source(drive_id)
+        elif 'mega.nz' in src:
+            return {
+                'type': 'mega',
+                'embed_code': f'<iframe src="{src}" width="100%" height="480" frameborder="0" allowfullscreen></iframe>',
+                'direct_link': src
+            }
+        elif 'youtube.com' in src or 'youtu.be' in src:
+            return {
+                'type': 'youtube',
+                'embed_code': f'<iframe src="{src}" width="560" height="315" frameborder="0" allowfullscreen></iframe>',
+                'direct_link': src
+            }
+        # General iframe fallback
+        return {
+            'type': 'iframe_embed',
+            'embed_code': f'<iframe src="{src}" width="100%" height="480" frameborder="0" allowfullscreen></iframe>',
+            'direct_link': src
+        }
+    
+    # Look for video tag (HTML5 player)
+    if video_src:
+        full_src = urljoin(base_url, video_src) if not video_src.startswith('http') else video_src
+        return {
+            'type': 'html5',
+            'embed_code': f'<video src="{full_src}" controls width="100%" height="480"></video>',
+            'direct_link': full_src
+        }
+    
+    # Fallback regex for Google Drive
+    drive_id = extract_google_drive_id(html_content)
+    if drive_id:
+        return google_drive_source(drive_id)
+    
+    # Fallback regex for Mega
+    mega_match = re.search(r'mega\.nz/(?:file|embed)/([A-Za-z0-9]+)#?([A-Za-z0-9]+)?', html_content, re.I)
+    if mega_match:
+        file_id = mega_match.group(1)
+        key = mega_match.group(2) or ''
+        embed_src = f"https://mega.nz/embed/{file_id}#{key}"
+        return {
+            'type': 'mega',
+            'embed_code': f'<iframe src="{embed_src}" width="100%" height="480" frameborder="0" allowfullscreen></iframe>',
+            'direct_link': embed_src
+        }
+    
+    # Additional regex for other direct video URLs (e.g., .mp4 links)
+    video_match = re.search(r'(?:src|href|data-src)=["\']([^"\']*\.(?:mp4|webm|ogg|avi|mkv)[^"\']*)["\']', html_content, re.I)
+    if video_match:
+        video_src = video_match.group(1)
+        full_src = urljoin(base_url, video_src) if not video_src.startswith('http') else video_src
+        return {
+            'type': 'direct_video',
+            'embed_code': f'<video src="{full_src}" controls width="100%" height="480"></video>',
+            'direct_link': full_src
+        }
+    
+    return None
+
+
+def is_google_drive_url(url):
+    """Check if URL is a Google Drive link"""
+    if not url:
+        return False
+    return 'drive.google.com' in url.lower()
+
+
+def extract_video_urls(html_content):
+    """Extract unique non-Drive video URLs from HTML content in a single pass"""
+    video_urls = []
+    seen = set()
+    
+    def add(url, url_type):
+        if url in seen:
+            return
+        seen.add(url)
+        
+        if is_google_drive_url(url):
+            return
+        
+        url_lower = url.lower()
+        if any(domain in url_lower for domain in SKIP_DOMAINS):
+            return
+        
+        video_urls.append({
+            'url': url,
+            'type': url_type
+        })
+    
+    mega_re = VIDEO_URL_RES['mega']
+    direct_re = VIDEO_URL_RES['direct_video']
+    
+    # Lower-casing is much cheaper than a case-insensitive scan. Offsets
+    # only shift for a few non-ASCII characters; those pages scan the original.
+    lowered = html_content.lower()
+    scanner = VIDEO_URL_SCANNER if any(hint in lowered for hint in VIDEO_HINTS) else TAG_SCANNER
+    if len(lowered) == len(html_content):
+        hits = scanner.finditer(lowered)
+    else:
+        hits = re.finditer(scanner.pattern, html_content, re.IGNORECASE)
+    
+    mega_end = direct_end = 0
+    for hit in hits:
+        start = hit.start()
+        
+        if hit.group()[0] == '<':
+            url_type = TAG_SRC_TYPES[hit.group()[1].lower()]
+            match = VIDEO_URL_RES[url_type].match(html_content, start)
+            if match:
+                url = match.group(1)
+                # A src that is itself a Mega or direct video URL keeps that type
+                if mega_re.fullmatch(url):
+                    url_type = 'mega'
+                elif direct_re.fullmatch(url):
+                    url_type = 'direct_video'
+                add(url, url_type)
+            continue
+        
+        # Mega is checked before direct video so a URL matching both stays 'mega'
+        if start >= mega_end:
+            match = mega_re.match(html_content, start)
+            if match:
+                add(match.group(), 'mega')
+                mega_end = match.end()
+        if start >= direct_end:
+            match = direct_re.match(html_content, start)
+            if match:
+                add(match.group(), 'direct_video')
+                direct_end = match.end()
+    
+    return video_urls
+
+
+def unique_video_urls(video_urls):
+    """Drop repeated URLs, keeping the first detection of each"""
+    unique_urls = []
+    seen = set()
+    for video in video_urls:
+        if video['url'] not in seen:
+            seen.add(video['url'])
+            unique_urls.append(video)
+    return unique_urls
+
+
+def detect_all(html_content, base_url):
+    """Run every detector over one page"""
+    return {
+        'video_source': extract_video_source(html_content, base_url),
+        'google_drive_id': extract_google_drive_id(html_content),
+        'video_links': extract_video_urls(html_content),
+    }
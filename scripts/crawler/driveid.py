@@ -0,0 +1,135 @@
+"""
+Google Drive file ID matcher with a literal prefilter.
+
+Every Drive ID pattern starts with a fixed literal (the src attribute
+pattern contains one). The page is searched for those literals first
+and each regex is only tried where its literal occurs, so pages without
+Drive markup cost a literal scan instead of one full regex pass per
+pattern. Priority order is kept: the result is the leftmost match of
+the first pattern that matches, exactly as with sequential re.search
+calls.
+
+Literals are found lazily with str.find, pattern by pattern, so the
+search stops at the first pattern that matches. With automaton=True and
+pyahocorasick installed, all literals are found in one Aho-Corasick pass
+instead, which pays off for larger literal sets.
+"""
+
+import re
+
+try:
+    import ahocorasick
+except ImportError:  # optional, str.find is used instead
+    ahocorasick = None
+
+DRIVE_ID_PATTERNS = [
+    r'drive\.google\.com/file/d/([a-zA-Z0-9_-]+)',  # Standard iframe
+    r'drive-video-([a-zA-Z0-9_-]+)',                # Video ID attribute
+    r'/file/d/([a-zA-Z0-9_-]+)/preview',            # Preview URL
+    r'id="drive-video-([a-zA-Z0-9_-]+)"',           # ID with drive-video
+    r'data-id="([a-zA-Z0-9_-]+)"',                  # Data attribute
+    r'fileId["\s:=]+([a-zA-Z0-9_-]+)',              # fileId variable
+    r'video[_-]?id["\s:=]+([a-zA-Z0-9_-]+)',        # video_id/videoId
+    r'src="[^"]*?/d/([a-zA-Z0-9_-]+)',              # src attribute
+]
+
+# Lower-case literals that every match of a pattern starts with
+DRIVE_ID_ANCHORS = {
+    DRIVE_ID_PATTERNS[0]: ('drive.google.com/file/d/',),
+    DRIVE_ID_PATTERNS[1]: ('drive-video-',),
+    DRIVE_ID_PATTERNS[2]: ('/file/d/',),
+    DRIVE_ID_PATTERNS[3]: ('id="drive-video-',),
+    DRIVE_ID_PATTERNS[4]: ('data-id="',),
+    DRIVE_ID_PATTERNS[5]: ('fileid',),
+    DRIVE_ID_PATTERNS[6]: ('videoid', 'video_id', 'video-id'),
+}
+
+# src=" is on nearly every page, so the src pattern is anchored on the
+# /d/ inside the attribute value and matched from the src=" it belongs to
+SRC_ATTR_PATTERN = DRIVE_ID_PATTERNS[7]
+SRC_ATTR_ANCHOR = '/d/'
+
+
+class DriveIdMatcher:
+    """First Google Drive file ID in a page, by pattern priority"""
+
+    def __init__(self, patterns=DRIVE_ID_PATTERNS, automaton=False):
+        self.patterns = []
+        for pattern in patterns:
+            in_src = pattern == SRC_ATTR_PATTERN
+            anchors = (SRC_ATTR_ANCHOR,) if in_src else DRIVE_ID_ANCHORS.get(pattern)
+            # Patterns without a known literal fall back to a full search
+            self.patterns.append((re.compile(pattern, re.IGNORECASE), anchors, in_src))
+
+        self.literals = sorted({literal for _, anchors, _ in self.patterns if anchors for literal in anchors})
+        self.automaton = None
+        if automaton and ahocorasick is not None and self.literals:
+            self.automaton = ahocorasick.Automaton()
+            for literal in self.literals:
+                self.automaton.add_word(literal, literal)
+            self.automaton.make_automaton()
+
+    def _all_hits(self, lowered):
+        """Start offsets of every literal occurrence, overlaps included, in one pass"""
+        hits = {literal: [] for literal in self.literals}
+        for end, literal in self.automaton.iter(lowered):
+            hits[literal].append(end - len(literal) + 1)
+        return hits
+
+    @staticmethod
+    def _find_all(lowered, literal):
+        starts = []
+        start = lowered.find(literal)
+        while start != -1:
+            starts.append(start)
+            start = lowered.find(literal, start + 1)
+        return starts
+
+    @staticmethod
+    def _src_start(lowered, anchor):
+        """Offset of the src=" whose value contains `anchor`, or None"""
+        start = lowered.rfind('src="', 0, anchor)
+        if start == -1 or '"' in lowered[start + 5:anchor]:
+            return None
+        return start
+
+    def search(self, content):
+        """Drive ID captured by the first matching pattern, or None"""
+        lowered = content.lower()
+        if len(lowered) != len(content):
+            # Lower-casing moved offsets (rare non-ASCII); search sequentially
+            for regex, _, _ in self.patterns:
+                match = regex.search(content)
+                if match:
+                    return match.group(1)
+            return None
+
+        hits = self._all_hits(lowered) if self.automaton is not None else {}
+
+        for regex, anchors, in_src in self.patterns:
+            if anchors is None:
+                match = regex.search(content)
+                if match:
+                    return match.group(1)
+                continue
+
+            starts = []
+            for literal in anchors:
+                if literal not in hits:
+                    hits[literal] = self._find_all(lowered, literal)
+                starts.extend(hits[literal])
+            if len(anchors) > 1:
+                starts.sort()
+
+            tried = set()
+            for start in starts:
+                if in_src:
+                    start = self._src_start(lowered, start)
+                    if start is None or start in tried:
+                        continue
+                    tried.add(start)
+                match = regex.match(content, start)
+                if match:
+                    return match.group(1)
+
+        return None
@@ -0,0 +1,265 @@
+"""
+Durable crawl frontier shared by any number of worker processes.
+
+Every category, show, season and episode URL is a row with a state
+(pending, leased, done, failed), a lease and an attempt count. Workers
+claim a batch of pending rows under a time-limited lease, process them
+and complete each one together with the child URLs it discovered, in
+one transaction. A lease that runs out without being completed (the
+worker crashed or hung) makes its row claimable again, so no work is
+lost; rows that keep failing are parked as failed after max_attempts.
+Rows for a host whose circuit breaker is open are held back with park()
+until the breaker's next probe, without counting as an attempt.
+
+Rows carry a priority (lower first, see priority.py). A claim takes the
+best priority available and interleaves categories within it (fair
+share), deepest rows first within each category.
+
+Claims take SQLite's write lock (BEGIN IMMEDIATE), so two workers never
+lease the same row. The database uses WAL mode by default. WAL needs
+shared memory between the processes, so for a frontier on NFS open it
+with wal=False on every worker to use a rollback journal instead.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+KINDS = ('category', 'show', 'season', 'episode')
+
+
+class Frontier:
+    """SQLite work queue of crawl URLs with leases and attempt counts"""
+
+    def __init__(self, path='crawl_frontier.db', wal=True, max_attempts=3, busy_timeout=60):
+        self.path = path
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        # Autocommit mode: transactions are opened explicitly in _write()
+        self._db = sqlite3.connect(path, timeout=busy_timeout, isolation_level=None, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute(f"PRAGMA journal_mode={'WAL' if wal else 'DELETE'}")
+        self._db.executescript('''
+            CREATE TABLE IF NOT EXISTS frontier (
+                url TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                depth INTEGER NOT NULL,
+                parent TEXT,
+                category TEXT,
+                name TEXT,
+                position INTEGER,
+                priority INTEGER NOT NULL DEFAULT 0,
+                state TEXT NOT NULL DEFAULT 'pending',
+                lease_owner TEXT,
+                lease_expires REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                result TEXT,
+                error TEXT,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS frontier_by_parent ON frontier (parent);
+        ''')
+        columns = {row['name'] for row in self._db.execute('PRAGMA table_info(frontier)')}
+        if 'priority' not in columns:  # frontier created before priorities
+            self._db.execute('ALTER TABLE frontier ADD COLUMN priority INTEGER NOT NULL DEFAULT 0')
+        self._db.execute('DROP INDEX IF EXISTS frontier_by_state')
+        self._db.execute('CREATE INDEX IF NOT EXISTS frontier_queue ON frontier (state, priority, category, depth)')
+        self._turn = 0
+
+    @contextmanager
+    def _write(self):
+        """Run a block inside one write transaction"""
+        with self._lock:
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                yield self._db
+            except BaseException:
+                self._db.execute('ROLLBACK')
+                raise
+            self._db.execute('COMMIT')
+
+    @staticmethod
+    def _row(item, parent, now):
+        return (item['url'], item['kind'], KINDS.index(item['kind']), parent, item.get('category'),
+                item.get('name'), item.get('position'), item.get('priority', 0), now)
+
+    def add(self, items, parent=None):
+        """Queue URLs that are not in the frontier yet
+
+        Each item is a dict with url and kind plus optional category, name
+        (the show name), position (season or episode number) and priority.
+        """
+        now = time.time()
+        with self._write() as db:
+            db.executemany(
+                'INSERT OR IGNORE INTO frontier (url, kind, depth, parent, category, name, position, priority, updated_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', [self._row(item, parent, now) for item in items])
+
+    def seed(self, categories):
+        """Queue the category pages of {category name: url}"""
+        self.add([{'url': url, 'kind': 'category', 'category': name} for name, url in categories.items()])
+
+    def claim(self, worker, limit=10, lease_seconds=300):
+        """Lease up to `limit` pending rows to a worker
+
+        Rows whose lease ran out go back to pending first. Rows are taken
+        from the best priority with pending work, round-robin across
+        categories, and within a category episodes go before seasons, shows
+        and categories so started shows finish first.
+        """
+        now = time.time()
+        with self._write() as db:
+            db.execute(
+                "UPDATE frontier SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "error = 'lease expired', lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+                "WHERE state = 'leased' AND lease_expires < ?", (self.max_attempts, now, now))
+
+            rows = []
+            priority = -1
+            while len(rows) < limit:
+                found = db.execute("SELECT MIN(priority) FROM frontier WHERE state = 'pending' AND priority > ?",
+                                   (priority,)).fetchone()[0]
+                if found is None:
+                    break
+                priority = found
+                rows.extend(self._fair_share(db, priority, limit - len(rows)))
+
+            db.executemany(
+                "UPDATE frontier SET state = 'leased', lease_owner = ?, lease_expires = ?, "
+                "attempts = attempts + 1, updated_at = ? WHERE url = ?",
+                [(worker, now + lease_seconds, now, row['url']) for row in rows])
+        return [dict(row, attempts=row['attempts'] + 1) for row in rows]
+
+    def _fair_share(self, db, priority, limit):
+        """Up to `limit` pending rows of one priority, alternating between categories"""
+        categories = [row[0] for row in db.execute(
+            "SELECT DISTINCT category FROM frontier WHERE state = 'pending' AND priority = ?", (priority,))]
+        # Rotate the starting category so no category is always served first
+        self._turn += 1
+        start = self._turn % len(categories)
+        categories = categories[start:] + categories[:start]
+        queues = [db.execute(
+            "SELECT * FROM frontier WHERE state = 'pending' AND priority = ? AND category IS ? "
+            "ORDER BY depth DESC, rowid LIMIT ?", (priority, category, limit)).fetchall()
+            for category in categories]
+
+        rows = []
+        for turn in range(limit):
+            for queue in queues:
+                if turn < len(queue) and len(rows) < limit:
+                    rows.append(queue[turn])
+        return rows
+
+    def renew(self, worker, lease_seconds=300):
+        """Extend every lease a worker holds"""
+        now = time.time()
+        with self._write() as db:
+            db.execute("UPDATE frontier SET lease_expires = ? WHERE state = 'leased' AND lease_owner = ?",
+                       (now + lease_seconds, worker))
+
+    def complete(self, url, worker, result=None, children=()):
+        """Mark a leased row done and queue the URLs found on it
+
+        Returns False, and changes nothing, if the worker no longer holds
+        the lease (it ran out and another worker claimed the row).
+        """
+        now = time.time()
+        with self._write() as db:
+            updated = db.execute(
+                "UPDATE frontier SET state = 'done', result = ?, error = NULL, lease_owner = NULL, "
+                "lease_expires = NULL, updated_at = ? WHERE url = ? AND state = 'leased' AND lease_owner = ?",
+                (json.dumps(result) if result is not None else None, now, url, worker)).rowcount
+            if updated:
+                db.executemany(
+                    'INSERT OR IGNORE INTO frontier (url, kind, depth, parent, category, name, position, priority, updated_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', [self._row(child, url, now) for child in children])
+        return bool(updated)
+
+    def fail(self, url, worker, error):
+        """Return a leased row to the queue, or park it as failed after max_attempts"""
+        now = time.time()
+        with self._write() as db:
+            db.execute(
+                "UPDATE frontier SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "error = ?, lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+                "WHERE url = ? AND state = 'leased' AND lease_owner = ?",
+                (self.max_attempts, str(error)[:500], now, url, worker))
+
+    def park(self, url, worker, seconds, error=None):
+        """Hold a leased row back for `seconds` without using up an attempt
+
+        For work against a host whose circuit breaker is open: the row stays
+        leased to nobody, so no worker claims it until the lease runs out and
+        claim() returns it to the queue.
+        """
+        now = time.time()
+        with self._write() as db:
+            db.execute(
+                "UPDATE frontier SET lease_owner = NULL, lease_expires = ?, attempts = MAX(attempts - 1, 0), "
+                "error = ?, updated_at = ? WHERE url = ? AND state = 'leased' AND lease_owner = ?",
+                (now + seconds, str(error)[:500] if error is not None else None, now, url, worker))
+
+    def retry_failed(self):
+        """Put every failed row back in the queue with a fresh attempt count"""
+        with self._write() as db:
+            return db.execute(
+                "UPDATE frontier SET state = 'pending', attempts = 0, error = NULL, updated_at = ? "
+                "WHERE state = 'failed'", (time.time(),)).rowcount
+
+    def outstanding(self):
+        """Number of rows still pending or leased"""
+        with self._lock:
+            return self._db.execute(
+                "SELECT COUNT(*) FROM frontier WHERE state IN ('pending', 'leased')").fetchone()[0]
+
+    def pending_by_priority(self):
+        """{priority: pending rows}"""
+        with self._lock:
+            return dict(self._db.execute(
+                "SELECT priority, COUNT(*) FROM frontier WHERE state = 'pending' GROUP BY priority ORDER BY priority"))
+
+    def counts(self):
+        """{kind: {state: rows}}"""
+        counts = {kind: {} for kind in KINDS}
+        with self._lock:
+            for kind, state, n in self._db.execute('SELECT kind, state, COUNT(*) FROM frontier GROUP BY kind, state'):
+                counts[kind][state] = n
+        return counts
+
+    def summary(self):
+        """One line per kind with its row count by state"""
+        lines = []
+        for kind, states in self.counts().items():
+            if states:
+                lines.append(f"{kind:<10}" + ', '.join(f"{n} {state}" for state, n in sorted(states.items())))
+        return '\n'.join(lines)
+
+    def export(self):
+        """Extracted episodes in the universalv6.py results format"""
+        with self._lock:
+            shows = self._db.execute(
+                "SELECT url, category, name FROM frontier WHERE kind = 'show' ORDER BY category, name").fetchall()
+            all_results = {}
+            for show in shows:
+                seasons = self._db.execute(
+                    "SELECT url FROM frontier WHERE kind = 'season' AND parent = ? ORDER BY position",
+                    (show['url'],)).fetchall()
+                show_results = {}
+                for season_num, season in enumerate(seasons, 1):
+                    episodes = self._db.execute(
+                        "SELECT url, position, result FROM frontier WHERE kind = 'episode' AND parent = ? "
+                        "AND state = 'done' AND result IS NOT NULL ORDER BY position", (season['url'],)).fetchall()
+                    show_results[f"Season {season_num}"] = [
+                        {'episode': episode['position'], 'episode_url': episode['url'],
+                         'video_source': json.loads(episode['result'])}
+                        for episode in episodes
+                    ]
+                if any(show_results.values()):
+                    all_results.setdefault(show['category'], {})[show['name']] = show_results
+        return all_results
+
+    def close(self):
+        with self._lock:
+            self._db.close()
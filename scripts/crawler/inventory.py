@@ -0,0 +1,196 @@
+"""
+Per-show inventory of the season and episode URLs already seen.
+
+Every crawl records the seasons listed on each show page, the episodes
+listed on each season page and the source extracted from each episode
+page. A delta crawl then only needs to fetch show and season index
+pages, diff them against the inventory and download the episode pages
+that are new (or that never yielded a source).
+
+Each show page's season list and each season page's episode list is
+also stored as a fingerprint. When a re-crawl finds a season page
+listing the same episodes as last time, and every one of them has been
+fetched before, unchanged_season hands back the stored sources and the
+season's episode pages are not downloaded again. Request failures are
+not recorded as fetched, and a season with an episode still waiting in
+the retry queue is never treated as unchanged.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+from .urls import season_number
+
+
+def _season_number(url):
+    return season_number(url) or 0
+
+
+def fingerprint(urls):
+    """Digest of an ordered list of URLs"""
+    return hashlib.sha1('\n'.join(urls).encode('utf-8')).hexdigest()[:16]
+
+
+class InventoryStore:
+    """SQLite-backed record of shows, seasons, episodes and their extracted sources"""
+
+    def __init__(self, path='crawl_inventory.db'):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.executescript('''
+            CREATE TABLE IF NOT EXISTS shows (
+                show_url TEXT PRIMARY KEY,
+                category TEXT NOT NULL,
+                show_name TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS seasons (
+                season_url TEXT PRIMARY KEY,
+                show_url TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS episodes (
+                episode_url TEXT PRIMARY KEY,
+                season_url TEXT NOT NULL,
+                episode INTEGER,
+                source TEXT,
+                extracted_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS seasons_by_show ON seasons (show_url);
+            CREATE INDEX IF NOT EXISTS episodes_by_season ON episodes (season_url);
+        ''')
+        for table in ('shows', 'seasons'):
+            columns = {row[1] for row in self._db.execute(f'PRAGMA table_info({table})')}
+            if 'fingerprint' not in columns:  # inventory created before fingerprints
+                self._db.execute(f'ALTER TABLE {table} ADD COLUMN fingerprint TEXT')
+        self._db.commit()
+        self.shows_unchanged = 0
+        self.seasons_checked = 0
+        self.seasons_unchanged = 0
+        self.fetches_saved = 0
+
+    def record_show(self, category, show_name, show_url, season_urls):
+        """Record a show and the season URLs its page lists"""
+        now = time.time()
+        digest = fingerprint(season_urls)
+        with self._lock:
+            row = self._db.execute('SELECT fingerprint FROM shows WHERE show_url = ?', (show_url,)).fetchone()
+            if row and row[0] == digest:
+                self.shows_unchanged += 1
+            self._db.execute('INSERT OR REPLACE INTO shows (show_url, category, show_name, updated_at, fingerprint) '
+                             'VALUES (?, ?, ?, ?, ?)', (show_url, category, show_name, now, digest))
+            self._db.executemany('INSERT OR IGNORE INTO seasons (season_url, show_url, updated_at) VALUES (?, ?, ?)',
+                                 [(url, show_url, now) for url in season_urls])
+            self._db.commit()
+
+    def record_season(self, season_url, episode_urls, episode_numbers):
+        """Record the episode URLs a season page lists"""
+        with self._lock:
+            self._db.executemany(
+                'INSERT OR IGNORE INTO episodes (episode_url, season_url, episode) VALUES (?, ?, ?)',
+                [(url, season_url, num) for url, num in zip(episode_urls, episode_numbers)])
+            self._db.execute('UPDATE seasons SET updated_at = ?, fingerprint = ? WHERE season_url = ?',
+                             (time.time(), fingerprint(episode_urls), season_url))
+            self._db.commit()
+
+    def record_episode(self, episode_url, source):
+        """Record the source extracted from an episode page (None if the page had none)
+
+        Only for pages that were downloaded and parsed: a request that failed
+        says nothing about the page and is left to the retry queue.
+        """
+        with self._lock:
+            self._db.execute('UPDATE episodes SET source = ?, extracted_at = ? WHERE episode_url = ?',
+                             (json.dumps(source) if source else None, time.time(), episode_url))
+            self._db.commit()
+
+    def unchanged_season(self, season_url, episode_urls, retrying=()):
+        """Stored results of a season whose page lists the same episodes as last time, None if it changed
+
+        A season only counts as unchanged once every listed episode has been
+        fetched, so a season interrupted halfway is crawled again. Episodes
+        in retrying (queued after a failed request) count as not fetched.
+        """
+        with self._lock:
+            self.seasons_checked += 1
+            row = self._db.execute('SELECT fingerprint FROM seasons WHERE season_url = ?', (season_url,)).fetchone()
+            if not row or row[0] != fingerprint(episode_urls):
+                return None
+            rows = self._db.execute('SELECT episode_url, episode, source FROM episodes '
+                                    'WHERE season_url = ? AND extracted_at IS NOT NULL', (season_url,)).fetchall()
+            fetched = {url: (episode, source) for url, episode, source in rows}
+            if any(url not in fetched or url in retrying for url in episode_urls):
+                return None
+            self.seasons_unchanged += 1
+            self.fetches_saved += len(episode_urls)
+        return [{'episode': fetched[url][0], 'episode_url': url, 'video_source': json.loads(fetched[url][1])}
+                for url in episode_urls if fetched[url][1]]
+
+    def known_seasons(self, show_url):
+        """Season URLs already recorded for a show"""
+        with self._lock:
+            rows = self._db.execute('SELECT season_url FROM seasons WHERE show_url = ?', (show_url,)).fetchall()
+        return {row[0] for row in rows}
+
+    def extracted_episodes(self, season_url):
+        """Episode URLs of a season that already have an extracted source"""
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT episode_url FROM episodes WHERE season_url = ? AND source IS NOT NULL',
+                (season_url,)).fetchall()
+        return {row[0] for row in rows}
+
+    def season_place(self, season_url):
+        """(category, show_name, "Season N") a season is filed under in the results, or None
+
+        N counts the show's recorded seasons in order, as in show_results.
+        """
+        with self._lock:
+            row = self._db.execute(
+                'SELECT shows.category, shows.show_name, shows.show_url FROM seasons '
+                'JOIN shows ON shows.show_url = seasons.show_url WHERE season_url = ?', (season_url,)).fetchone()
+            if not row:
+                return None
+            seasons = [r[0] for r in self._db.execute(
+                'SELECT season_url FROM seasons WHERE show_url = ?', (row[2],))]
+        seasons.sort(key=_season_number)
+        return row[0], row[1], f"Season {seasons.index(season_url) + 1}"
+
+    def show_results(self, show_url):
+        """A show's extracted episodes in the universalv6.py results format"""
+        with self._lock:
+            seasons = [row[0] for row in self._db.execute(
+                'SELECT season_url FROM seasons WHERE show_url = ?', (show_url,))]
+            seasons.sort(key=_season_number)
+            results = {}
+            for season_num, season_url in enumerate(seasons, 1):
+                rows = self._db.execute(
+                    'SELECT episode, episode_url, source FROM episodes '
+                    'WHERE season_url = ? AND source IS NOT NULL ORDER BY episode', (season_url,)).fetchall()
+                results[f"Season {season_num}"] = [
+                    {'episode': episode, 'episode_url': url, 'video_source': json.loads(source)}
+                    for episode, url, source in rows
+                ]
+        return results
+
+    def export(self):
+        """All recorded shows in the universalv6.py results format"""
+        with self._lock:
+            shows = self._db.execute(
+                'SELECT category, show_name, show_url FROM shows ORDER BY category, show_name').fetchall()
+        all_results = {}
+        for category, show_name, show_url in shows:
+            show_results = self.show_results(show_url)
+            if any(show_results.values()):
+                all_results.setdefault(category, {})[show_name] = show_results
+        return all_results
+
+    def summary(self):
+        """One-line summary of the seasons a re-crawl could skip"""
+        return (f"{self.seasons_unchanged} of {self.seasons_checked} seasons unchanged, "
+                f"{self.fetches_saved} episode fetches saved ({self.shows_unchanged} shows list the same seasons)")
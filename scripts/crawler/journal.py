@@ -0,0 +1,95 @@
+"""
+Append-only JSONL journal for extraction checkpoints.
+
+Each finished unit of work is appended as one JSON line and fsynced, so
+a checkpoint costs the size of that record rather than the size of
+everything extracted so far. The current state is rebuilt on open by
+replaying the journal through an apply function. Every `compact_every`
+records the state is written back as a single snapshot line via a
+temporary file and os.replace, so a crash never leaves a half-written
+checkpoint behind. A torn last line (crash mid-append) is dropped on
+replay.
+"""
+
+import json
+import os
+import threading
+
+
+class Journal:
+    """Append-only record of finished work, replayed into a state dict"""
+
+    def __init__(self, path, apply, compact_every=200):
+        self.path = path
+        self.apply = apply
+        self.compact_every = compact_every
+        self.state = {}
+        self.records = 0
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._replay()
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def _replay(self):
+        """Rebuild state from the snapshot and records on disk"""
+        if not os.path.exists(self.path):
+            return
+
+        good_bytes = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    if not line.endswith(b'\n'):
+                        break  # torn last line, truncated below
+                    self.dropped += 1
+                    good_bytes += len(line)
+                    continue
+                good_bytes += len(line)
+                if record.get('type') == 'snapshot':
+                    self.state = record['state']
+                else:
+                    self.apply(self.state, record)
+                self.records += 1
+
+        if good_bytes < os.path.getsize(self.path):
+            self.dropped += 1
+            with open(self.path, 'r+b') as f:
+                f.truncate(good_bytes)
+
+    def append(self, record):
+        """Apply a record to the state and make it durable"""
+        with self._lock:
+            self.apply(self.state, record)
+            self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.records += 1
+            if self.records >= self.compact_every:
+                self._compact()
+
+    def compact(self):
+        """Replace the journal with a single snapshot of the current state"""
+        with self._lock:
+            self._compact()
+
+    def _compact(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'type': 'snapshot', 'state': self.state}, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self._file.close()
+        os.replace(tmp_path, self.path)
+        self._file = open(self.path, 'a', encoding='utf-8')
+        self.records = 1
+
+    def reset(self, state=None):
+        """Start over from `state` (empty by default), discarding all records"""
+        with self._lock:
+            self.state = state if state is not None else {}
+            self._compact()
+
+    def close(self):
+        self._file.close()
@@ -0,0 +1,270 @@
+"""
+Request-level metrics for crawl runs.
+
+CrawlSession records every request it sends: URL class (category, show,
+season, episode), status code or error, latency, bytes read, time spent
+waiting on the host's rate limiter, and whether the request retried a
+URL that failed earlier in the run. PageStore and ParseStage record how
+long each parser ran and whether it found something, per parser.
+
+That splits a slow run into origin latency (crawl_request_seconds),
+parsing CPU (crawl_parse_seconds) and our own pacing
+(crawl_rate_limit_wait_seconds_total).
+
+A background thread writes the metrics in the Prometheus text format
+every `interval` seconds, for node_exporter's textfile collector, and a
+JSON summary is written when the process exits.
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+from .urls import classify_url
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 15.0, 30.0)
+PARSE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+HELP = {
+    'crawl_requests_total': ('counter', 'Requests sent, by URL class and status code or error'),
+    'crawl_request_seconds': ('histogram', 'Time from sending a request to its response'),
+    'crawl_response_bytes_total': ('counter', 'Response body bytes read'),
+    'crawl_cache_hits_total': ('counter', 'Requests answered from the response cache without a request'),
+    'crawl_retries_total': ('counter', 'Requests for a URL whose previous request failed'),
+    'crawl_rate_limit_wait_seconds_total': ('counter', 'Time spent waiting on per-host rate limiters'),
+    'crawl_parse_seconds': ('histogram', 'Time spent in page parsers'),
+    'crawl_extractions_total': ('counter', 'Parser runs, by whether they found something'),
+    'crawl_run_seconds': ('gauge', 'Seconds since the metrics started'),
+}
+
+
+class Histogram:
+    """Cumulative-bucket histogram"""
+
+    __slots__ = ('buckets', 'counts', 'count', 'sum')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th quantile"""
+        if not self.count:
+            return 0.0
+        for bound, n in zip(self.buckets, self.counts):
+            if n >= q * self.count:
+                return bound
+        return float('inf')
+
+
+def _labels(labels):
+    return '{' + ','.join(f'{key}="{value}"' for key, value in labels) + '}' if labels else ''
+
+
+class CrawlMetrics:
+    """Counters and histograms for one process"""
+
+    def __init__(self):
+        self.counters = {}
+        self.histograms = {}
+        self.started = time.time()
+        self._failed = set()
+        self._lock = threading.Lock()
+        self._exporting = False
+
+    def _add(self, name, labels, value=1):
+        key = (name, tuple(labels))
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def _observe(self, name, labels, value, buckets):
+        key = (name, tuple(labels))
+        if key not in self.histograms:
+            self.histograms[key] = Histogram(buckets)
+        self.histograms[key].observe(value)
+
+    def observe_request(self, url, status, seconds):
+        """One request sent: status is the HTTP code or the name of the exception raised
+
+        The status is kept as a string, so codes and exception names sort together.
+        """
+        url_class = classify_url(url)
+        status = str(status)
+        with self._lock:
+            self._add('crawl_requests_total', (('url_class', url_class), ('status', status)))
+            self._observe('crawl_request_seconds', (('url_class', url_class),), seconds, LATENCY_BUCKETS)
+            if url in self._failed:
+                self._add('crawl_retries_total', (('url_class', url_class),))
+            if status.isdigit() and int(status) < 400:
+                self._failed.discard(url)
+            else:
+                self._failed.add(url)
+
+    def observe_bytes(self, url, nbytes):
+        with self._lock:
+            self._add('crawl_response_bytes_total', (('url_class', classify_url(url)),), nbytes)
+
+    def observe_cache_hit(self, url):
+        with self._lock:
+            self._add('crawl_cache_hits_total', (('url_class', classify_url(url)),))
+
+    def observe_wait(self, url, seconds):
+        if seconds > 0:
+            with self._lock:
+                self._add('crawl_rate_limit_wait_seconds_total', (('host', urlparse(url).netloc.lower()),), seconds)
+
+    def observe_parse(self, parser, seconds, found):
+        """One parser run; found is whether it extracted anything"""
+        with self._lock:
+            self._observe('crawl_parse_seconds', (('parser', parser),), seconds, PARSE_BUCKETS)
+            self._add('crawl_extractions_total', (('parser', parser), ('outcome', 'hit' if found else 'miss')))
+
+    def total(self, name):
+        with self._lock:
+            return sum(value for (metric, _), value in self.counters.items() if metric == name)
+
+    def to_prometheus(self):
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted(self.histograms.items())
+        lines = []
+        written = set()
+
+        def header(name):
+            if name not in written:
+                written.add(name)
+                kind, text = HELP[name]
+                lines.append(f'# HELP {name} {text}')
+                lines.append(f'# TYPE {name} {kind}')
+
+        for (name, labels), value in counters:
+            header(name)
+            lines.append(f'{name}{_labels(labels)} {value:g}')
+        for (name, labels), histogram in histograms:
+            header(name)
+            for bound, n in zip(histogram.buckets, histogram.counts):
+                lines.append(f'{name}_bucket{_labels(labels + (("le", f"{bound:g}"),))} {n}')
+            lines.append(f'{name}_bucket{_labels(labels + (("le", "+Inf"),))} {histogram.count}')
+            lines.append(f'{name}_sum{_labels(labels)} {histogram.sum:g}')
+            lines.append(f'{name}_count{_labels(labels)} {histogram.count}')
+        header('crawl_run_seconds')
+        lines.append(f'crawl_run_seconds {time.time() - self.started:.1f}')
+        return '\n'.join(lines) + '\n'
+
+    def to_dict(self):
+        """Run summary: requests, latency, bytes, retries, waits and parsers"""
+        with self._lock:
+            counters = dict(self.counters)
+            histograms = dict(self.histograms)
+        summary = {'run_seconds': round(time.time() - self.started, 1), 'requests': {}, 'latency': {},
+                   'bytes': {}, 'cache_hits': {}, 'retries': {}, 'rate_limit_wait_seconds': {}, 'parsers': {}}
+        for (name, labels), value in counters.items():
+            labels = dict(labels)
+            if name == 'crawl_requests_total':
+                summary['requests'].setdefault(labels['url_class'], {})[str(labels['status'])] = value
+            elif name == 'crawl_response_bytes_total':
+                summary['bytes'][labels['url_class']] = value
+            elif name == 'crawl_cache_hits_total':
+                summary['cache_hits'][labels['url_class']] = value
+            elif name == 'crawl_retries_total':
+                summary['retries'][labels['url_class']] = value
+            elif name == 'crawl_rate_limit_wait_seconds_total':
+                summary['rate_limit_wait_seconds'][labels['host']] = round(value, 3)
+            elif name == 'crawl_extractions_total':
+                parser = summary['parsers'].setdefault(labels['parser'], {'hit': 0, 'miss': 0})
+                parser[labels['outcome']] = value
+        for (name, labels), histogram in histograms.items():
+            labels = dict(labels)
+            stats = {'count': histogram.count, 'seconds': round(histogram.sum, 3),
+                     'mean': round(histogram.sum / histogram.count, 4) if histogram.count else 0.0,
+                     'p50': histogram.quantile(0.5), 'p95': histogram.quantile(0.95)}
+            if name == 'crawl_request_seconds':
+                summary['latency'][labels['url_class']] = stats
+            else:
+                parser = summary['parsers'].setdefault(labels['parser'], {'hit': 0, 'miss': 0})
+                parser.update(stats)
+        for parser in summary['parsers'].values():
+            runs = parser['hit'] + parser['miss']
+            parser['hit_rate'] = round(parser['hit'] / runs, 3) if runs else 0.0
+        return summary
+
+    def summary(self):
+        """One-line summary: where the run's time went"""
+        with self._lock:
+            latency = Histogram(LATENCY_BUCKETS)
+            parse_seconds = 0.0
+            for (name, _), histogram in self.histograms.items():
+                if name == 'crawl_request_seconds':
+                    latency.counts = [a + b for a, b in zip(latency.counts, histogram.counts)]
+                    latency.count += histogram.count
+                    latency.sum += histogram.sum
+                else:
+                    parse_seconds += histogram.sum
+            errors = sum(value for (name, labels), value in self.counters.items()
+                         if name == 'crawl_requests_total' and not str(dict(labels)['status']).isdigit())
+        return (f"{latency.count} requests ({errors} errors, {self.total('crawl_retries_total'):g} retries), "
+                f"latency p50 {latency.quantile(0.5):g}s p95 {latency.quantile(0.95):g}s, "
+                f"{self.total('crawl_response_bytes_total') / (1024 * 1024):.1f} MB in, "
+                f"{latency.sum:.1f}s in requests, {parse_seconds:.1f}s parsing, "
+                f"{self.total('crawl_rate_limit_wait_seconds_total'):.1f}s rate-limit waits")
+
+    def write_textfile(self, path):
+        """Write a Prometheus textfile snapshot (atomically, as the textfile collector expects)"""
+        _write_atomic(path, self.to_prometheus())
+
+    def write_summary(self, path):
+        _write_atomic(path, json.dumps(self.to_dict(), indent=2))
+
+    def start_export(self, textfile, summary_file, interval=15.0):
+        """Write textfile snapshots every `interval` seconds and both files at exit (once per process)"""
+        with self._lock:
+            if self._exporting:
+                return
+            self._exporting = True
+
+        def snapshots():
+            while True:
+                time.sleep(interval)
+                _export(self.write_textfile, textfile)
+
+        threading.Thread(target=snapshots, name='crawl-metrics', daemon=True).start()
+
+        def final():
+            _export(self.write_textfile, textfile)
+            _export(self.write_summary, summary_file)
+
+        atexit.register(final)
+
+
+def _export(write, path):
+    """Run one exporter, reporting a failure instead of raising it so the others still run"""
+    try:
+        write(path)
+    except Exception as e:
+        print(f"⚠️  Could not write metrics to {path}: {e}")
+
+
+def _write_atomic(path, text):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+# Process-wide metrics so every session and parse stage in a run reports together
+default_metrics = CrawlMetrics()
@@ -0,0 +1,142 @@
+"""
+Per-run page memoization with request coalescing.
+
+PageStore sits in front of a session for the lifetime of one run. The
+first caller of a URL fetches it and every concurrent caller of the same
+URL waits for that fetch instead of issuing its own (single flight).
+Later callers get the stored response. Parsed results are memoized per
+URL as well, so a page is fetched and parsed at most once per run.
+Failed fetches are not stored, so a retry goes back to the network.
+
+scan() is parse() for pages that only need to be read up to a point:
+the page is streamed and the connection closed once a watch (see
+streaming.py) says the result is settled.
+
+Parser runs are timed and counted as hits or misses per kind in the
+session's metrics, if it keeps any (see metrics.py).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class PageStore:
+    """Fetch each URL at most once per run and share the result"""
+
+    def __init__(self, session, max_pages=512, timeout=15):
+        self.session = session
+        self.metrics = getattr(session, 'metrics', None)
+        self.max_pages = max_pages
+        self.timeout = timeout
+        self.pages = OrderedDict()
+        self.parsed = OrderedDict()
+        self.inflight = {}
+        self.fetches = 0
+        self.duplicates_avoided = 0
+        self.stopped_early = 0
+        self._lock = threading.Lock()
+
+    def _remember(self, store, key, value):
+        store[key] = value
+        store.move_to_end(key)
+        while len(store) > self.max_pages:
+            store.popitem(last=False)
+
+    def get(self, url):
+        """Return the response for a URL, raising on request or HTTP errors"""
+        with self._lock:
+            if url in self.pages:
+                self.duplicates_avoided += 1
+                self.pages.move_to_end(url)
+                return self.pages[url]
+            flight = self.inflight.get(url)
+            if flight is None:
+                flight = self.inflight[url] = {'done': threading.Event(), 'response': None, 'error': None}
+                owner = True
+            else:
+                owner = False
+
+        if not owner:
+            flight['done'].wait()
+            if flight['error'] is not None:
+                raise flight['error']
+            with self._lock:
+                self.duplicates_avoided += 1
+            return flight['response']
+
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+            response.raise_for_status()
+            flight['response'] = response
+            with self._lock:
+                self.fetches += 1
+                self._remember(self.pages, url, response)
+            return response
+        except Exception as e:
+            flight['error'] = e
+            raise
+        finally:
+            with self._lock:
+                del self.inflight[url]
+            flight['done'].set()
+
+    def parse(self, url, kind, parser):
+        """Return parser(response) for a URL, computing it at most once per kind"""
+        key = (url, kind)
+        with self._lock:
+            if key in self.parsed:
+                self.duplicates_avoided += 1
+                self.parsed.move_to_end(key)
+                return self.parsed[key]
+        result = self._run_parser(kind, parser, self.get(url))
+        with self._lock:
+            self._remember(self.parsed, key, result)
+        return result
+
+    def scan(self, url, kind, parser, watch):
+        """Return parser(text) for a URL, downloading only as much as watch needs
+
+        watch is a factory for a fresh done(text) predicate, such as one of
+        the classes in streaming.py. The predicate must only return true once
+        the rest of the page cannot change parser's result. Memoized per
+        kind like parse().
+        """
+        key = (url, kind)
+        with self._lock:
+            if key in self.parsed:
+                self.duplicates_avoided += 1
+                self.parsed.move_to_end(key)
+                return self.parsed[key]
+        result = self._run_parser(kind, parser, self.text_until(url, watch))
+        with self._lock:
+            self._remember(self.parsed, key, result)
+        return result
+
+    def _run_parser(self, kind, parser, page):
+        started = time.perf_counter()
+        result = parser(page)
+        if self.metrics is not None:
+            self.metrics.observe_parse(kind, time.perf_counter() - started, bool(result))
+        return result
+
+    def text_until(self, url, watch):
+        """Page text up to the point where a fresh watch() is done (all of it if already stored)"""
+        with self._lock:
+            response = self.pages.get(url)
+        if response is not None:
+            return response.text
+        # Keyed by the watch, so a cached prefix is only reused by the same kind of watch
+        text, complete = self.session.get_until(url, watch(), timeout=self.timeout, key=watch.__name__)
+        with self._lock:
+            self.fetches += 1
+            if not complete:
+                self.stopped_early += 1
+        return text
+
+    def summary(self):
+        """One-line fetch/dedupe summary"""
+        summary = f"{self.fetches} pages fetched, {self.duplicates_avoided} duplicate fetches avoided"
+        if self.stopped_early:
+            summary += f", {self.stopped_early} downloads stopped early"
+        return summary
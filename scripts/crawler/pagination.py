@@ -0,0 +1,136 @@
+"""
+Concurrent walking of paginated category listings.
+
+Category pages are addressed as ?pg=N. Page 1 is fetched first and its
+pagination widget read for the highest page number it links to; all
+pages up to that number are then fetched at once. Every fetched page's
+widget is read too, so a widget that only shows a window of pages keeps
+extending the walk. Without a widget, pages are fetched in speculative
+batches until an empty page turns up.
+
+The result matches the sequential walk: pages are kept in order up to
+the first page that is empty or fails to load.
+"""
+
+import asyncio
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from . import parsing
+
+PAGE_LINK_RE = re.compile(r'[?&]pg=(\d+)')
+
+
+def page_url(category_url, page):
+    """URL of one page of a category listing"""
+    return f"{category_url}?pg={page}" if page > 1 else category_url
+
+
+def last_page_number(html_content):
+    """Highest ?pg=N the page's pagination links point to, or None"""
+    numbers = [int(match.group(1)) for match in map(PAGE_LINK_RE.search, parsing.iter_hrefs(html_content)) if match]
+    return max(numbers) if numbers else None
+
+
+class CategoryPager:
+    """Decides which pages of a category to fetch next and collects their items"""
+
+    def __init__(self, category_url, max_pages=100, batch_size=8):
+        self.category_url = category_url
+        self.max_pages = max_pages
+        self.batch_size = batch_size
+        self.items = {}
+        self.errors = {}
+        self.known_last = None
+        self.end = None  # first page that was empty or failed
+
+    def record(self, page, html_content, items):
+        """Store the items of a fetched page"""
+        self.items[page] = items
+        if not items:
+            self.end = page if self.end is None else min(self.end, page)
+            return
+        last = last_page_number(html_content)
+        if last is not None:
+            self.known_last = max(self.known_last or 1, last)
+
+    def record_error(self, page, error):
+        """Treat a page that failed to load as the end of the listing"""
+        self.errors[page] = error
+        self.end = page if self.end is None else min(self.end, page)
+
+    def next_batch(self):
+        """Page numbers to fetch next, empty once the listing is complete"""
+        if self.end is not None:
+            return []
+        start = max(self.items, default=0) + 1
+        if start > self.max_pages:
+            return []
+        if start == 1:
+            return [1]
+        if self.known_last is not None:
+            # The widget lists every page up to known_last and the pages
+            # fetched so far link to nothing further
+            stop = self.known_last
+            if start > stop:
+                return []
+        else:
+            stop = start + self.batch_size - 1
+        return list(range(start, min(stop, self.max_pages) + 1))
+
+    def pages(self):
+        """(page, items) in order, up to the first empty or failed page"""
+        pages = []
+        for page in sorted(self.items):
+            if self.end is not None and page >= self.end:
+                break
+            pages.append((page, self.items[page]))
+        return pages
+
+    def shows(self):
+        """Items of all pages in page order"""
+        return [item for _, items in self.pages() for item in items]
+
+
+def walk_category(category_url, fetch, parse, max_pages=100, batch_size=8, workers=8):
+    """Fetch all pages of a category on a thread pool; returns the finished CategoryPager
+
+    fetch(page_url) returns the page HTML and parse(html) its items.
+    """
+    pager = CategoryPager(category_url, max_pages, batch_size)
+
+    def load(page):
+        html_content = fetch(page_url(category_url, page))
+        return html_content, parse(html_content)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        batch = pager.next_batch()
+        while batch:
+            futures = [(page, executor.submit(load, page)) for page in batch]
+            for page, future in futures:
+                try:
+                    pager.record(page, *future.result())
+                except Exception as e:
+                    pager.record_error(page, e)
+            batch = pager.next_batch()
+    return pager
+
+
+async def walk_category_async(category_url, fetch, parse, max_pages=100, batch_size=8):
+    """walk_category for coroutine fetchers such as AsyncFetcher.get_text"""
+    pager = CategoryPager(category_url, max_pages, batch_size)
+
+    async def load(page):
+        html_content = await fetch(page_url(category_url, page))
+        return html_content, parse(html_content)
+
+    batch = pager.next_batch()
+    while batch:
+        results = await asyncio.gather(*[load(page) for page in batch], return_exceptions=True)
+        for page, result in zip(batch, results):
+            if isinstance(result, Exception):
+                pager.record_error(page, result)
+            else:
+                pager.record(page, *result)
+        batch = pager.next_batch()
+    return pager
@@ -0,0 +1,136 @@
+"""
+Pluggable HTML parser backend for the few elements the extractors read.
+
+The extractors only look at a[href], iframe[src], video and source tags,
+so building a full BeautifulSoup tree for every page is wasted work. The
+fastest installed backend is used: selectolax, then lxml, then the
+stdlib html.parser restricted with a SoupStrainer so that only the
+needed tags become nodes. Set CRAWL_PARSER to pin a backend.
+"""
+
+import os
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+except ImportError:
+    try:  # selectolax < 1.0 only ships the Modest backend
+        from selectolax.parser import HTMLParser as SelectolaxParser
+    except ImportError:  # optional fast path
+        SelectolaxParser = None
+
+try:
+    import lxml.html as lxml_html
+    from lxml import etree
+except ImportError:  # optional fast path
+    lxml_html = None
+
+LINKS = SoupStrainer('a', href=True)
+PLAYERS = SoupStrainer(['iframe', 'video'])
+
+
+def available_backends():
+    """Installed backends, fastest first"""
+    backends = []
+    if SelectolaxParser is not None:
+        backends.append('selectolax')
+    if lxml_html is not None:
+        backends.append('lxml')
+    backends.append('html.parser')
+    return backends
+
+
+def default_backend():
+    """Backend named by CRAWL_PARSER if installed, otherwise the fastest one"""
+    backends = available_backends()
+    requested = os.environ.get('CRAWL_PARSER')
+    if requested in backends:
+        return requested
+    return backends[0]
+
+
+BACKEND = default_backend()
+
+
+def _lxml_document(html_content):
+    if not html_content or not html_content.strip():
+        return None
+    markup = html_content
+    if isinstance(html_content, bytes):
+        # lxml assumes Latin-1 for bytes without a charset declaration
+        try:
+            markup = html_content.decode('utf-8')
+        except UnicodeDecodeError:
+            pass
+    try:
+        return lxml_html.fromstring(markup)
+    except ValueError:
+        # str input with an XML encoding declaration; let lxml decode the bytes
+        if markup is html_content:
+            return None
+    except etree.ParserError:
+        return None
+    try:
+        return lxml_html.fromstring(html_content)
+    except (etree.ParserError, ValueError):
+        return None
+
+
+def iter_hrefs(html_content, backend=None):
+    """href of every <a> tag that has one, in document order"""
+    backend = backend or BACKEND
+    if backend == 'selectolax':
+        for node in SelectolaxParser(html_content).css('a[href]'):
+            yield node.attributes.get('href') or ''
+    elif backend == 'lxml':
+        document = _lxml_document(html_content)
+        if document is not None:
+            for element in document.iter('a'):
+                href = element.get('href')
+                if href is not None:
+                    yield href
+    else:
+        for link in BeautifulSoup(html_content, 'html.parser', parse_only=LINKS).find_all('a', href=True):
+            yield link['href']
+
+
+def find_players(html_content, backend=None):
+    """(src of every <iframe> that has one, src of the first <video> or of its first <source>)"""
+    backend = backend or BACKEND
+    if backend == 'selectolax':
+        tree = SelectolaxParser(html_content)
+        iframes = [node.attributes.get('src') or '' for node in tree.css('iframe[src]')]
+        video = tree.css_first('video')
+        if video is None:
+            return iframes, None
+        src = video.attributes.get('src')
+        if not src:
+            source = video.css_first('source')
+            src = source.attributes.get('src') if source is not None else None
+        return iframes, src
+
+    if backend == 'lxml':
+        document = _lxml_document(html_content)
+        if document is None:
+            return [], None
+        iframes = [element.get('src') for element in document.iter('iframe') if element.get('src') is not None]
+        video = next(document.iter('video'), None)
+        if video is None:
+            return iframes, None
+        src = video.get('src')
+        if not src:
+            source = next(video.iter('source'), None)
+            src = source.get('src') if source is not None else None
+        return iframes, src
+
+    soup = BeautifulSoup(html_content, 'html.parser', parse_only=PLAYERS)
+    iframes = [iframe['src'] for iframe in soup.find_all('iframe', src=True)]
+    video = soup.find('video')
+    if video is None:
+        return iframes, None
+    src = video.get('src')
+    if not src:
+        source = video.find('source')
+        src = source.get('src') if source else None
+    return iframes, src
@@ -0,0 +1,92 @@
+"""
+Parse stage of the async crawl pipeline, and per-stage throughput.
+
+Pages are fetched on the AsyncFetcher thread pool (I/O, GIL released)
+and their HTML handed to a ProcessPoolExecutor sized to the core count
+for extraction (CPU, one GIL per process). AsyncFetcher.fetch_and_parse
+bounds the number of pages between the two stages, so when parsing
+falls behind, new fetches wait instead of piling HTML up in memory.
+
+Both stages count pages and busy time. The stage whose workers are
+busiest is the one limiting the crawl; time pages spent queued for a
+parse worker shows the same from the other side. With metrics (see
+metrics.py) each parse is also recorded per parse function.
+
+Parse functions run in other processes, so they must be module-level
+functions (detectors.extract_video_source, detectors.detect_all) rather
+than bound methods.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+
+def timed_call(func, args):
+    """(func(*args), seconds spent), for timing work inside a worker"""
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+
+class StageStats:
+    """Pages, bytes and busy time of one pipeline stage"""
+
+    def __init__(self, name, workers):
+        self.name = name
+        self.workers = workers
+        self.items = 0
+        self.bytes = 0
+        self.busy = 0.0
+        self.queued = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, seconds, nbytes=0, queued=0.0):
+        with self._lock:
+            self.items += 1
+            self.bytes += nbytes
+            self.busy += seconds
+            self.queued += queued
+
+    def utilization(self, wall):
+        """Share of the stage's worker time spent working"""
+        return self.busy / (wall * self.workers) if wall > 0 else 0.0
+
+    def summary(self, wall):
+        """One-line throughput summary over `wall` seconds"""
+        wall = max(wall, 1e-9)
+        line = (f"{self.name}: {self.items} pages, {self.items / wall:.1f} pages/s, "
+                f"{self.bytes / wall / (1024 * 1024):.2f} MB/s, "
+                f"{self.utilization(wall):.0%} busy across {self.workers} workers")
+        if self.queued:
+            line += f", {self.queued:.1f}s queued"
+        return line
+
+
+class ParseStage:
+    """Process pool for CPU-bound extraction"""
+
+    def __init__(self, workers=None, metrics=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.metrics = metrics
+        # Spawned workers: the fetch threads are already running when the
+        # pool starts, and forking a threaded process can deadlock the child
+        self.executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'))
+        self.stats = StageStats('parse', self.workers)
+
+    async def run(self, func, *args):
+        """func(*args) on a worker process"""
+        loop = asyncio.get_running_loop()
+        submitted = time.perf_counter()
+        result, seconds = await loop.run_in_executor(self.executor, timed_call, func, args)
+        html_content = args[0] if args and isinstance(args[0], (str, bytes)) else ''
+        self.stats.add(seconds, len(html_content), time.perf_counter() - submitted - seconds)
+        if self.metrics is not None:
+            self.metrics.observe_parse(func.__name__, seconds, bool(result))
+        return result
+
+    def close(self):
+        self.executor.shutdown(wait=True)
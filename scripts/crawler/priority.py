@@ -0,0 +1,143 @@
+"""
+Crawl priorities derived from what StreamVault already has.
+
+Work is ranked in four tiers, best first:
+
+    0  shows missing from data/streamvault-data.json
+    1  existing shows with placeholder episodes
+    2  new seasons of existing shows
+    3  re-verification of everything else
+
+The frontier claims the best tier available and interleaves categories
+within it, so a time-boxed run spends its window on the most valuable
+links first. Category pages are always tier 0 since everything else is
+discovered from them, and the show page of every existing show is tier 2
+because that is where its new seasons show up.
+"""
+
+import json
+import re
+
+MISSING_SHOW, PLACEHOLDER, NEW_SEASON, REVERIFY = range(4)
+
+PRIORITY_NAMES = {
+    MISSING_SHOW: 'missing shows',
+    PLACEHOLDER: 'placeholder episodes',
+    NEW_SEASON: 'new seasons',
+    REVERIFY: 're-verification',
+}
+
+# Same patterns as scripts/find-placeholder-links.cjs
+PLACEHOLDER_PATTERNS = [
+    'PLACEHOLDER',
+    '1zcFHiGEOwgq2-j6hMqpsE0ov7qcIUqCd',  # Default placeholder ID
+]
+
+
+def is_placeholder(url):
+    """True if an episode link is missing or a known placeholder"""
+    return not url or any(pattern in url for pattern in PLACEHOLDER_PATTERNS)
+
+
+def normalize_name(name):
+    """Normalize a show name for comparison"""
+    name_lower = name.lower().strip()
+    # Remove common suffixes like "Season X", "S01", etc.
+    name_lower = re.sub(r'\s*season\s*\d+$', '', name_lower, flags=re.I)
+    name_lower = re.sub(r'\s*s\d+$', '', name_lower, flags=re.I)
+    return name_lower
+
+
+class StreamVaultCatalog:
+    """Shows, seasons and placeholder episodes already in StreamVault"""
+
+    def __init__(self, data_file='data/streamvault-data.json'):
+        self.data_file = data_file
+        self.shows = {}         # match pattern -> show id
+        self.seasons = {}       # show id -> season numbers with episodes
+        self.placeholders = {}  # show id -> {(season, episode)}
+        self.show_count = 0
+
+        with open(data_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        for show in data.get('shows', []):
+            self.show_count += 1
+            slug = show.get('slug', '').lower().strip()
+            title = show.get('title', '').lower().strip()
+            for pattern in (slug, title):
+                if pattern:
+                    self.shows[pattern] = show.get('id')
+            if title:
+                # Normalized (no special chars) and slug-style versions of the title
+                self.shows[re.sub(r'[^a-z0-9]', '', title)] = show.get('id')
+                self.shows[re.sub(r'[^a-z0-9]+', '-', title).strip('-')] = show.get('id')
+
+        for episode in data.get('episodes', []):
+            show_id = episode.get('showId')
+            self.seasons.setdefault(show_id, set()).add(episode.get('season'))
+            if is_placeholder(episode.get('googleDriveUrl')):
+                self.placeholders.setdefault(show_id, set()).add((episode.get('season'), episode.get('episodeNumber')))
+
+    def find_show(self, show_name):
+        """StreamVault id of a show, matched loosely by name, or None"""
+        name_lower = normalize_name(show_name)
+        normalized = re.sub(r'[^a-z0-9]', '', name_lower)
+        slug = re.sub(r'[^a-z0-9]+', '-', name_lower).strip('-')
+
+        # Direct matches
+        for key in (name_lower, normalized, slug):
+            if key in self.shows:
+                return self.shows[key]
+
+        # Partial match - check if any existing show contains this name or vice versa
+        for existing, show_id in self.shows.items():
+            existing_norm = re.sub(r'[^a-z0-9]', '', existing)
+            if len(normalized) > 4 and len(existing_norm) > 4:
+                if normalized in existing_norm or existing_norm in normalized:
+                    return show_id
+        return None
+
+    def has_show(self, show_name):
+        return self.find_show(show_name) is not None
+
+
+class CrawlPriorities:
+    """Tier of each show, season and episode URL for the crawl frontier"""
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self._show_ids = {}
+
+    def _show_id(self, show_name):
+        if show_name not in self._show_ids:
+            self._show_ids[show_name] = self.catalog.find_show(show_name)
+        return self._show_ids[show_name]
+
+    def show(self, show_name):
+        show_id = self._show_id(show_name)
+        if show_id is None:
+            return MISSING_SHOW
+        if self.catalog.placeholders.get(show_id):
+            return PLACEHOLDER
+        return NEW_SEASON
+
+    def season(self, show_name, season):
+        show_id = self._show_id(show_name)
+        if show_id is None:
+            return MISSING_SHOW
+        if any(s == season for s, _ in self.catalog.placeholders.get(show_id, ())):
+            return PLACEHOLDER
+        if season not in self.catalog.seasons.get(show_id, ()):
+            return NEW_SEASON
+        return REVERIFY
+
+    def episode(self, show_name, season, episode):
+        show_id = self._show_id(show_name)
+        if show_id is None:
+            return MISSING_SHOW
+        if (season, episode) in self.catalog.placeholders.get(show_id, ()):
+            return PLACEHOLDER
+        if season not in self.catalog.seasons.get(show_id, ()):
+            return NEW_SEASON
+        return REVERIFY
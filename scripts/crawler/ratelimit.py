@@ -0,0 +1,89 @@
+"""
+Adaptive per-host rate limiting.
+
+Each host gets a token bucket whose refill rate grows additively while
+responses are healthy and shrinks multiplicatively on 429s, 5xx errors
+and timeouts (AIMD). Errors also park the host for a jittered
+exponential backoff, so retries wait for the origin instead of a fixed
+sleep.
+"""
+
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+
+def backoff_delay(attempt, base=1.0, cap=60.0):
+    """Full-jitter exponential backoff for the given attempt (0-based)"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class HostRateLimiter:
+    """Token bucket for one host that adapts its rate to the responses it sees"""
+
+    def __init__(self, rate=0.5, min_rate=0.2, max_rate=50.0, burst=4,
+                 increase=0.25, decrease=0.5, backoff_base=1.0, backoff_cap=60.0):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase = increase
+        self.decrease = decrease
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.tokens = float(burst)
+        self.blocked_until = 0.0
+        self.consecutive_errors = 0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be sent to this host"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Take the token now; a negative balance is the queue of waiters ahead of us
+            self.tokens -= 1
+            wait = max(0.0, -self.tokens / self.rate, self.blocked_until - now)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def on_success(self):
+        """Speed up after a healthy response"""
+        with self._lock:
+            self.consecutive_errors = 0
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_error(self, retry_after=None):
+        """Slow down and park the host after a 429, 5xx or timeout"""
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            delay = retry_after if retry_after is not None else backoff_delay(
+                self.consecutive_errors, self.backoff_base, self.backoff_cap)
+            self.consecutive_errors += 1
+            self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+            return delay
+
+
+class RateLimiterRegistry:
+    """One HostRateLimiter per host, shared by every session that uses the registry"""
+
+    def __init__(self, **limiter_options):
+        self.limiter_options = limiter_options
+        self.limiters = {}
+        self._lock = threading.Lock()
+
+    def for_url(self, url):
+        """Return the limiter for the host of a URL"""
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            if host not in self.limiters:
+                self.limiters[host] = HostRateLimiter(**self.limiter_options)
+            return self.limiters[host]
+
+
+# Process-wide registry so every extractor in a run paces each host together
+default_registry = RateLimiterRegistry()
@@ -0,0 +1,109 @@
+"""
+Durable queue of episode pages that failed to download.
+
+The crawl makes one attempt per episode page and moves on; a page that
+fails with a request error is queued here instead of being retried in
+the crawl loop. Each failure pushes the page's next attempt out by a
+full-jitter exponential backoff (backoff_delay), so a flaky origin gets
+time to recover and retries of many pages do not arrive in lockstep. A
+later retry pass takes the pages that are due. Pages that keep failing
+are given up after max_attempts. A page refused by an open circuit
+breaker was never sent, so defer() queues it without counting an attempt.
+"""
+
+import sqlite3
+import threading
+import time
+
+from .ratelimit import backoff_delay
+
+
+class RetryQueue:
+    """SQLite queue of failed episode URLs with per-URL backoff"""
+
+    def __init__(self, path='episode_retries.db', max_attempts=8, base=60.0, cap=6 * 3600.0):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.base = base
+        self.cap = cap
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.executescript('''
+            CREATE TABLE IF NOT EXISTS retries (
+                url TEXT PRIMARY KEY,
+                season_url TEXT,
+                attempts INTEGER NOT NULL,
+                due_at REAL NOT NULL,
+                last_error TEXT,
+                state TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS retries_due ON retries (state, due_at);
+        ''')
+        self._db.commit()
+
+    def add(self, url, season_url, error):
+        """Record a failed attempt and schedule the next one, or give up after max_attempts"""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT attempts FROM retries WHERE url = ? AND state = 'pending'",
+                                   (url,)).fetchone()
+            attempts = (row['attempts'] if row else 0) + 1
+            state = 'gave_up' if attempts >= self.max_attempts else 'pending'
+            due_at = now + backoff_delay(attempts - 1, self.base, self.cap)
+            self._db.execute('INSERT OR REPLACE INTO retries VALUES (?, ?, ?, ?, ?, ?, ?)',
+                             (url, season_url, attempts, due_at, str(error)[:500], state, now))
+            self._db.commit()
+        return state == 'pending'
+
+    def defer(self, url, season_url, error, delay):
+        """Queue a page that was never sent (its host's circuit is open) without counting an attempt"""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT attempts FROM retries WHERE url = ? AND state = 'pending'",
+                                   (url,)).fetchone()
+            attempts = row['attempts'] if row else 0
+            self._db.execute('INSERT OR REPLACE INTO retries VALUES (?, ?, ?, ?, ?, ?, ?)',
+                             (url, season_url, attempts, now + delay, str(error)[:500], 'pending', now))
+            self._db.commit()
+
+    def due(self, limit=None):
+        """Pending entries whose backoff has passed, oldest first"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT * FROM retries WHERE state = 'pending' AND due_at <= ? ORDER BY due_at LIMIT ?",
+                (time.time(), -1 if limit is None else limit)).fetchall()
+        return [dict(row) for row in rows]
+
+    def pending(self, urls):
+        """The URLs among urls still queued for another attempt"""
+        urls = list(urls)
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT url FROM retries WHERE state = 'pending' AND url IN ({','.join('?' * len(urls))})",
+                urls).fetchall() if urls else []
+        return {row[0] for row in rows}
+
+    def resolve(self, url):
+        """Mark a queued URL as downloaded"""
+        with self._lock:
+            self._db.execute("UPDATE retries SET state = 'recovered', updated_at = ? WHERE url = ?",
+                             (time.time(), url))
+            self._db.commit()
+
+    def counts(self):
+        """{'waiting', 'due', 'recovered', 'gave_up'} entry counts"""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT SUM(state = 'pending' AND due_at > ?), SUM(state = 'pending' AND due_at <= ?), "
+                "SUM(state = 'recovered'), SUM(state = 'gave_up') FROM retries", (now, now)).fetchone()
+        return dict(zip(('waiting', 'due', 'recovered', 'gave_up'), (n or 0 for n in row)))
+
+    def summary(self):
+        """One-line queue summary"""
+        counts = self.counts()
+        return (f"{counts['due']} due, {counts['waiting']} waiting for backoff, "
+                f"{counts['recovered']} recovered, {counts['gave_up']} given up")
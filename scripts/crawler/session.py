@@ -0,0 +1,299 @@
+"""
+The requests.Session every extractor uses.
+
+CrawlSession is a drop-in replacement for requests.Session that routes
+each request through the shared per-host rate limiter and, for plain
+GETs, through the on-disk response cache. Requests to a host whose
+circuit breaker is open fail fast with CircuitOpenError. Every request
+is recorded in the process metrics (see metrics.py). get_until streams a
+page and stops reading as soon as the caller has what it needs.
+
+With a WarcWriter every page the session returns is also captured to
+WARC files, and ReplaySession serves such an archive instead of the
+network (see warc.py).
+"""
+
+import codecs
+import os
+import sys
+import time
+from http.client import responses as REASONS
+
+import requests
+
+from .breaker import CircuitOpenError, default_breakers
+from .cache import ResponseCache
+from .metrics import default_metrics
+from .warc import WarcArchive, WarcWriter
+from .ratelimit import backoff_delay, default_registry
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+
+def parse_retry_after(response):
+    """Return the Retry-After header in seconds, if it is a number"""
+    value = response.headers.get('Retry-After')
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def is_transient(error):
+    """True for request errors another attempt may get past: timeouts, connection errors, 429s and 5xx
+
+    An open circuit is not: it fails the same way until the breaker's cooldown is over.
+    """
+    if isinstance(error, CircuitOpenError):
+        return False
+    if isinstance(error, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)):
+        return True
+    response = getattr(error, 'response', None)
+    return response is not None and (response.status_code == 429 or response.status_code >= 500)
+
+
+def call_with_retries(fetch, retries=3, base=1.0, cap=30.0):
+    """Return fetch(), calling it again after a backoff_delay pause while it fails with a transient error
+
+    Any other error (a 404, a bad URL), and the last transient one, is raised
+    at once. The pause comes on top of the host's rate limiter, which only
+    slows down for errors the host is to blame for.
+    """
+    for attempt in range(retries):
+        try:
+            return fetch()
+        except requests.exceptions.RequestException as e:
+            if attempt == retries - 1 or not is_transient(e):
+                raise
+            print(f"⚠️  {type(e).__name__}, retry {attempt + 2}/{retries}...", end=" ")
+            time.sleep(backoff_delay(attempt, base, cap))
+
+
+class CrawlSession(requests.Session):
+    """requests.Session that paces, backs off and breaks circuits per host and caches pages"""
+
+    def __init__(self, limiters=None, cache=None, breakers=None, metrics=None, archive=None):
+        super().__init__()
+        self.headers.update({'User-Agent': USER_AGENT})
+        self.limiters = limiters or default_registry
+        self.breakers = breakers or default_breakers
+        self.metrics = metrics or default_metrics
+        self.cache = cache
+        self.archive = archive
+
+    def request(self, method, url, *args, **kwargs):
+        response = self._request(method, url, *args, **kwargs)
+        if self.archive is not None and method.upper() == 'GET' and not kwargs.get('stream'):
+            self.archive.record(url, response)
+        return response
+
+    def _request(self, method, url, *args, **kwargs):
+        entry = None
+        if self.cache is not None and method.upper() == 'GET' and not kwargs.get('stream'):
+            entry = self.cache.lookup(url)
+            if entry is not None and self.cache.is_fresh(entry):
+                self.cache.hits += 1
+                self.metrics.observe_cache_hit(url)
+                return self.cache.build_response(entry)
+            if entry is not None:
+                kwargs['headers'] = dict(kwargs.get('headers') or {}, **self.cache.conditional_headers(entry))
+
+        response = self._send_paced(method, url, *args, **kwargs)
+        if not kwargs.get('stream'):
+            self.metrics.observe_bytes(url, len(response.content))
+
+        if entry is not None and response.status_code == 304:
+            self.cache.revalidated += 1
+            self.cache.touch(entry)
+            return self.cache.build_response(entry, response.request)
+        if self.cache is not None and method.upper() == 'GET' and not kwargs.get('stream'):
+            self.cache.misses += 1
+            if response.status_code == 200:
+                self.cache.store(url, response)
+        return response
+
+    def get_until(self, url, done, timeout=None, chunk_size=16384, key=None):
+        """Stream a page, reading only until done(text_so_far) is true
+
+        Returns (text, complete). The connection is closed as soon as done
+        says so. Fresh cache entries are used as is and pages read to the
+        end are cached like a plain GET. With a key naming the watch (see
+        PageStore.text_until), a page cut short is cached as the prefix
+        read so far under "<url>#until=<key>", and later calls with the
+        same key reuse and revalidate that prefix like a whole page (the
+        watch already said it was enough). With an archive every
+        page is read to the end, so the capture is complete for other
+        parsers.
+        """
+        response = self._get_until(url, done, timeout, chunk_size, key)
+        if isinstance(response, tuple):
+            return response
+        if self.archive is not None:
+            self.archive.record(url, response)
+        return response.text, True
+
+    def _cached(self, entry, prefix_url, request=None):
+        """A cached whole page as a response, or a cached prefix as (text, False)"""
+        response = self.cache.build_response(entry, request)
+        return (response.text, False) if entry.url == prefix_url else response
+
+    def _get_until(self, url, done, timeout, chunk_size, key):
+        """(text, False) if done cut the page short, else the whole response"""
+        entry = None
+        headers = {}
+        prefix_url = f"{url}#until={key}" if key and self.archive is None else None
+        if self.cache is not None:
+            entry = self.cache.lookup(url)
+            prefix = self.cache.lookup(prefix_url) if prefix_url else None
+            if prefix is not None and (entry is None or prefix.stored_at > entry.stored_at):
+                entry = prefix  # the page was last fetched cut short
+            if entry is not None and self.cache.is_fresh(entry):
+                self.cache.hits += 1
+                self.metrics.observe_cache_hit(url)
+                return self._cached(entry, prefix_url)
+            if entry is not None:
+                headers = self.cache.conditional_headers(entry)
+
+        response = self._send_paced('GET', url, stream=True, timeout=timeout, headers=headers)
+        with response:
+            if entry is not None and response.status_code == 304:
+                self.cache.revalidated += 1
+                self.cache.touch(entry)
+                return self._cached(entry, prefix_url, response.request)
+            response.raise_for_status()
+
+            try:
+                decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+            except LookupError:
+                decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+            chunks = []
+            parts = []
+            try:
+                for chunk in response.iter_content(chunk_size):
+                    chunks.append(chunk)
+                    parts.append(decoder.decode(chunk))
+                    if self.archive is None and done(''.join(parts)):
+                        if self.cache is not None and prefix_url and response.status_code == 200:
+                            self.cache.misses += 1
+                            response._content = b''.join(chunks)
+                            self.cache.store(prefix_url, response)
+                        return ''.join(parts), False
+            finally:
+                self.metrics.observe_bytes(url, sum(map(len, chunks)))
+            response._content = b''.join(chunks)
+
+        if self.cache is not None:
+            self.cache.misses += 1
+            if response.status_code == 200:
+                self.cache.store(url, response)
+        return response
+
+    def _send_paced(self, method, url, *args, **kwargs):
+        """Send a request once the host's breaker and limiter allow it"""
+        breaker = self.breakers.for_url(url)
+        breaker.before_request()
+        limiter = self.limiters.for_url(url)
+        self.metrics.observe_wait(url, limiter.acquire())
+        started = time.perf_counter()
+        try:
+            response = super().request(method, url, *args, **kwargs)
+        except requests.exceptions.RequestException as e:
+            self.metrics.observe_request(url, type(e).__name__, time.perf_counter() - started)
+            if isinstance(e, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)):
+                limiter.on_error()
+                breaker.on_failure(type(e).__name__)
+            else:
+                breaker.release()  # e.g. a bad URL or too many redirects: the host is not at fault
+            raise
+        except BaseException:
+            breaker.release()
+            raise
+        self.metrics.observe_request(url, response.status_code, time.perf_counter() - started)
+
+        if response.status_code == 429 or response.status_code >= 500:
+            limiter.on_error(parse_retry_after(response))
+            breaker.on_failure(f"HTTP {response.status_code}")
+        else:
+            limiter.on_success()
+            breaker.on_success()
+        return response
+
+
+class ReplaySession(CrawlSession):
+    """CrawlSession that answers every request from a WARC archive, with no network
+
+    URLs that were never captured fail with a ConnectionError, like a page
+    that could not be reached.
+    """
+
+    def __init__(self, directory='warc', **kwargs):
+        super().__init__(**kwargs)
+        self.warc = WarcArchive(directory)
+        self.replayed = 0
+        self.missing = 0
+
+    def _send_paced(self, method, url, *args, **kwargs):
+        started = time.perf_counter()
+        capture = self.warc.read(url)
+        if capture is None:
+            self.missing += 1
+            self.metrics.observe_request(url, 'NotArchived', time.perf_counter() - started)
+            raise requests.exceptions.ConnectionError(f"{url} is not in the WARC archive {self.warc.directory}")
+
+        status, headers, body = capture
+        response = requests.Response()
+        response.status_code = status
+        response.reason = REASONS.get(status, '')
+        response.headers = headers
+        response.url = url
+        response.encoding = requests.utils.get_encoding_from_headers(headers)
+        response.request = requests.Request(method, url).prepare()
+        response._content = body
+        response._content_consumed = True
+        self.replayed += 1
+        self.metrics.observe_request(url, status, time.perf_counter() - started)
+        return response
+
+    def summary(self):
+        """One-line replay summary"""
+        return f"{self.replayed} pages replayed from {self.warc.directory}, {self.missing} not in the archive"
+
+
+def build_session():
+    """Create the session used by the extractors
+
+    The response cache lives in CRAWL_CACHE_DIR (default .crawl_cache) and
+    can be turned off with CRAWL_CACHE=off.
+
+    Metrics are written to CRAWL_METRICS_DIR (default .crawl_metrics) as
+    <script>.prom, refreshed every CRAWL_METRICS_INTERVAL seconds (default
+    15), and <script>_summary.json at exit. CRAWL_METRICS=off turns the
+    files off.
+
+    CRAWL_WARC_DIR captures every fetched page to WARC files in that
+    directory. CRAWL_REPLAY=<directory> replays such a capture instead of
+    using the network (and the cache).
+    """
+    cache = None
+    if os.getenv('CRAWL_CACHE', 'on').lower() not in ('0', 'off', 'false', 'no'):
+        cache = ResponseCache(os.getenv('CRAWL_CACHE_DIR', '.crawl_cache'))
+    if os.getenv('CRAWL_METRICS', 'on').lower() not in ('0', 'off', 'false', 'no'):
+        directory = os.getenv('CRAWL_METRICS_DIR', '.crawl_metrics')
+        job = os.path.splitext(os.path.basename(sys.argv[0] or 'crawl'))[0] or 'crawl'
+        default_metrics.start_export(os.path.join(directory, f'{job}.prom'),
+                                     os.path.join(directory, f'{job}_summary.json'),
+                                     float(os.getenv('CRAWL_METRICS_INTERVAL', '15')))
+    if os.getenv('CRAWL_REPLAY'):
+        return ReplaySession(os.getenv('CRAWL_REPLAY'))
+    archive = WarcWriter(os.getenv('CRAWL_WARC_DIR')) if os.getenv('CRAWL_WARC_DIR') else None
+    return CrawlSession(cache=cache, archive=archive)
+
+
+def print_run_summary(session, pages):
+    """Print the page cache, page store, metrics and circuit breaker lines that end a crawl"""
+    if session.cache is not None:
+        print(f"🗄️  Page cache: {session.cache.summary()}")
+    print(f"♻️  Page store: {pages.summary()}")
+    print(f"📊 Metrics: {session.metrics.summary()}")
+    for event in session.breakers.summary_lines():
+        print(f"🔌 Circuit breaker: {event}")
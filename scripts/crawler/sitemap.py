@@ -0,0 +1,187 @@
+"""
+Sitemap-driven discovery of the show/season/episode tree.
+
+WorthCrete is a WordPress site, so every page is listed in its XML
+sitemaps. Streaming the sitemap index and its child sitemaps yields the
+whole catalogue in a few dozen requests instead of walking paginated
+category pages, show pages and season pages. Each <url> is classified
+with the same season/episode patterns the extractors use, and its
+<lastmod> lets a crawl pick only the pages changed since the last run.
+
+Sitemaps are fetched with plain GETs through the session, so they are
+cached, archived and replayed like any other page. A sitemap that cannot
+be fetched or parsed is skipped and listed in `failed`.
+
+For local testing, serve the fixture sitemaps (their sitemap URLs are
+relative, so any host and port works) and point discovery at it:
+
+    python -m http.server 8000 -d scripts/fixtures/sitemap
+    SitemapDiscovery(build_session(), "http://127.0.0.1:8000/").discover()
+
+scripts/tests/test_sitemap.py does the same on an ephemeral port.
+"""
+
+import gzip
+import io
+from datetime import datetime, timezone
+from urllib.parse import urljoin, urlparse
+from xml.etree.ElementTree import ParseError, iterparse
+
+import requests
+
+from .urls import classify_url
+
+SITEMAP_CANDIDATES = ['sitemap_index.xml', 'wp-sitemap.xml', 'sitemap.xml']
+CATEGORY_PREFIX = '/literature/seasons/'
+
+
+def parse_lastmod(value):
+    """Parse a sitemap <lastmod> into an aware datetime, None if missing or invalid"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def parent_url(url):
+    """URL of the page one path segment up (episode -> season -> show)"""
+    parsed = urlparse(url)
+    segments = parsed.path.rstrip('/').split('/')
+    return f"{parsed.scheme}://{parsed.netloc}{'/'.join(segments[:-1])}/"
+
+
+def category_slug(url):
+    """Category slug of a worthcrete URL (e.g. 'english-seasons')"""
+    path = urlparse(url).path
+    if not path.startswith(CATEGORY_PREFIX):
+        return None
+    return path[len(CATEGORY_PREFIX):].split('/')[0] or None
+
+
+class SitemapDiscovery:
+    """Build the show/season/episode tree from a site's XML sitemaps"""
+
+    def __init__(self, session, base_url="https://www.worthcrete.com/", timeout=15):
+        self.session = session
+        self.base_url = base_url
+        self.timeout = timeout
+        self.requests = 0
+        self.failed = []  # sitemap URLs skipped because they could not be fetched or parsed
+
+    def find_sitemaps(self):
+        """Sitemap URLs from robots.txt, falling back to the usual WordPress locations"""
+        robots_url = urljoin(self.base_url, 'robots.txt')
+        try:
+            response = self.session.get(robots_url, timeout=self.timeout)
+            self.requests += 1
+            if response.status_code == 200:
+                sitemaps = [urljoin(robots_url, line.split(':', 1)[1].strip()) for line in response.text.splitlines()
+                            if line.lower().startswith('sitemap:')]
+                if sitemaps:
+                    return sitemaps
+        except Exception as e:
+            print(f"⚠️  Could not read robots.txt: {e}")
+
+        for candidate in SITEMAP_CANDIDATES:
+            url = urljoin(self.base_url, candidate)
+            try:
+                response = self.session.head(url, timeout=self.timeout, allow_redirects=True)
+            except requests.exceptions.RequestException as e:
+                print(f"⚠️  Could not check {url}: {e}")
+                continue
+            finally:
+                self.requests += 1
+            if response.status_code == 200:
+                return [url]
+        return []
+
+    def iter_sitemap(self, sitemap_url, seen=None):
+        """Stream (loc, lastmod) for every page in a sitemap, following index entries"""
+        seen = seen if seen is not None else set()
+        if sitemap_url in seen:
+            return
+        seen.add(sitemap_url)
+
+        try:
+            response = self.session.get(sitemap_url, timeout=self.timeout)
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            print(f"⚠️  Skipping sitemap {sitemap_url}: {e}")
+            self.failed.append(sitemap_url)
+            return
+        finally:
+            self.requests += 1
+        body = response.content
+        if body[:2] == b'\x1f\x8b':  # a .xml.gz file served as is
+            body = gzip.decompress(body)
+
+        children = []
+        loc = lastmod = None
+        try:
+            for _, element in iterparse(io.BytesIO(body), events=('end',)):
+                tag = element.tag.rsplit('}', 1)[-1]
+                if tag == 'loc':
+                    loc = (element.text or '').strip()
+                elif tag == 'lastmod':
+                    lastmod = element.text
+                elif tag == 'url':
+                    if loc:
+                        yield loc, parse_lastmod(lastmod)
+                    loc = lastmod = None
+                    element.clear()
+                elif tag == 'sitemap':
+                    if loc:
+                        children.append(urljoin(sitemap_url, loc))
+                    loc = lastmod = None
+                    element.clear()
+        except (ParseError, OSError) as e:
+            # Malformed XML or a corrupt .gz: keep what was read before it
+            print(f"⚠️  Could not parse sitemap {sitemap_url}: {e}")
+            self.failed.append(sitemap_url)
+
+        for child in children:
+            yield from self.iter_sitemap(child, seen)
+
+    def discover(self, sitemap_urls=None):
+        """Return {category_slug: {show_url: {'lastmod', 'seasons': {season_url: {'lastmod', 'episodes'}}}}}"""
+        tree = {}
+        sitemap_urls = sitemap_urls or self.find_sitemaps()
+        seen = set()
+
+        def show_node(show_url):
+            category = category_slug(show_url)
+            shows = tree.setdefault(category, {})
+            return shows.setdefault(show_url, {'lastmod': None, 'seasons': {}})
+
+        def season_node(season_url):
+            seasons = show_node(parent_url(season_url))['seasons']
+            return seasons.setdefault(season_url, {'lastmod': None, 'episodes': {}})
+
+        for sitemap_url in sitemap_urls:
+            for loc, lastmod in self.iter_sitemap(sitemap_url, seen):
+                if not category_slug(loc):
+                    continue
+                kind = classify_url(loc)
+                if kind == 'episode':
+                    season_node(parent_url(loc))['episodes'][loc] = lastmod
+                elif kind == 'season':
+                    season_node(loc)['lastmod'] = lastmod
+                elif kind == 'show':
+                    show_node(loc)['lastmod'] = lastmod
+
+        return tree
+
+    @staticmethod
+    def changed_episodes(show, since):
+        """Episode URLs of a show node modified after `since` (all of them if since is None)"""
+        changed = []
+        for season in show['seasons'].values():
+            for episode_url, lastmod in season['episodes'].items():
+                if since is None or lastmod is None or lastmod > since:
+                    changed.append(episode_url)
+        return changed
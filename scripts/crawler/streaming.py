@@ -0,0 +1,76 @@
+"""
+Watches that decide when a streamed episode page can stop downloading.
+
+A watch is called with the decoded page prefix after every chunk and
+returns True once the rest of the page can no longer change what the
+extractor would return. The extractor then runs on the prefix and the
+connection is closed. Pages where that point is never reached are read
+to the end, so a watch only ever saves bytes, never changes a result.
+
+Each watch remembers how far it has scanned, so a page is searched once
+overall rather than once per chunk. PageStore.scan takes the class and
+creates a new watch for every fetch.
+"""
+
+import re
+
+from . import parsing
+from .detectors import PLAYER_IFRAME_RE
+
+IFRAME_OPEN_RE = re.compile(r'<iframe\b', re.I)
+# A complete opening tag; quoted attribute values may contain '>'
+IFRAME_TAG_RE = re.compile(r'<iframe\b(?:[^>"\']|"[^"]*"|\'[^\']*\')*>', re.I)
+
+# The first Drive ID pattern with the ID followed by a character that ends it
+DRIVE_FILE_RE = re.compile(r'drive\.google\.com/file/d/[a-zA-Z0-9_-]+(?=[^a-zA-Z0-9_-])', re.I)
+
+
+class PlayerIframeWatch:
+    """Done once a complete player <iframe> tag has arrived
+
+    extract_video_source returns the first iframe whose src names a known
+    player before looking at <video> tags or regex fallbacks, so nothing
+    after that iframe matters. <video> tags and the fallbacks are never
+    definitive on their own, since a player iframe further down would win.
+    """
+
+    def __init__(self):
+        self.scanned = 0
+
+    def __call__(self, text):
+        while True:
+            opening = IFRAME_OPEN_RE.search(text, self.scanned)
+            if opening is None:
+                # Keep a partial '<iframe' at the end of the prefix in range
+                self.scanned = max(self.scanned, len(text) - len('<iframe'))
+                return False
+            tag = IFRAME_TAG_RE.match(text, opening.start())
+            if tag is None:
+                # Wait for the rest of the tag
+                self.scanned = opening.start()
+                return False
+            self.scanned = tag.end()
+            if PLAYER_IFRAME_RE.search(tag.group()):
+                # Confirm with the parser: the tag may sit in a comment or script
+                iframe_srcs, _ = parsing.find_players(text[:tag.end()])
+                if any(PLAYER_IFRAME_RE.search(src) for src in iframe_srcs):
+                    return True
+
+
+class DriveLinkWatch:
+    """Done once a complete drive.google.com/file/d/<id> link has arrived
+
+    That is the top-priority Drive ID pattern, so the leftmost complete
+    match is the ID extract_google_drive_id returns for the whole page.
+    """
+
+    def __init__(self, overlap=256):
+        self.overlap = overlap
+        self.scanned = 0
+
+    def __call__(self, text):
+        if DRIVE_FILE_RE.search(text, self.scanned):
+            return True
+        # A link cut off by the chunk boundary is found again next time
+        self.scanned = max(self.scanned, len(text) - self.overlap)
+        return False
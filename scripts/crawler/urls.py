@@ -0,0 +1,152 @@
+"""
+Parsing of worthcrete URLs into the page kinds the crawl walks.
+
+parse_url reads a URL once into a WorthCreteUrl record (page kind,
+category, show slug, language, season and episode numbers) and keeps the
+most recent records in an LRU cache, so the link filters, dedupe and
+sort keys that look at the same href several times per page, and the
+cache, metrics and inventory that see it again later, share one parse.
+
+The page kind comes from the URL path. Season and episode numbers are
+read from the whole URL, as the extractors always have:
+
+    .../english-seasons/                                    category
+    .../<show>-online-english/                              show
+    .../<show>-seasons-2-online-english/                    season 2
+    .../<show>-seasons-2-episode-5-online-english/          season 2, episode 5
+"""
+
+import re
+from functools import lru_cache
+from urllib.parse import urljoin
+
+SHOW_RE = re.compile(r'/[^/]+-online-[^/]+/?$')
+CATEGORY_RE = re.compile(r'/literature/seasons/[^/]+/?$')
+
+EPISODE_NUM_RE = re.compile(r'episode[s]?-(\d+)')
+SEASON_NUM_RE = re.compile(r'season[s]?-(\d+)')
+CATEGORY_SLUG_RE = re.compile(r'/literature/seasons/([^/]+)')
+SHOW_SUFFIX_RE = re.compile(r'-seasons?-\d+(?:-episodes?-\d+)?$')
+PATH_RE = re.compile(r'^(?:[a-z][a-z0-9+.-]*:)?(?://[^/?#]*)?([^?#]*)')
+# Absolute http(s) URLs with a host and nothing urljoin would rewrite
+PLAIN_ABSOLUTE_RE = re.compile(r'https?://[^/?#;\[\]\s]+(?:/[^?#;\s]*)?\Z')
+
+URL_CLASSES = ('category', 'show', 'season', 'episode', 'other')
+
+
+class WorthCreteUrl:
+    """One URL read into its page kind and the parts the crawl sorts and matches on"""
+
+    __slots__ = ('url', 'kind', 'category', 'show', 'language', 'season', 'episode')
+
+    def __init__(self, url, kind, category, show, language, season, episode):
+        self.url = url
+        self.kind = kind
+        self.category = category
+        self.show = show
+        self.language = language
+        self.season = season
+        self.episode = episode
+
+    @property
+    def key(self):
+        """Identity of a show, season or episode page whatever the host, case or trailing slash"""
+        if self.kind in ('show', 'season', 'episode') and self.show:
+            return (self.kind, self.category, self.show, self.language, self.season, self.episode)
+        return self.url
+
+    def __repr__(self):
+        return (f"WorthCreteUrl({self.kind}, category={self.category}, show={self.show}, "
+                f"language={self.language}, season={self.season}, episode={self.episode})")
+
+
+def _search_path(pattern, lowered, match, start, end):
+    """pattern's first match within the path, reusing the whole-URL match when it falls there"""
+    if match is None:
+        return None
+    if start <= match.start() and match.end() <= end:
+        return match
+    return pattern.search(lowered, start, end)
+
+
+@lru_cache(maxsize=1 << 16)
+def parse_url(url):
+    """Parse a URL (absolute or relative) into a WorthCreteUrl"""
+    lowered = url.lower()
+    start, end = PATH_RE.match(lowered).span(1)
+    season_match = SEASON_NUM_RE.search(lowered)
+    episode_match = EPISODE_NUM_RE.search(lowered)
+
+    if _search_path(EPISODE_NUM_RE, lowered, episode_match, start, end):
+        kind = 'episode'
+    elif _search_path(SEASON_NUM_RE, lowered, season_match, start, end):
+        kind = 'season'
+    elif SHOW_RE.search(lowered, start, end):
+        kind = 'show'
+    elif CATEGORY_RE.search(lowered, start, end):
+        kind = 'category'
+    else:
+        kind = 'other'
+
+    match = CATEGORY_SLUG_RE.search(lowered, start, end)
+    category = match.group(1) if match else None
+    show = language = None
+    online = lowered.find('-online-', start, end)
+    if online >= 0:
+        # The first path segment with -online- in it, less any -seasons-N-episode-M
+        segment_start = max(start, lowered.rfind('/', start, online) + 1)
+        segment_end = lowered.find('/', online, end)
+        show = SHOW_SUFFIX_RE.sub('', lowered[segment_start:online]) or None
+        language = lowered[online + 8:end if segment_end < 0 else segment_end] or None
+    return WorthCreteUrl(url, kind, category, show, language,
+                         int(season_match.group(1)) if season_match else None,
+                         int(episode_match.group(1)) if episode_match else None)
+
+
+@lru_cache(maxsize=1 << 16)
+def absolute_url(base_url, href):
+    """urljoin(base_url, href), cached alongside the parses
+
+    Plain absolute links, which most hrefs on the site are, come back from
+    urljoin unchanged, so they skip it.
+    """
+    if href.isascii() and PLAIN_ABSOLUTE_RE.match(href):
+        return href
+    return urljoin(base_url, href)
+
+
+def classify_url(url):
+    """Return 'category', 'show', 'season', 'episode' or 'other' for a URL"""
+    return parse_url(url).kind
+
+
+def season_number(url):
+    """Season number in a URL, None if it has none"""
+    return parse_url(url).season
+
+
+def episode_number(url):
+    """Episode number in a URL, None if it has none"""
+    return parse_url(url).episode
+
+
+def season_links(hrefs, base_url):
+    """Absolute URLs of the season pages among hrefs, one per season page, sorted by season number"""
+    seasons = {}
+    for href in hrefs:
+        link = parse_url(href)
+        if link.kind == 'season' and link.key not in seasons:
+            seasons[link.key] = (link.season, absolute_url(base_url, href))
+    return [url for _, url in sorted(seasons.values(), key=lambda x: x[0])]
+
+
+def episode_links(hrefs, season, base_url):
+    """Absolute URLs of one season's episode pages among hrefs, one per episode, sorted by episode number"""
+    episodes = {}
+    for href in hrefs:
+        if 'episode' not in href.lower():
+            continue  # cannot have an episode number, no need to parse it
+        link = parse_url(href)
+        if link.episode and link.season == season and link.key not in episodes:
+            episodes[link.key] = (link.episode, absolute_url(base_url, href))
+    return [url for _, url in sorted(episodes.values(), key=lambda x: x[0])]
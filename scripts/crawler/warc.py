@@ -0,0 +1,197 @@
+"""
+WARC capture of fetched pages and offline replay.
+
+WarcWriter appends every response a CrawlSession returns to gzipped WARC
+files (one gzip member per record, so each record can be read on its
+own) and indexes it in a SQLite table keyed by URL: file, offset and
+length of the latest capture. A page whose body has not changed since
+its last capture is not written again.
+
+WarcArchive reads a capture back with one index lookup, one seek and
+one gzip member. session.ReplaySession serves requests from it, so any
+extractor can be run again over the captured pages after a parser fix.
+
+Bodies are stored decoded (requests has already undone any
+Content-Encoding), so Content-Encoding and Transfer-Encoding are dropped
+from the stored headers and Content-Length is set to the stored body.
+
+Capture a crawl, then re-extract it offline after a parser change:
+
+    CRAWL_WARC_DIR=warc python scripts/universalv6.py
+    CRAWL_REPLAY=warc python scripts/universalv6.py    (option 2, force)
+"""
+
+import base64
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.client import responses as REASONS
+
+from requests.structures import CaseInsensitiveDict
+
+SKIPPED_HEADERS = {'content-encoding', 'transfer-encoding', 'content-length'}
+
+
+def _warc_date(at=None):
+    return datetime.fromtimestamp(at or time.time(), timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _record(warc_type, headers, block):
+    """One WARC record, gzipped on its own"""
+    lines = [b'WARC/1.1', f'WARC-Type: {warc_type}'.encode(),
+             f'WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>'.encode(), f'WARC-Date: {_warc_date()}'.encode()]
+    lines += [f'{name}: {value}'.encode() for name, value in headers]
+    lines.append(f'Content-Length: {len(block)}'.encode())
+    return gzip.compress(b'\r\n'.join(lines) + b'\r\n\r\n' + block + b'\r\n\r\n')
+
+
+def _payload_digest(body):
+    return 'sha1:' + base64.b32encode(hashlib.sha1(body).digest()).decode()
+
+
+def _open_index(path):
+    db = sqlite3.connect(path, check_same_thread=False)
+    db.execute('PRAGMA journal_mode=WAL')
+    db.executescript('''
+        CREATE TABLE IF NOT EXISTS captures (
+            url TEXT PRIMARY KEY,
+            filename TEXT NOT NULL,
+            offset INTEGER NOT NULL,
+            length INTEGER NOT NULL,
+            status INTEGER NOT NULL,
+            digest TEXT NOT NULL,
+            captured_at REAL NOT NULL
+        );
+    ''')
+    db.commit()
+    return db
+
+
+class WarcWriter:
+    """Append responses to rotating .warc.gz files in a directory and index them"""
+
+    def __init__(self, directory='warc', prefix='worthcrete', max_size=1024 ** 3):
+        self.directory = directory
+        self.prefix = prefix
+        self.max_size = max_size
+        self.written = 0
+        self.unchanged = 0
+        os.makedirs(directory, exist_ok=True)
+        self._db = _open_index(os.path.join(directory, 'index.db'))
+        self._lock = threading.Lock()
+        self._file = None
+        self._filename = None
+        self._serial = 0
+
+    def _roll(self):
+        """Start a new WARC file, beginning with a warcinfo record"""
+        if self._file is not None:
+            self._file.close()
+        self._serial += 1
+        self._filename = (f"{self.prefix}-{datetime.now(timezone.utc):%Y%m%d%H%M%S}-{os.getpid()}-"
+                          f"{self._serial:05d}.warc.gz")
+        self._file = open(os.path.join(self.directory, self._filename), 'ab')
+        info = 'software: worthcrete-extractors\r\nformat: WARC File Format 1.1\r\n'.encode()
+        self._file.write(_record('warcinfo', [('WARC-Filename', self._filename),
+                                              ('Content-Type', 'application/warc-fields')], info))
+
+    def record(self, url, response):
+        """Capture a response under the requested URL (and its final URL after redirects)"""
+        body = response.content or b''
+        digest = _payload_digest(body)
+        urls = {url, response.url or url}
+        with self._lock:
+            known = {row[0] for row in self._db.execute(
+                f"SELECT url FROM captures WHERE digest = ? AND url IN ({','.join('?' * len(urls))})",
+                (digest, *urls))}
+            if known == urls:
+                self.unchanged += 1
+                return
+
+            reason = response.reason or REASONS.get(response.status_code, '')
+            head = [f'HTTP/1.1 {response.status_code} {reason}'.encode()]
+            head += [f'{name}: {value}'.encode('latin-1', 'replace') for name, value in response.headers.items()
+                     if name.lower() not in SKIPPED_HEADERS]
+            head.append(f'Content-Length: {len(body)}'.encode())
+            block = b'\r\n'.join(head) + b'\r\n\r\n' + body
+            data = _record('response', [('WARC-Target-URI', response.url or url), ('WARC-Payload-Digest', digest),
+                                        ('Content-Type', 'application/http;msgtype=response')], block)
+
+            if self._file is None or self._file.tell() + len(data) > self.max_size:
+                self._roll()
+            offset = self._file.tell()
+            self._file.write(data)
+            self._file.flush()
+            now = time.time()
+            self._db.executemany('INSERT OR REPLACE INTO captures VALUES (?, ?, ?, ?, ?, ?, ?)',
+                                 [(u, self._filename, offset, len(data), response.status_code, digest, now)
+                                  for u in urls])
+            self._db.commit()
+            self.written += 1
+
+    def summary(self):
+        """One-line capture summary"""
+        return (f"{self.written} responses written to {self.directory}, "
+                f"{self.unchanged} unchanged pages not written again")
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class WarcArchive:
+    """Read captured responses from a WarcWriter directory by URL"""
+
+    def __init__(self, directory='warc'):
+        path = os.path.join(directory, 'index.db')
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No WARC index at {path}")
+        self.directory = directory
+        self._db = _open_index(path)
+        self._files = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute('SELECT COUNT(*) FROM captures').fetchone()[0]
+
+    def __contains__(self, url):
+        with self._lock:
+            return self._db.execute('SELECT 1 FROM captures WHERE url = ?', (url,)).fetchone() is not None
+
+    def read(self, url):
+        """(status, headers, body) of the latest capture of a URL, None if it was never captured"""
+        with self._lock:
+            row = self._db.execute('SELECT filename, offset, length FROM captures WHERE url = ?', (url,)).fetchone()
+            if row is None:
+                return None
+            filename, offset, length = row
+            if filename not in self._files:
+                self._files[filename] = open(os.path.join(self.directory, filename), 'rb')
+            f = self._files[filename]
+            f.seek(offset)
+            data = gzip.decompress(f.read(length))
+
+        # The WARC headers end at the first blank line; their Content-Length is the HTTP response's
+        warc_head, _, rest = data.partition(b'\r\n\r\n')
+        block_length = int(warc_head.rsplit(b'Content-Length:', 1)[1].split(b'\r\n', 1)[0])
+        head, _, body = rest[:block_length].partition(b'\r\n\r\n')
+        status_line, *header_lines = head.decode('latin-1').split('\r\n')
+        headers = CaseInsensitiveDict()
+        for line in header_lines:
+            name, _, value = line.partition(':')
+            headers[name.strip()] = value.strip()
+        return int(status_line.split()[1]), headers, body
+
+    def close(self):
+        with self._lock:
+            for f in self._files.values():
+                f.close()
+            self._files.clear()
@@ -1,23 +1,19 @@
 import re
 import requests
-from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 import json
-import time
+
+from crawler import CircuitOpenError, PageStore, build_session, call_with_retries, detectors, pagination, parsing, print_run_summary, urls
 
 class NonDriveVideoExtractor:
-    def __init__(self, base_url="https://www.worthcrete.com"):
+    def __init__(self, base_url="https://www.worthcrete.com", session=None):
         self.base_url = base_url
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        })
+        self.session = session or build_session()
+        self.pages = PageStore(self.session)
     
     def is_google_drive_url(self, url):
         """Check if URL is a Google Drive link"""
-        if not url:
-            return False
-        return 'drive.google.com' in url.lower()
+        return detectors.is_google_drive_url(url)
     
     def has_non_drive_videos_quick_check(self, html_content):
         """Quick check if HTML contains non-Drive video indicators"""
@@ -44,120 +40,46 @@ class NonDriveVideoExtractor:
     
     def extract_video_urls(self, html_content):
         """Extract non-Drive video URLs from HTML content"""
-        video_urls = []
-        
-        # Patterns for different video sources
-        patterns = {
-            'mega': r'https?://mega\.nz/[^\s\'"<>]+',
-            'direct_video': r'https?://[^\s\'"<>]+\.(mp4|m3u8|webm|mkv|avi|mov)(?:\?[^\s\'"<>]*)?',
-            'iframe_src': r'<iframe[^>]+src=["\']([^"\']+)["\']',
-            'video_src': r'<video[^>]+src=["\']([^"\']+)["\']',
-            'source_src': r'<source[^>]+src=["\']([^"\']+)["\']',
-        }
-        
-        for pattern_name, pattern in patterns.items():
-            matches = re.findall(pattern, html_content, re.IGNORECASE)
-            for match in matches:
-                url = match[0] if isinstance(match, tuple) else match
-                
-                if self.is_google_drive_url(url):
-                    continue
-                
-                skip_domains = ['google.com', 'facebook.com', 'twitter.com', 'instagram.com', 
-                               'youtube.com', 'doubleclick.net', 'googletagmanager.com']
-                if any(domain in url.lower() for domain in skip_domains):
-                    continue
-                
-                video_urls.append({
-                    'url': url,
-                    'type': pattern_name
-                })
-        
-        return video_urls
+        return detectors.extract_video_urls(html_content)
     
     def extract_season_number(self, url):
         """Extract season number from URL"""
-        match = re.search(r'season[s]?-(\d+)', url.lower())
-        if match:
-            return int(match.group(1))
-        return None
+        return urls.season_number(url)
     
     def get_episode_links_from_season_page(self, season_url):
         """Extract all episode links from a season page"""
         try:
-            response = self.session.get(season_url, timeout=15)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
+            response = self.pages.get(season_url)
             current_season_num = self.extract_season_number(season_url)
             
             if current_season_num is None:
                 print("⚠️  Could not determine season number from URL")
                 return []
             
-            episode_links = []
-            
-            for link in soup.find_all('a', href=True):
-                href = link['href']
-                
-                if 'episode' not in href.lower():
-                    continue
-                
-                episode_season_num = self.extract_season_number(href)
-                
-                if episode_season_num == current_season_num:
-                    full_url = urljoin(self.base_url, href)
-                    episode_links.append(full_url)
-            
-            episode_links = sorted(list(set(episode_links)))
-            
-            return episode_links
+            # Episodes of the current season, once each, sorted by episode number
+            return urls.episode_links(parsing.iter_hrefs(response.content), current_season_num, self.base_url)
         
         except Exception as e:
             print(f"❌ Error fetching season page: {e}")
             return []
     
     def extract_video_links_from_episode(self, episode_url, retries=3):
-        """Extract non-Drive video links from an episode page"""
-        for attempt in range(retries):
-            try:
-                response = self.session.get(episode_url, timeout=15)
-                response.raise_for_status()
-                
-                video_urls = self.extract_video_urls(response.text)
-                
-                if video_urls:
-                    unique_urls = []
-                    seen = set()
-                    for video in video_urls:
-                        if video['url'] not in seen:
-                            seen.add(video['url'])
-                            unique_urls.append(video)
-                    return unique_urls
-                
-                if attempt == retries - 1:
-                    print(f"\n⚠️  No non-Drive video URLs found")
-                return []
-            
-            except requests.exceptions.Timeout:
-                if attempt < retries - 1:
-                    print(f"⏱️  Timeout, retry {attempt + 2}/{retries}...", end=" ")
-                    time.sleep(3)
-                else:
-                    print(f"❌ Timeout after {retries} attempts")
-                    return []
-            
-            except requests.exceptions.RequestException as e:
-                if attempt < retries - 1:
-                    print(f"⚠️  Error, retry {attempt + 2}/{retries}...", end=" ")
-                    time.sleep(3)
-                else:
-                    print(f"❌ Failed: {str(e)[:50]}")
-                    return []
+        """Extract non-Drive video links from an episode page, retrying timeouts, connection errors and 5xx"""
+        try:
+            video_urls = call_with_retries(lambda: self.pages.parse(
+                episode_url, 'video_urls', lambda response: self.extract_video_urls(response.text)), retries)
+        except CircuitOpenError as e:
+            print(f"🔌 {e}")
+            return []
+        except requests.exceptions.RequestException as e:
+            print(f"❌ Failed: {str(e)[:50]}")
+            return []
         
-        return []
+        if not video_urls:
+            print(f"\n⚠️  No non-Drive video URLs found")
+        return video_urls or []
     
-    def extract_season(self, season_url, delay=2, check_first_only=False):
+    def extract_season(self, season_url, check_first_only=False):
         """Extract all non-Drive video links from a season"""
         print(f"\n🔍 Extracting season from: {season_url}")
         print("=" * 80)
@@ -170,8 +92,7 @@ class NonDriveVideoExtractor:
         if check_first_only:
             try:
                 print(f"🔍 Quick check: Fetching season page...")
-                response = self.session.get(season_url, timeout=15)
-                response.raise_for_status()
+                response = self.pages.get(season_url)
                 
                 # Quick check if this season has non-Drive videos
                 if not self.has_non_drive_videos_quick_check(response.text):
@@ -181,20 +102,10 @@ class NonDriveVideoExtractor:
                     print(f"✓ Found non-Drive video indicators, proceeding...")
                 
                 # Use the already-fetched HTML to get episode links
-                soup = BeautifulSoup(response.content, 'html.parser')
                 current_season_num = self.extract_season_number(season_url)
                 
-                episode_links = []
-                for link in soup.find_all('a', href=True):
-                    href = link['href']
-                    if 'episode' not in href.lower():
-                        continue
-                    episode_season_num = self.extract_season_number(href)
-                    if episode_season_num == current_season_num:
-                        full_url = urljoin(self.base_url, href)
-                        episode_links.append(full_url)
-                
-                episode_links = sorted(list(set(episode_links)))
+                episode_links = urls.episode_links(parsing.iter_hrefs(response.content), current_season_num,
+                                                   self.base_url)
                 
             except Exception as e:
                 print(f"⚠️  Error in quick check: {e}, falling back to normal method")
@@ -213,7 +124,7 @@ class NonDriveVideoExtractor:
             print(f"🔍 Verifying first episode has extractable non-Drive videos...")
             first_episode_url = episode_links[0]
             
-            # Try to extract non-Drive videos from first episode
+            # Try to extract non-Drive videos from first episode (memoized for the main loop)
             video_links = self.extract_video_links_from_episode(first_episode_url)
             
             if not video_links:
@@ -241,9 +152,6 @@ class NonDriveVideoExtractor:
             else:
                 failed_episodes.append({'episode': i, 'url': episode_url})
                 print(f"✗ No non-Drive videos found")
-            
-            if i < len(episode_links):
-                time.sleep(delay)
         
         print("\n" + "=" * 80)
         print(f"✅ Successfully extracted: {len(results)}/{len(episode_links)} episodes")
@@ -256,27 +164,14 @@ class NonDriveVideoExtractor:
     def get_season_links_from_show_page(self, show_url):
         """Extract all season links from a show's main page"""
         try:
-            response = self.session.get(show_url, timeout=15)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            season_links = []
-            for link in soup.find_all('a', href=True):
-                href = link['href']
-                if re.search(r'season[s]?-\d+', href.lower()) and 'episode' not in href.lower():
-                    full_url = urljoin(self.base_url, href)
-                    season_links.append(full_url)
-            
-            season_links = list(set(season_links))
-            season_links.sort(key=lambda x: self.extract_season_number(x) or 0)
-            
-            return season_links
+            response = self.pages.get(show_url)
+            return urls.season_links(parsing.iter_hrefs(response.content), self.base_url)
         
         except Exception as e:
             print(f"❌ Error fetching show page: {e}")
             return []
     
-    def extract_all_seasons(self, show_main_url, delay=2):
+    def extract_all_seasons(self, show_main_url):
         """Extract all seasons from a show's main page"""
         print(f"\n🎬 Extracting all seasons from: {show_main_url}")
         print("=" * 80)
@@ -295,7 +190,7 @@ class NonDriveVideoExtractor:
         for season_num, season_url in enumerate(season_links, 1):
             print(f"\n{'='*80}")
             print(f"🎯 SEASON {season_num}")
-            results = self.extract_season(season_url, delay)
+            results = self.extract_season(season_url)
             all_results[f"Season {season_num}"] = results
             total_success += len(results)
         
@@ -304,61 +199,47 @@ class NonDriveVideoExtractor:
         print("=" * 80)
         print(f"📊 Total Seasons: {len(season_links)}")
         print(f"✅ Total Episodes with non-Drive videos: {total_success}")
+        print_run_summary(self.session, self.pages)
         
         return all_results
     
+    def parse_show_links(self, html_content):
+        """Parse show links from a category page's HTML"""
+        page_shows = []
+        for href in parsing.iter_hrefs(html_content):
+            # Show links end with -online-something/ and name no season or episode
+            if urls.parse_url(href).kind == 'show':
+                full_url = urljoin(self.base_url, href)
+                # Extract show name from the segment before 'online'
+                segments = href.rstrip('/').split('/')
+                if segments:
+                    last_seg = segments[-1]
+                    show_name = re.sub(r'-online-[^-]+$', '', last_seg).replace('-', ' ').title()
+                    if show_name:
+                        page_shows.append({
+                            'name': show_name,
+                            'url': full_url
+                        })
+        return page_shows
+    
     def get_show_links_from_category(self, category_url):
         """Extract all show links from a category page with pagination support"""
         print(f"🔍 Fetching shows from {category_url} with pagination...")
-        show_links = []
-        page = 1
-        max_pages = 100  # Safety limit
-        
-        while page <= max_pages:
-            page_url = f"{category_url}?pg={page}" if page > 1 else category_url
-            try:
-                print(f"   Processing page {page}...")
-                response = self.session.get(page_url, timeout=15)
-                response.raise_for_status()
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                page_shows = []
-                for link in soup.find_all('a', href=True):
-                    href = link['href']
-                    # Improved regex for show links: ends with -online-something/
-                    if (re.search(r'/[^/]+-online-[^/]+/?$', href) and 
-                        'seasons-' not in href.lower() and 'episode' not in href.lower()):
-                        full_url = urljoin(self.base_url, href)
-                        # Extract show name from the segment before 'online'
-                        segments = href.rstrip('/').split('/')
-                        if segments:
-                            last_seg = segments[-1]
-                            show_name = re.sub(r'-online-[^-]+$', '', last_seg).replace('-', ' ').title()
-                            if show_name:
-                                page_shows.append({
-                                    'name': show_name,
-                                    'url': full_url
-                                })
-                
-                if not page_shows:
-                    print(f"   No more shows on page {page}. Stopping.")
-                    break
-                
-                show_links.extend(page_shows)
-                print(f"   Found {len(page_shows)} shows on page {page}")
-                page += 1
-                time.sleep(1)  # Delay between pages
-                
-            except requests.exceptions.RequestException as e:
-                print(f"   Error on page {page}: {e}")
-                break
-        
-        # Remove duplicates based on URL
-        seen_urls = set()
+        # Pages listed by the pagination widget are fetched concurrently
+        pager = pagination.walk_category(category_url, lambda page_url: self.pages.get(page_url).content,
+                                         self.parse_show_links, max_pages=100)
+        for page, page_shows in pager.pages():
+            print(f"   Found {len(page_shows)} shows on page {page}")
+        for page, e in pager.errors.items():
+            print(f"   Error on page {page}: {e}")
+        
+        # Remove duplicates (the same show page under any spelling of its URL)
+        seen_shows = set()
         unique_shows = []
-        for show in show_links:
-            if show['url'] not in seen_urls:
-                seen_urls.add(show['url'])
+        for show in pager.shows():
+            key = urls.parse_url(show['url']).key
+            if key not in seen_shows:
+                seen_shows.add(key)
                 unique_shows.append(show)
         
         # Sort alphabetically by name
@@ -367,7 +248,7 @@ class NonDriveVideoExtractor:
         print(f"✅ Total unique shows loaded: {len(unique_shows)}")
         return unique_shows
     
-    def extract_category(self, category_url, delay=2):
+    def extract_category(self, category_url):
         """Extract all shows from a category"""
         print(f"\n🌐 Extracting category from: {category_url}")
         print("=" * 80)
@@ -407,7 +288,7 @@ class NonDriveVideoExtractor:
             for season_num, season_url in enumerate(season_links, 1):
                 print(f"\n🎯 SEASON {season_num}")
                 # Check first episode only for Drive links
-                results = self.extract_season(season_url, delay, check_first_only=True)
+                results = self.extract_season(season_url, check_first_only=True)
                 
                 # If results is None, the show has Drive links - skip entire show
                 if results is None:
@@ -422,15 +303,13 @@ class NonDriveVideoExtractor:
                 skipped_shows += 1
             elif show_results:
                 all_results[show_name] = show_results
-            
-            # Delay between shows
-            time.sleep(delay * 2)
         
         print("\n" + "=" * 80)
         print(f"📊 Category Summary:")
         print(f"   Total shows processed: {len(show_links)}")
         print(f"   Shows with non-Drive videos: {len(all_results)}")
         print(f"   Shows skipped (Drive links): {skipped_shows}")
+        print_run_summary(self.session, self.pages)
         
         return all_results
     
@@ -555,7 +434,7 @@ def main():
             print("❌ No URL provided!")
             return
         
-        results = extractor.extract_season(season_url, delay=2)
+        results = extractor.extract_season(season_url)
         
         if results:
             extractor.print_results(results)
@@ -575,7 +454,7 @@ def main():
             print("❌ No URL provided!")
             return
         
-        all_results = extractor.extract_all_seasons(show_url, delay=2)
+        all_results = extractor.extract_all_seasons(show_url)
         
         if all_results:
             extractor.print_results(all_results)
@@ -595,7 +474,7 @@ def main():
             print("❌ No URL provided!")
             return
         
-        all_results = extractor.extract_category(category_url, delay=2)
+        all_results = extractor.extract_category(category_url)
         
         if all_results:
             extractor.print_results(all_results)
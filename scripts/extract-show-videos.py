@@ -1,83 +1,33 @@
-import re
 import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin
 import json
-import time
+
+from crawler import CircuitOpenError, PageStore, build_session, call_with_retries, detectors, parsing, print_run_summary, urls
 
 class ShowVideoExtractor:
     """Extract non-Drive video URLs from a specific show"""
     
-    def __init__(self, base_url="https://www.worthcrete.com"):
+    def __init__(self, base_url="https://www.worthcrete.com", session=None):
         self.base_url = base_url
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        })
+        self.session = session or build_session()
+        self.pages = PageStore(self.session)
     
     def is_google_drive_url(self, url):
         """Check if URL is a Google Drive link"""
-        if not url:
-            return False
-        return 'drive.google.com' in url.lower()
+        return detectors.is_google_drive_url(url)
     
     def extract_video_urls(self, html_content):
         """Extract non-Drive video URLs from HTML content"""
-        video_urls = []
-        
-        patterns = {
-            'mega': r'https?://mega\.nz/[^\s\'"<>]+',
-            'direct_video': r'https?://[^\s\'"<>]+\.(mp4|m3u8|webm|mkv|avi|mov)(?:\?[^\s\'"<>]*)?',
-            'iframe_src': r'<iframe[^>]+src=["\']([^"\']+)["\']',
-            'video_src': r'<video[^>]+src=["\']([^"\']+)["\']',
-            'source_src': r'<source[^>]+src=["\']([^"\']+)["\']',
-        }
-        
-        for pattern_name, pattern in patterns.items():
-            matches = re.findall(pattern, html_content, re.IGNORECASE)
-            for match in matches:
-                url = match[0] if isinstance(match, tuple) else match
-                
-                if self.is_google_drive_url(url):
-                    continue
-                
-                skip_domains = ['google.com', 'facebook.com', 'twitter.com', 'instagram.com', 
-                               'youtube.com', 'doubleclick.net', 'googletagmanager.com']
-                if any(domain in url.lower() for domain in skip_domains):
-                    continue
-                
-                video_urls.append({
-                    'url': url,
-                    'type': pattern_name
-                })
-        
-        return video_urls
+        return detectors.extract_video_urls(html_content)
     
     def extract_season_number(self, url):
         """Extract season number from URL"""
-        match = re.search(r'season[s]?-(\d+)', url.lower())
-        if match:
-            return int(match.group(1))
-        return None
+        return urls.season_number(url)
     
     def get_season_links_from_show_page(self, show_url):
         """Extract all season links from a show's main page"""
         try:
-            response = self.session.get(show_url, timeout=15)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            season_links = []
-            for link in soup.find_all('a', href=True):
-                href = link['href']
-                if re.search(r'season[s]?-\d+', href.lower()) and 'episode' not in href.lower():
-                    full_url = urljoin(self.base_url, href)
-                    season_links.append(full_url)
-            
-            season_links = list(set(season_links))
-            season_links.sort(key=lambda x: self.extract_season_number(x) or 0)
-            
-            return season_links
+            response = self.pages.get(show_url)
+            return urls.season_links(parsing.iter_hrefs(response.content), self.base_url)
         
         except Exception as e:
             print(f"❌ Error fetching show page: {e}")
@@ -86,77 +36,35 @@ class ShowVideoExtractor:
     def get_episode_links_from_season_page(self, season_url):
         """Extract all episode links from a season page"""
         try:
-            response = self.session.get(season_url, timeout=15)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
+            response = self.pages.get(season_url)
             current_season_num = self.extract_season_number(season_url)
             
             if current_season_num is None:
                 print("⚠️  Could not determine season number from URL")
                 return []
             
-            episode_links = []
-            
-            for link in soup.find_all('a', href=True):
-                href = link['href']
-                
-                if 'episode' not in href.lower():
-                    continue
-                
-                episode_season_num = self.extract_season_number(href)
-                
-                if episode_season_num == current_season_num:
-                    full_url = urljoin(self.base_url, href)
-                    episode_links.append(full_url)
-            
-            episode_links = sorted(list(set(episode_links)))
-            
-            return episode_links
+            # Episodes of the current season, once each, sorted by episode number
+            return urls.episode_links(parsing.iter_hrefs(response.content), current_season_num, self.base_url)
         
         except Exception as e:
             print(f"❌ Error fetching season page: {e}")
             return []
     
     def extract_video_links_from_episode(self, episode_url, retries=3):
-        """Extract non-Drive video links from an episode page"""
-        for attempt in range(retries):
-            try:
-                response = self.session.get(episode_url, timeout=15)
-                response.raise_for_status()
-                
-                video_urls = self.extract_video_urls(response.text)
-                
-                if video_urls:
-                    unique_urls = []
-                    seen = set()
-                    for video in video_urls:
-                        if video['url'] not in seen:
-                            seen.add(video['url'])
-                            unique_urls.append(video)
-                    return unique_urls
-                
-                return []
-            
-            except requests.exceptions.Timeout:
-                if attempt < retries - 1:
-                    print(f"⏱️  Timeout, retry {attempt + 2}/{retries}...", end=" ")
-                    time.sleep(3)
-                else:
-                    print(f"❌ Timeout after {retries} attempts")
-                    return []
-            
-            except requests.exceptions.RequestException as e:
-                if attempt < retries - 1:
-                    print(f"⚠️  Error, retry {attempt + 2}/{retries}...", end=" ")
-                    time.sleep(3)
-                else:
-                    print(f"❌ Failed: {str(e)[:50]}")
-                    return []
+        """Extract non-Drive video links from an episode page, retrying timeouts, connection errors and 5xx"""
+        try:
+            video_urls = call_with_retries(lambda: self.pages.parse(
+                episode_url, 'video_urls', lambda response: self.extract_video_urls(response.text)), retries)
+        except CircuitOpenError as e:
+            print(f"🔌 {e}")
+            return []
+        except requests.exceptions.RequestException as e:
+            print(f"❌ Failed: {str(e)[:50]}")
+            return []
         
-        return []
+        return video_urls or []
     
-    def extract_show(self, show_url, delay=2):
+    def extract_show(self, show_url):
         """Extract all non-Drive video links from a show"""
         print(f"\n🎬 Extracting show from: {show_url}")
         print("=" * 80)
@@ -206,9 +114,6 @@ class ShowVideoExtractor:
                     print(f"✓ Found {len(video_links)} video link(s)")
                 else:
                     print(f"✗ No non-Drive videos found")
-                
-                if i < len(episode_links):
-                    time.sleep(delay)
             
             if season_results:
                 all_results[f"Season {season_num}"] = season_results
@@ -221,6 +126,7 @@ class ShowVideoExtractor:
         print(f"📊 Total Seasons: {len(season_links)}")
         print(f"📊 Total Episodes: {total_episodes}")
         print(f"✅ Episodes with non-Drive videos: {total_with_videos}")
+        print_run_summary(self.session, self.pages)
         
         return all_results
     
@@ -295,7 +201,7 @@ def main():
     extractor = ShowVideoExtractor()
     
     # Extract the show
-    results = extractor.extract_show(show_url, delay=2)
+    results = extractor.extract_show(show_url)
     
     if results:
         extractor.print_results(results)
@@ -0,0 +1,214 @@
+"""
+WorthCrete One-Pass Multi-Source Extractor
+Crawls every category once and runs all detectors on each episode page,
+replacing separate runs of universalv6.py, extract-non-drive-videos.py
+and extract-show-videos.py over the same HTML.
+
+Usage: python scripts/extract_all_sources.py
+
+Outputs (all written from the single crawl):
+- all_categories_links.json / .txt      Drive, iframe and HTML5 sources (universalv6.py format)
+- all_categories_drive_links.json       Google Drive links per episode (universalv3.py format)
+- <category>_non_drive_category.json    Mega and direct video links (extract-non-drive-videos.py format)
+"""
+
+import asyncio
+import requests
+
+from crawler import call_with_retries, detectors
+from universalv6 import WorthCreteExtractor
+
+CATEGORIES = {
+    "English Seasons": "https://www.worthcrete.com/literature/seasons/english-seasons/",
+    "Hindi Seasons": "https://www.worthcrete.com/literature/seasons/hindi-seasons/",
+    "Hindi Dubbed Seasons": "https://www.worthcrete.com/literature/seasons/hindi-dubbed-seasons/"
+}
+
+
+class MultiSourceExtractor(WorthCreteExtractor):
+    """WorthCreteExtractor that keeps every detector's output for each episode page"""
+
+    def __init__(self, base_url="https://www.worthcrete.com/", session=None):
+        super().__init__(base_url,
+                         history_file="extracted_all_sources_history.json",
+                         checkpoint_file="all_sources_checkpoint.jsonl",
+                         session=session,
+                         retries_file="all_sources_retries.db",
+                         # Only files shows for the retry pass: seasons are always crawled in full
+                         inventory_file="all_sources_inventory.db")
+
+    def has_sources(self, detection):
+        """True if any detector found something"""
+        return bool(detection['video_source'] or detection['google_drive_id'] or detection['video_links'])
+    
+    def detect_episode(self, html_content):
+        """Run all detectors over an episode page, None if nothing was found"""
+        detection = detectors.detect_all(html_content, self.base_url)
+        return detection if self.has_sources(detection) else None
+
+    def episode_result(self, episode_url, detection):
+        """Combined result record for one episode"""
+        return {
+            'episode': self.extract_episode_number(episode_url),
+            'episode_url': episode_url,
+            'video_source': detection['video_source'],
+            'google_drive_id': detection['google_drive_id'],
+            'video_links': detection['video_links']
+        }
+
+    def episode_detection(self, episode_url):
+        """One attempt at an episode page with every detector, raising on request errors"""
+        return self.pages.parse(episode_url, 'all_sources', lambda response: self.detect_episode(response.text))
+
+    def extract_video_from_episode(self, episode_url, retries=3):
+        """Fetch an episode page once and run every detector on it, retrying timeouts, connection errors and 5xx"""
+        try:
+            return call_with_retries(lambda: self.episode_detection(episode_url), retries)
+        except requests.exceptions.RequestException as e:
+            print(f"❌ Failed: {str(e)[:50]}")
+            return None
+
+    def retry_episode(self, episode_url):
+        """One more attempt at a queued episode page, with every detector"""
+        detection = self.episode_detection(episode_url)
+        return self.episode_result(episode_url, detection) if detection else None
+
+    def extract_season(self, season_url):
+        """Extract every detector's output for all episodes of a season"""
+        print(f"\n🔍 Extracting season from: {season_url}")
+
+        episode_links = self.get_episode_links_from_season_page(season_url)
+        if not episode_links:
+            print("❌ No episodes found!")
+            return []
+
+        print(f"✅ Found {len(episode_links)} episodes")
+
+        results = []
+        retrying = self.retries.pending(episode_links)
+        resumed = self.resumed_episodes(season_url)
+        for episode_url in episode_links:
+            if episode_url in resumed:
+                detection = resumed[episode_url]
+            else:
+                try:
+                    detection = self.episode_detection(episode_url)
+                except requests.exceptions.RequestException as e:
+                    # One attempt only: the retry pass picks it up after a backoff
+                    queued = self.queue_failed_episode(episode_url, season_url, e)
+                    print(f"⏳ Failed {episode_url}, queued for retry" if queued else f"✗ Failed {episode_url}")
+                    continue
+                if episode_url in retrying:
+                    self.retries.resolve(episode_url)
+                self.checkpoint_episode(season_url, episode_url, detection)
+            if detection:
+                results.append(self.episode_result(episode_url, detection))
+
+        print(f"✅ Episodes with at least one source: {len(results)}/{len(episode_links)}")
+        return results
+
+    async def _crawl_season(self, fetcher, season_url):
+        """Async variant of extract_season"""
+        try:
+            html_content = await fetcher.get_text(season_url)
+        except requests.exceptions.RequestException as e:
+            print(f"❌ Error fetching season page {season_url}: {e}")
+            return []
+
+        episode_links = self.parse_episode_links(html_content, season_url)
+        detections = await asyncio.gather(*[self._resume_episode(fetcher, season_url, url) for url in episode_links])
+
+        # _resume_episode queued the failed episodes again; those with sources are done
+        for episode_url in self.retries.pending(episode_links):
+            if detections[episode_links.index(episode_url)]:
+                self.retries.resolve(episode_url)
+        return [self.episode_result(url, detection)
+                for url, detection in zip(episode_links, detections) if detection]
+
+    async def _crawl_episode(self, fetcher, episode_url):
+        """Fetch one episode page and run every detector on it, raising on request errors"""
+        # Fetched on a thread, detectors run on the process pool
+        detection = await fetcher.fetch_and_parse(episode_url, detectors.detect_all, self.base_url)
+        return detection if self.has_sources(detection) else None
+
+    def split_outputs(self, all_results):
+        """Split combined results into the formats of the individual extractors"""
+        sources = {}
+        drive_links = {}
+        non_drive = {}
+
+        for category_name, shows in all_results.items():
+            for show_name, seasons in shows.items():
+                for season_name, episodes in seasons.items():
+                    for ep in episodes:
+                        if ep['video_source']:
+                            sources.setdefault(category_name, {}).setdefault(show_name, {}).setdefault(season_name, []).append({
+                                'episode': ep['episode'],
+                                'episode_url': ep['episode_url'],
+                                'video_source': ep['video_source']
+                            })
+                        if ep['google_drive_id']:
+                            drive_links.setdefault(category_name, {}).setdefault(show_name, {}).setdefault(season_name, []).append({
+                                'episode': ep['episode'],
+                                'episode_url': ep['episode_url'],
+                                'google_drive_link': f"https://drive.google.com/file/d/{ep['google_drive_id']}/view"
+                            })
+                        if ep['video_links']:
+                            non_drive.setdefault(category_name, {}).setdefault(show_name, {}).setdefault(season_name, []).append({
+                                'episode': ep['episode'],
+                                'episode_url': ep['episode_url'],
+                                'video_links': ep['video_links']
+                            })
+
+        return sources, drive_links, non_drive
+
+    def save_all_outputs(self, all_results, categories):
+        """Write every extractor's output file from the combined results"""
+        sources, drive_links, non_drive = self.split_outputs(all_results)
+
+        self.save_to_json(sources, "all_categories_links.json")
+        self.save_to_txt(sources, "all_categories_links.txt")
+        self.save_to_json(drive_links, "all_categories_drive_links.json")
+
+        for category_name, shows in non_drive.items():
+            category_slug = categories[category_name].rstrip('/').split('/')[-1]
+            self.save_to_json(shows, f"{category_slug}_non_drive_category.json")
+
+
+def main():
+    print("\n" + "="*100)
+    print("🎬 WORTHCRETE ONE-PASS MULTI-SOURCE EXTRACTOR")
+    print("="*100)
+    print("\nEach episode page is downloaded once and checked by every detector:")
+    print("• Drive, iframe and HTML5 players (universalv6.py)")
+    print("• Google Drive IDs (universalv3.py)")
+    print("• Mega and direct MP4/M3U8 links (extract-non-drive-videos.py)")
+    print("\nOptions:")
+    print("1. Extract all categories (skip already extracted shows)")
+    print("2. Extract all categories (FORCE re-extract everything)")
+    print("3. Extract all categories with the FAST async crawler (skip already extracted shows)")
+
+    choice = input("\nEnter your choice (1/2/3): ").strip()
+
+    if choice not in ['1', '2', '3']:
+        print("❌ Invalid choice! Please run again and choose 1, 2 or 3.")
+        return
+
+    extractor = MultiSourceExtractor()
+
+    if choice == "3":
+        all_results = extractor.extract_all_categories_async(CATEGORIES)
+    else:
+        all_results = extractor.extract_all_categories(CATEGORIES, force=(choice == "2"))
+
+    if all_results:
+        extractor.save_all_outputs(all_results, CATEGORIES)
+
+    print("\n" + "="*100)
+    print("✅ One-pass extraction complete!")
+    print(f"📝 History updated: {extractor.history_file}")
+    print("="*100)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,23 +6,25 @@ Usage: python scripts/extract_missing_shows.py
 """
 
 import re
-import requests
-from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 import json
-import time
 import os
 
+from crawler import DriveIdMatcher, Journal, PageStore, build_session, call_with_retries, pagination, parsing, print_run_summary, streaming, urls
+from crawler.driveid import DRIVE_ID_PATTERNS
+from crawler.priority import StreamVaultCatalog
+
+# Same priority order as the other extractors, without the video_id pattern
+DRIVE_ID_MATCHER = DriveIdMatcher(DRIVE_ID_PATTERNS[:6] + DRIVE_ID_PATTERNS[7:])
+
 class StreamVaultExtractor:
-    def __init__(self, base_url="https://www.worthcrete.com/", data_file="data/streamvault-data.json"):
+    def __init__(self, base_url="https://www.worthcrete.com/", data_file="data/streamvault-data.json", session=None):
         self.base_url = base_url
         self.data_file = data_file
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        })
+        self.session = session or build_session()
+        self.pages = PageStore(self.session)
         self.output_file = "scripts/missing_shows_links.json"
-        self.checkpoint_file = "scripts/extraction_checkpoint.json"
+        self.checkpoint_file = "scripts/extraction_checkpoint.jsonl"
         self.existing_shows = set()
         self.load_existing_shows()
         self.load_checkpoint()
@@ -30,118 +32,87 @@ class StreamVaultExtractor:
     def load_existing_shows(self):
         """Load existing show slugs from StreamVault data"""
         try:
-            with open(self.data_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                
-            # Extract show slugs (normalized to lowercase for comparison)
-            if 'shows' in data:
-                for show in data['shows']:
-                    slug = show.get('slug', '').lower().strip()
-                    title = show.get('title', '').lower().strip()
-                    
-                    # Add the slug and title directly
-                    if slug:
-                        self.existing_shows.add(slug)
-                    if title:
-                        self.existing_shows.add(title)
-                    
-                    # Add normalized versions (remove all special chars)
-                    if title:
-                        normalized = re.sub(r'[^a-z0-9]', '', title)
-                        self.existing_shows.add(normalized)
-                        # Also add slug-style (replace spaces/special with dashes)
-                        slug_style = re.sub(r'[^a-z0-9]+', '-', title).strip('-')
-                        self.existing_shows.add(slug_style)
-            
-            print(f"✅ Loaded {len(data.get('shows', []))} shows from StreamVault")
+            self.catalog = StreamVaultCatalog(self.data_file)
+            self.existing_shows = set(self.catalog.shows)
+            print(f"✅ Loaded {self.catalog.show_count} shows from StreamVault")
             print(f"   ({len(self.existing_shows)} match patterns)")
         except Exception as e:
             print(f"❌ Error loading StreamVault data: {e}")
+            self.catalog = None
             self.existing_shows = set()
     
-    def normalize_name(self, name):
-        """Normalize a show name for comparison"""
-        name_lower = name.lower().strip()
-        # Remove common suffixes like "Season X", "S01", etc.
-        name_lower = re.sub(r'\s*season\s*\d+$', '', name_lower, flags=re.I)
-        name_lower = re.sub(r'\s*s\d+$', '', name_lower, flags=re.I)
-        return name_lower
-    
     def is_show_in_streamvault(self, show_name):
         """Check if a show already exists in StreamVault"""
-        name_lower = self.normalize_name(show_name)
-        normalized = re.sub(r'[^a-z0-9]', '', name_lower)
-        slug = re.sub(r'[^a-z0-9]+', '-', name_lower).strip('-')
-        
-        # Direct matches
-        if name_lower in self.existing_shows:
-            return True
-        if normalized in self.existing_shows:
-            return True
-        if slug in self.existing_shows:
-            return True
-        
-        # Partial match - check if any existing show contains this name or vice versa
-        for existing in self.existing_shows:
-            existing_norm = re.sub(r'[^a-z0-9]', '', existing)
-            if len(normalized) > 4 and len(existing_norm) > 4:
-                # Check if one contains the other (for similar names)
-                if normalized in existing_norm or existing_norm in normalized:
-                    return True
-        
-        return False
+        return self.catalog is not None and self.catalog.has_show(show_name)
     
     def load_checkpoint(self):
-        """Load extraction checkpoint"""
-        if os.path.exists(self.checkpoint_file):
+        """Rebuild extraction checkpoint by replaying the checkpoint journal"""
+        is_new = not os.path.exists(self.checkpoint_file)
+        self.journal = Journal(self.checkpoint_file, self.apply_checkpoint_record)
+        
+        # One-time import of the old single-file JSON checkpoint
+        legacy_file = os.path.splitext(self.checkpoint_file)[0] + ".json"
+        if is_new and os.path.exists(legacy_file):
             try:
-                with open(self.checkpoint_file, 'r', encoding='utf-8') as f:
-                    self.checkpoint = json.load(f)
-                print(f"📍 Loaded checkpoint")
+                with open(legacy_file, 'r', encoding='utf-8') as f:
+                    self.journal.reset(json.load(f))
             except:
-                self.checkpoint = {}
-        else:
-            self.checkpoint = {}
+                pass
+        
+        self.checkpoint = self.journal.state
+        if self.checkpoint:
+            print(f"📍 Loaded checkpoint")
     
-    def save_checkpoint(self, results, category=None, show_index=None):
-        """Save checkpoint"""
-        checkpoint = {
-            'results': results,
-            'category': category,
-            'show_index': show_index
+    def apply_checkpoint_record(self, state, record):
+        """Fold one checkpoint journal record into the checkpoint state"""
+        if record['type'] == 'episode':
+            state.setdefault('seasons', {}).setdefault(record['season'], {})[record['url']] = record['video']
+            return
+        
+        state.setdefault('results', {}).setdefault(record['category'], {})[record['show']] = {
+            'url': record['url'],
+            'seasons': record['seasons']
         }
+        state['category'] = record['category']
+        state['show_index'] = record['index']
+        # Episodes of a finished show are part of its results now
+        seasons = state.get('seasons', {})
+        for season_url in [url for url in seasons if url.startswith(record['url'])]:
+            del seasons[season_url]
+    
+    def save_checkpoint(self, category, show, show_data, show_index):
+        """Journal one finished show"""
+        try:
+            self.journal.append({
+                'type': 'show',
+                'category': category,
+                'show': show['name'],
+                'url': show['url'],
+                'seasons': show_data,
+                'index': show_index
+            })
+        except Exception as e:
+            print(f"❌ Error saving checkpoint: {e}")
+    
+    def save_episode_checkpoint(self, season_url, ep_url, video):
+        """Journal one finished episode so an interrupted show resumes from the next one"""
         try:
-            with open(self.checkpoint_file, 'w', encoding='utf-8') as f:
-                json.dump(checkpoint, f, indent=2, ensure_ascii=False)
+            self.journal.append({'type': 'episode', 'season': season_url, 'url': ep_url, 'video': video})
         except Exception as e:
             print(f"❌ Error saving checkpoint: {e}")
     
     def extract_google_drive_id(self, content):
         """Extract Google Drive file ID from content"""
-        patterns = [
-            r'drive\.google\.com/file/d/([a-zA-Z0-9_-]+)',
-            r'drive-video-([a-zA-Z0-9_-]+)',
-            r'/file/d/([a-zA-Z0-9_-]+)/preview',
-            r'id="drive-video-([a-zA-Z0-9_-]+)"',
-            r'data-id="([a-zA-Z0-9_-]+)"',
-            r'fileId["\s:=]+([a-zA-Z0-9_-]+)',
-            r'src="[^"]*?/d/([a-zA-Z0-9_-]+)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, content, re.IGNORECASE)
-            if match:
-                return match.group(1)
-        return None
+        return DRIVE_ID_MATCHER.search(content)
     
     def extract_video_source(self, html_content):
         """Detect and extract video source from HTML"""
-        soup = BeautifulSoup(html_content, 'html.parser')
+        iframe_srcs, video_src = parsing.find_players(html_content)
         
         # Look for iframe with video sources
-        iframes = soup.find_all('iframe', src=re.compile(r'(drive\.google\.com|mega\.nz|youtube\.com|youtu\.be|vimeo\.com)', re.I))
+        iframes = [src for src in iframe_srcs if re.search(r'(drive\.google\.com|mega\.nz|youtube\.com|youtu\.be|vimeo\.com)', src, re.I)]
         if iframes:
-            src = iframes[0]['src']
+            src = iframes[0]
             if 'drive.google.com' in src:
                 drive_id = self.extract_google_drive_id(src)
                 if drive_id:
@@ -153,16 +124,9 @@ class StreamVaultExtractor:
             return {'type': 'iframe', 'src': src}
         
         # Look for video tag
-        video = soup.find('video')
-        if video:
-            src_attr = video.get('src')
-            if not src_attr:
-                source = video.find('source')
-                if source:
-                    src_attr = source.get('src')
-            if src_attr:
-                full_src = urljoin(self.base_url, src_attr) if not src_attr.startswith('http') else src_attr
-                return {'type': 'html5', 'src': full_src}
+        if video_src:
+            full_src = urljoin(self.base_url, video_src) if not video_src.startswith('http') else video_src
+            return {'type': 'html5', 'src': full_src}
         
         # Fallback regex for Google Drive
         drive_id = self.extract_google_drive_id(html_content)
@@ -177,92 +141,45 @@ class StreamVaultExtractor:
     
     def extract_season_number(self, url):
         """Extract season number from URL"""
-        match = re.search(r'season[s]?-(\d+)', url.lower())
-        if match:
-            return int(match.group(1))
-        return None
+        return urls.season_number(url)
     
     def extract_episode_number(self, url):
         """Extract episode number from URL"""
-        match = re.search(r'episode[s]?-(\d+)', url.lower())
-        if match:
-            return int(match.group(1))
-        return None
+        return urls.episode_number(url)
     
     def get_episode_links(self, season_url):
         """Extract episode links from season page"""
         try:
-            response = self.session.get(season_url, timeout=15)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
+            response = self.pages.get(season_url)
             current_season = self.extract_season_number(season_url)
             if current_season is None:
                 return []
             
-            episodes = []
-            for link in soup.find_all('a', href=True):
-                href = link['href']
-                if 'episode' not in href.lower():
-                    continue
-                
-                ep_season = self.extract_season_number(href)
-                if ep_season == current_season:
-                    full_url = urljoin(self.base_url, href)
-                    ep_num = self.extract_episode_number(full_url)
-                    if ep_num:
-                        episodes.append((ep_num, full_url))
-            
-            # Remove duplicates and sort
-            seen = set()
-            unique = []
-            for ep_num, url in episodes:
-                if url not in seen:
-                    seen.add(url)
-                    unique.append((ep_num, url))
-            unique.sort(key=lambda x: x[0])
-            
-            return [url for _, url in unique]
+            return urls.episode_links(parsing.iter_hrefs(response.content), current_season, self.base_url)
         except Exception as e:
             print(f"❌ Error fetching season: {e}")
             return []
     
     def extract_video_from_episode(self, episode_url, retries=3):
-        """Extract video source from episode page"""
-        for attempt in range(retries):
-            try:
-                response = self.session.get(episode_url, timeout=15)
-                response.raise_for_status()
-                return self.extract_video_source(response.text)
-            except Exception as e:
-                if attempt < retries - 1:
-                    time.sleep(2)
-                else:
-                    return None
-        return None
+        """Extract video source from episode page, retrying timeouts, connection errors and 5xx"""
+        try:
+            # Streamed: the download stops once the player iframe is in
+            return call_with_retries(lambda: self.pages.scan(episode_url, 'video_source', self.extract_video_source,
+                                                             streaming.PlayerIframeWatch), retries)
+        except Exception as e:
+            print(f"❌ Failed {episode_url}: {str(e)[:50]}")
+            return None
     
     def get_season_links(self, show_url):
         """Get season links from show page"""
         try:
-            response = self.session.get(show_url, timeout=15)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            seasons = []
-            for link in soup.find_all('a', href=True):
-                href = link['href']
-                if re.search(r'season[s]?-\d+', href.lower()) and 'episode' not in href.lower():
-                    full_url = urljoin(self.base_url, href)
-                    seasons.append(full_url)
-            
-            seasons = list(set(seasons))
-            seasons.sort(key=lambda x: self.extract_season_number(x) or 0)
-            return seasons
+            response = self.pages.get(show_url)
+            return urls.season_links(parsing.iter_hrefs(response.content), self.base_url)
         except Exception as e:
             print(f"❌ Error fetching show: {e}")
             return []
     
-    def extract_show(self, show_url, show_name, delay=1):
+    def extract_show(self, show_url, show_name):
         """Extract all episodes from a show"""
         print(f"\n🎬 Extracting: {show_name}")
         
@@ -282,10 +199,18 @@ class StreamVaultExtractor:
             episode_links = self.get_episode_links(season_url)
             print(f"    Found {len(episode_links)} episodes")
             
+            done = self.checkpoint.get('seasons', {}).get(season_url, {})
+            if done:
+                print(f"    📍 {len(done)} episodes already done")
+            
             season_data = []
             for ep_url in episode_links:
                 ep_num = self.extract_episode_number(ep_url)
-                video = self.extract_video_from_episode(ep_url)
+                if ep_url in done:
+                    video = done[ep_url]
+                else:
+                    video = self.extract_video_from_episode(ep_url)
+                    self.save_episode_checkpoint(season_url, ep_url, video)
                 
                 if video:
                     season_data.append({
@@ -296,64 +221,50 @@ class StreamVaultExtractor:
                     print(f"    ✓ Episode {ep_num}")
                 else:
                     print(f"    ✗ Episode {ep_num}")
-                
-                time.sleep(delay)
             
             all_episodes[f"Season {season_num}"] = season_data
         
         return all_episodes
     
+    def parse_show_links(self, html_content):
+        """Parse show links from a category page"""
+        page_shows = []
+        for href in parsing.iter_hrefs(html_content):
+            if urls.parse_url(href).kind == 'show':
+                full_url = urljoin(self.base_url, href)
+                segments = href.rstrip('/').split('/')
+                if segments:
+                    last_seg = segments[-1]
+                    show_name = re.sub(r'-online-[^-]+$', '', last_seg).replace('-', ' ').title()
+                    if show_name:
+                        page_shows.append({'name': show_name, 'url': full_url})
+        return page_shows
+    
     def get_shows_from_category(self, category_url):
         """Get all shows from category with pagination"""
         print(f"🔍 Fetching shows from {category_url}...")
-        shows = []
-        page = 1
-        
-        while page <= 50:  # Safety limit
-            page_url = f"{category_url}?pg={page}" if page > 1 else category_url
-            try:
-                response = self.session.get(page_url, timeout=15)
-                response.raise_for_status()
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                page_shows = []
-                for link in soup.find_all('a', href=True):
-                    href = link['href']
-                    if (re.search(r'/[^/]+-online-[^/]+/?$', href) and 
-                        'seasons-' not in href.lower() and 'episode' not in href.lower()):
-                        full_url = urljoin(self.base_url, href)
-                        segments = href.rstrip('/').split('/')
-                        if segments:
-                            last_seg = segments[-1]
-                            show_name = re.sub(r'-online-[^-]+$', '', last_seg).replace('-', ' ').title()
-                            if show_name:
-                                page_shows.append({'name': show_name, 'url': full_url})
-                
-                if not page_shows:
-                    break
-                
-                shows.extend(page_shows)
-                print(f"   Page {page}: {len(page_shows)} shows")
-                page += 1
-                time.sleep(1)
-                
-            except Exception as e:
-                print(f"   Error on page {page}: {e}")
-                break
+        pager = pagination.walk_category(category_url, lambda page_url: self.pages.get(page_url).content,
+                                         self.parse_show_links, max_pages=50)  # Safety limit
+        for page, page_shows in pager.pages():
+            print(f"   Page {page}: {len(page_shows)} shows")
+        for page, e in pager.errors.items():
+            print(f"   Error on page {page}: {e}")
+        shows = pager.shows()
         
         # Remove duplicates
         seen = set()
         unique = []
         for show in shows:
-            if show['url'] not in seen:
-                seen.add(show['url'])
+            key = urls.parse_url(show['url']).key
+            if key not in seen:
+                seen.add(key)
                 unique.append(show)
         
         unique.sort(key=lambda x: x['name'])
         print(f"✅ Total shows: {len(unique)}")
         return unique
     
-    def extract_missing_shows(self, delay=1):
+    def extract_missing_shows(self):
         """Main extraction - only shows NOT in StreamVault"""
         categories = {
             "English Seasons": "https://www.worthcrete.com/literature/seasons/english-seasons/",
@@ -387,15 +298,13 @@ class StreamVaultExtractor:
                     print("  ⏭️  Already extracted")
                     continue
                 
-                show_data = self.extract_show(show['url'], show['name'], delay)
+                show_data = self.extract_show(show['url'], show['name'])
                 if show_data:
                     results[cat_name][show['name']] = {
                         'url': show['url'],
                         'seasons': show_data
                     }
-                    self.save_checkpoint(results, cat_name, i)
-                
-                time.sleep(delay * 2)
+                    self.save_checkpoint(cat_name, show, show_data, i)
         
         # Save final results
         self.save_results(results)
@@ -429,6 +338,7 @@ class StreamVaultExtractor:
                     print(f"  📺 {show_name}: {len(show_data['seasons'])} seasons, {eps} episodes")
         
         print(f"\n✅ Total: {total_shows} shows, {total_episodes} episodes")
+        print_run_summary(self.session, self.pages)
 
 
 def main():
@@ -490,7 +400,7 @@ def main():
         print("="*80)
         
     elif choice == "2":
-        results = extractor.extract_missing_shows(delay=1)
+        results = extractor.extract_missing_shows()
         extractor.print_summary(results)
         
         print("\n" + "="*80)
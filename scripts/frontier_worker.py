@@ -0,0 +1,64 @@
+"""
+Crawl frontier worker for WorthCrete extraction
+
+Any number of these can run at once, on one machine or on several
+machines sharing the frontier file, to split one crawl between them.
+
+Usage:
+    python scripts/frontier_worker.py seed    [frontier.db]
+    python scripts/frontier_worker.py work    [frontier.db] [batch_size] [minutes]
+    python scripts/frontier_worker.py status  [frontier.db]
+    python scripts/frontier_worker.py retry   [frontier.db]
+    python scripts/frontier_worker.py export  [frontier.db] [output.json]
+
+Work is prioritised against data/streamvault-data.json: missing shows,
+then placeholder episodes, then new seasons, then re-verification, with
+the categories interleaved. Give `work` a number of minutes for a
+time-boxed run. Set CRAWL_FRONTIER_WAL=off when the frontier lives on NFS.
+"""
+
+import os
+import socket
+import sys
+
+from crawler import Frontier
+from crawler.priority import PRIORITY_NAMES
+from universalv6 import CATEGORIES, WorthCreteExtractor, load_priorities
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ('seed', 'work', 'status', 'retry', 'export'):
+        print(__doc__)
+        return
+
+    command = sys.argv[1]
+    path = sys.argv[2] if len(sys.argv) > 2 else 'crawl_frontier.db'
+    wal = os.getenv('CRAWL_FRONTIER_WAL', 'on').lower() not in ('0', 'off', 'false', 'no')
+    frontier = Frontier(path, wal=wal)
+
+    if command == 'seed':
+        frontier.seed(CATEGORIES)
+        print(f"🌱 Queued {len(CATEGORIES)} categories in {path}")
+    elif command == 'work':
+        batch_size = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+        time_limit = float(sys.argv[4]) * 60 if len(sys.argv) > 4 else None
+        extractor = WorthCreteExtractor()
+        extractor.work_frontier(frontier, f"{socket.gethostname()}-{os.getpid()}", batch_size=batch_size,
+                                priorities=load_priorities(), time_limit=time_limit)
+    elif command == 'retry':
+        print(f"🔁 {frontier.retry_failed()} failed URLs queued again")
+    elif command == 'export':
+        output = sys.argv[3] if len(sys.argv) > 3 else 'all_categories_links.json'
+        extractor = WorthCreteExtractor()
+        all_results = frontier.export()
+        extractor.save_to_json(all_results, output)
+        extractor.save_to_txt(all_results, os.path.splitext(output)[0] + '.txt')
+
+    print(frontier.summary())
+    for priority, pending in frontier.pending_by_priority().items():
+        print(f"   {pending} pending: {PRIORITY_NAMES.get(priority, priority)}")
+    frontier.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Re-crawls after failed episode fetches must not treat the season as unchanged.
+
+Usage: python -m pytest scripts/tests   (or python -m unittest discover scripts/tests)
+
+Crawls a one-show stand-in site (benchmarks/standin.py) whose second
+episode page fails, then crawls it again with the page back up.
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, os.path.join(os.path.dirname(HERE), 'benchmarks'))
+
+from requests.exceptions import Timeout
+
+from crawler import BreakerRegistry, CircuitOpenError, CrawlMetrics, CrawlSession, RateLimiterRegistry
+from crawler.inventory import InventoryStore
+from crawler.retryqueue import RetryQueue
+from extract_all_sources import MultiSourceExtractor
+from standin import StandInSite
+from universalv6 import WorthCreteExtractor
+
+
+class FailedFetchTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.site = StandInSite(shows=1, seasons=1, episodes=4, latency=0)
+        cls.server = cls.site.start()
+        render = cls.site.render
+        cls.failing = set()
+        cls.site.render = lambda path, page: (None, None) if path in cls.failing else render(path, page)
+        cls.category_url = f"{cls.site.base}/literature/seasons/english-seasons/"
+        cls.season_url = f"{cls.category_url}english-show-0-online-english/english-show-0-seasons-1-online-english/"
+        cls.episode_url = f"{cls.season_url}english-show-0-seasons-1-episode-2-online-english/"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.workdir = tempfile.TemporaryDirectory()
+        os.chdir(self.workdir.name)
+        self.failing.clear()
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.workdir.cleanup()
+
+    def extractor(self, cls=WorthCreteExtractor):
+        session = CrawlSession(limiters=RateLimiterRegistry(rate=200, max_rate=200, burst=200),
+                               breakers=BreakerRegistry(), metrics=CrawlMetrics())
+        return cls(self.site.base + '/', session=session)
+
+    def crawl(self, extractor, run_async=False):
+        """Force a whole-site crawl and return the season's episodes"""
+        categories = {"English Seasons": self.category_url}
+        with contextlib.redirect_stdout(io.StringIO()):
+            if run_async:
+                results = extractor.extract_all_categories_async(categories, force=True, parse_workers=1)
+            else:
+                results = extractor.extract_all_categories(categories, force=True)
+        return [ep['episode'] for ep in results["English Seasons"]["English Show 0"]["Season 1"]]
+
+    def check_failed_fetch_is_crawled_again(self, run_async):
+        self.failing.add(self.episode_url.replace(self.site.base, ''))
+        extractor = self.extractor()
+        self.assertEqual(self.crawl(extractor, run_async), [1, 3, 4])
+        self.assertEqual(extractor.retries.pending([self.episode_url]), {self.episode_url})
+
+        self.failing.clear()
+        self.assertEqual(self.crawl(extractor, run_async), [1, 2, 3, 4])
+        self.assertEqual(extractor.inventory.seasons_unchanged, 0)
+        self.assertEqual(extractor.retries.pending([self.episode_url]), set())
+
+        # Every episode has been fetched now: the third crawl reuses them
+        self.assertEqual(self.crawl(extractor, run_async), [1, 2, 3, 4])
+        self.assertEqual(extractor.inventory.seasons_unchanged, 1)
+
+    def test_failed_fetch_is_crawled_again(self):
+        self.check_failed_fetch_is_crawled_again(run_async=False)
+
+    def test_failed_fetch_is_crawled_again_async(self):
+        self.check_failed_fetch_is_crawled_again(run_async=True)
+
+    def check_multi_source_failure_is_queued(self, run_async):
+        self.failing.add(self.episode_url.replace(self.site.base, ''))
+        extractor = self.extractor(MultiSourceExtractor)
+        self.assertEqual(self.crawl(extractor, run_async), [1, 3, 4])
+        self.assertEqual(extractor.retries.pending([self.episode_url]), {self.episode_url})
+        # Kept out of universalv6's queue and inventory, which its retry pass and delta crawl read
+        self.assertEqual(RetryQueue().pending([self.episode_url]), set())
+        show_url = self.season_url.rsplit('/', 2)[0] + '/'
+        self.assertEqual(extractor.inventory.known_seasons(show_url), {self.season_url})
+        self.assertEqual(InventoryStore().known_seasons(show_url), set())
+
+        self.failing.clear()
+        self.assertEqual(self.crawl(extractor, run_async), [1, 2, 3, 4])
+        self.assertEqual(extractor.retries.pending([self.episode_url]), set())
+
+    def test_multi_source_failure_is_queued(self):
+        self.check_multi_source_failure_is_queued(run_async=False)
+
+    def test_multi_source_failure_is_queued_async(self):
+        self.check_multi_source_failure_is_queued(run_async=True)
+
+    def test_open_circuit_does_not_use_attempts(self):
+        extractor = self.extractor()
+        extractor.retries.max_attempts = 2
+        for _ in range(3):
+            self.assertTrue(extractor.queue_failed_episode(self.episode_url, self.season_url,
+                                                           CircuitOpenError('127.0.0.1', 30)))
+        self.assertEqual(extractor.retries.pending([self.episode_url]), {self.episode_url})
+        self.assertTrue(extractor.queue_failed_episode(self.episode_url, self.season_url, Timeout()))
+        self.assertFalse(extractor.queue_failed_episode(self.episode_url, self.season_url, Timeout()))
+
+    def test_retrying_episode_is_not_unchanged(self):
+        # An inventory written before failures were kept out of it
+        inventory = InventoryStore('inventory.db')
+        urls = [f"{self.season_url}ep-{n}/" for n in (1, 2)]
+        inventory.record_show("English Seasons", "English Show 0", self.season_url.rsplit('/', 2)[0] + '/',
+                              [self.season_url])
+        inventory.record_season(self.season_url, urls, [1, 2])
+        for url in urls:
+            inventory.record_episode(url, None)
+        self.assertIsNone(inventory.unchanged_season(self.season_url, urls, {urls[1]}))
+        self.assertEqual(inventory.unchanged_season(self.season_url, urls), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+"""
+Sitemap discovery against the fixture sitemaps in scripts/fixtures/sitemap.
+
+Usage: python -m pytest scripts/tests   (or python -m unittest discover scripts/tests)
+
+The fixtures are served from an ephemeral-port http.server; their sitemap
+URLs are relative, so they resolve against whatever port it picked.
+"""
+
+import contextlib
+import functools
+import http.server
+import io
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from datetime import datetime, timezone
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from crawler import (BreakerRegistry, CrawlMetrics, CrawlSession, RateLimiterRegistry, ReplaySession,
+                     SitemapDiscovery, WarcWriter)
+
+FIXTURES = os.path.join(os.path.dirname(HERE), 'fixtures', 'sitemap')
+SHOWS = 'https://www.worthcrete.com/literature/seasons/{}/{}-tv-series-online-{}/'
+
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def session(**kwargs):
+    return CrawlSession(limiters=RateLimiterRegistry(rate=200, max_rate=200, burst=200),
+                        breakers=BreakerRegistry(), metrics=CrawlMetrics(), **kwargs)
+
+
+def episode_counts(tree):
+    """{show_url: [episodes per season]}"""
+    return {show_url: [len(season['episodes']) for season in show['seasons'].values()]
+            for shows in tree.values() for show_url, show in shows.items()}
+
+
+class SitemapDiscoveryTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = http.server.ThreadingHTTPServer(
+            ('127.0.0.1', 0), functools.partial(QuietHandler, directory=FIXTURES))
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}/"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def discover(self, crawl_session, base=None, sitemap_urls=None):
+        discovery = SitemapDiscovery(crawl_session, base or self.base)
+        with contextlib.redirect_stdout(io.StringIO()):
+            tree = discovery.discover(sitemap_urls)
+        return discovery, tree
+
+    def test_tree_from_robots_txt(self):
+        discovery, tree = self.discover(session())
+        self.assertEqual(discovery.requests, 4)  # robots.txt, the index and its two child sitemaps
+        self.assertEqual(discovery.failed, [])
+        self.assertEqual(episode_counts(tree), {
+            SHOWS.format('english-seasons', '30-coins', 'english-dubbed'): [3, 2],
+            SHOWS.format('english-seasons', 'lupin', 'english-dubbed'): [3],
+            SHOWS.format('hindi-dubbed-seasons', 'vincenzo', 'hindi-dubbed'): [4],
+        })
+
+    def test_changed_episodes_since_lastmod(self):
+        _, tree = self.discover(session())
+        show = tree['english-seasons'][SHOWS.format('english-seasons', '30-coins', 'english-dubbed')]
+        changed = SitemapDiscovery.changed_episodes(show, datetime(2025, 10, 1, tzinfo=timezone.utc))
+        self.assertEqual([url.rstrip('/').rsplit('/', 1)[1] for url in changed],
+                         ['30-coins-season-2-episode-2-online-english-dubbed'])
+        self.assertEqual(len(SitemapDiscovery.changed_episodes(show, None)), 5)
+
+    def test_missing_sitemap_is_skipped(self):
+        missing = self.base + 'missing-sitemap.xml'
+        discovery, tree = self.discover(session(), sitemap_urls=[missing, self.base + 'sitemap_index.xml'])
+        self.assertEqual(discovery.failed, [missing])
+        self.assertEqual(len(episode_counts(tree)), 3)
+
+    def test_unreachable_site_finds_no_sitemaps(self):
+        # Nothing listens on port 9: robots.txt and every HEAD fallback fail to connect
+        discovery = SitemapDiscovery(session(), 'http://127.0.0.1:9/', timeout=2)
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(discovery.find_sitemaps(), [])
+
+    def test_replays_from_warc_capture(self):
+        with tempfile.TemporaryDirectory() as directory:
+            writer = WarcWriter(directory)
+            _, captured = self.discover(session(archive=writer))
+            writer.close()
+            _, replayed = self.discover(ReplaySession(directory, limiters=RateLimiterRegistry(rate=200),
+                                                      breakers=BreakerRegistry(), metrics=CrawlMetrics()))
+        self.assertEqual(replayed, captured)
+
+
+if __name__ == '__main__':
+    unittest.main()
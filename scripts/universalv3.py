@@ -1,52 +1,26 @@
-import re
 import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin
 import json
-import time
+
+from crawler import CircuitOpenError, PageStore, build_session, call_with_retries, detectors, parsing, print_run_summary, streaming, urls
 
 class WorthCreteExtractor:
-    def __init__(self, base_url="https://www.worthcrete.com"):
+    def __init__(self, base_url="https://www.worthcrete.com", session=None):
         self.base_url = base_url
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        })
+        self.session = session or build_session()
+        self.pages = PageStore(self.session)
     
     def extract_google_drive_id(self, html_content):
         """Extract Google Drive file ID from HTML content with multiple patterns"""
-        patterns = [
-            r'drive\.google\.com/file/d/([a-zA-Z0-9_-]+)',  # Standard iframe
-            r'drive-video-([a-zA-Z0-9_-]+)',                # Video ID attribute
-            r'/file/d/([a-zA-Z0-9_-]+)/preview',            # Preview URL
-            r'id="drive-video-([a-zA-Z0-9_-]+)"',           # ID with drive-video
-            r'data-id="([a-zA-Z0-9_-]+)"',                  # Data attribute
-            r'fileId["\s:=]+([a-zA-Z0-9_-]+)',              # fileId variable
-            r'video[_-]?id["\s:=]+([a-zA-Z0-9_-]+)',        # video_id/videoId
-            r'src="[^"]*?/d/([a-zA-Z0-9_-]+)',              # src attribute
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, html_content, re.IGNORECASE)
-            if match:
-                return match.group(1)
-        
-        return None
+        return detectors.extract_google_drive_id(html_content)
     
     def extract_season_number(self, url):
         """Extract season number from URL"""
-        match = re.search(r'season[s]?-(\d+)', url.lower())
-        if match:
-            return int(match.group(1))
-        return None
+        return urls.season_number(url)
     
     def get_episode_links_from_season_page(self, season_url):
         """Extract all episode links from a season page - FIXED VERSION"""
         try:
-            response = self.session.get(season_url, timeout=15)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
+            response = self.pages.get(season_url)
             # Extract the season number from the current URL
             current_season_num = self.extract_season_number(season_url)
             
@@ -54,68 +28,32 @@ class WorthCreteExtractor:
                 print("⚠️  Could not determine season number from URL")
                 return []
             
-            episode_links = []
-            
-            # Find all links containing "episode" in the URL
-            for link in soup.find_all('a', href=True):
-                href = link['href']
-                
-                # Must contain 'episode' keyword
-                if 'episode' not in href.lower():
-                    continue
-                
-                # Must contain the same season number as current page
-                episode_season_num = self.extract_season_number(href)
-                
-                # Only add if it matches the current season
-                if episode_season_num == current_season_num:
-                    full_url = urljoin(self.base_url, href)
-                    episode_links.append(full_url)
-            
-            # Remove duplicates and sort
-            episode_links = sorted(list(set(episode_links)))
-            
-            return episode_links
+            # Episode links of the current season, once each, sorted by episode number
+            return urls.episode_links(parsing.iter_hrefs(response.content), current_season_num, self.base_url)
         
         except Exception as e:
             print(f"❌ Error fetching season page: {e}")
             return []
     
     def extract_drive_link_from_episode(self, episode_url, retries=3):
-        """Extract Google Drive link from an episode page with retry logic"""
-        for attempt in range(retries):
-            try:
-                response = self.session.get(episode_url, timeout=15)
-                response.raise_for_status()
-                
-                drive_id = self.extract_google_drive_id(response.text)
-                if drive_id:
-                    return f"https://drive.google.com/file/d/{drive_id}/view"
-                
-                # If no drive_id found on last attempt, show debug info
-                if attempt == retries - 1:
-                    print(f"\n⚠️  No Google Drive ID found in HTML")
-                return None
-            
-            except requests.exceptions.Timeout:
-                if attempt < retries - 1:
-                    print(f"⏱️  Timeout, retry {attempt + 2}/{retries}...", end=" ")
-                    time.sleep(3)
-                else:
-                    print(f"❌ Timeout after {retries} attempts")
-                    return None
-            
-            except requests.exceptions.RequestException as e:
-                if attempt < retries - 1:
-                    print(f"⚠️  Error, retry {attempt + 2}/{retries}...", end=" ")
-                    time.sleep(3)
-                else:
-                    print(f"❌ Failed: {str(e)[:50]}")
-                    return None
+        """Extract Google Drive link from an episode page, retrying timeouts, connection errors and 5xx"""
+        try:
+            # Streamed: the download stops once a drive.google.com/file/d/ link is in
+            drive_id = call_with_retries(lambda: self.pages.scan(episode_url, 'drive_id', self.extract_google_drive_id,
+                                                                 streaming.DriveLinkWatch), retries)
+        except CircuitOpenError as e:
+            print(f"🔌 {e}")
+            return None
+        except requests.exceptions.RequestException as e:
+            print(f"❌ Failed: {str(e)[:50]}")
+            return None
         
+        if drive_id:
+            return f"https://drive.google.com/file/d/{drive_id}/view"
+        print(f"\n⚠️  No Google Drive ID found in HTML")
         return None
     
-    def extract_season(self, season_url, delay=2):
+    def extract_season(self, season_url):
         """Extract all Google Drive links from a season"""
         print(f"\n🔍 Extracting season from: {season_url}")
         print("=" * 80)
@@ -152,10 +90,6 @@ class WorthCreteExtractor:
             else:
                 failed_episodes.append({'episode': i, 'url': episode_url})
                 print(f"✗ Failed")
-            
-            # Delay between requests
-            if i < len(episode_links):
-                time.sleep(delay)
         
         # Show summary
         print("\n" + "=" * 80)
@@ -168,27 +102,15 @@ class WorthCreteExtractor:
         
         return results
     
-    def extract_all_seasons(self, show_main_url, delay=2):
+    def extract_all_seasons(self, show_main_url):
         """Extract all seasons from a show's main page"""
         print(f"\n🎬 Extracting all seasons from: {show_main_url}")
         print("=" * 80)
         
         try:
-            response = self.session.get(show_main_url, timeout=15)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            season_links = []
-            for link in soup.find_all('a', href=True):
-                href = link['href']
-                # Match season pages (e.g., "seasons-1", "seasons-2")
-                if re.search(r'season[s]?-\d+', href.lower()) and 'episode' not in href.lower():
-                    full_url = urljoin(self.base_url, href)
-                    season_links.append(full_url)
-            
-            # Remove duplicates and sort by season number
-            season_links = list(set(season_links))
-            season_links.sort(key=lambda x: self.extract_season_number(x) or 0)
+            response = self.pages.get(show_main_url)
+            # Season pages (e.g., "seasons-1", "seasons-2"), once each, sorted by season number
+            season_links = urls.season_links(parsing.iter_hrefs(response.content), self.base_url)
             
             if not season_links:
                 print("❌ No seasons found!")
@@ -203,12 +125,12 @@ class WorthCreteExtractor:
             for season_num, season_url in enumerate(season_links, 1):
                 print(f"\n{'='*80}")
                 print(f"🎯 SEASON {season_num}")
-                results = self.extract_season(season_url, delay)
+                results = self.extract_season(season_url)
                 all_results[f"Season {season_num}"] = results
                 
                 # Count successes
                 total_success += len(results)
-                episode_links = self.get_episode_links_from_season_page(season_url)
+                episode_links = self.get_episode_links_from_season_page(season_url)  # memoized, no refetch
                 total_failed += len(episode_links) - len(results)
             
             # Final summary
@@ -219,6 +141,7 @@ class WorthCreteExtractor:
             print(f"✅ Total Episodes Extracted: {total_success}")
             if total_failed > 0:
                 print(f"⚠️  Total Failed: {total_failed}")
+            print_run_summary(self.session, self.pages)
             
             return all_results
         
@@ -304,7 +227,7 @@ def main():
             print("❌ No URL provided!")
             return
         
-        results = extractor.extract_season(season_url, delay=2)
+        results = extractor.extract_season(season_url)
         
         if results:
             extractor.print_results(results)
@@ -325,7 +248,7 @@ def main():
             print("❌ No URL provided!")
             return
         
-        all_results = extractor.extract_all_seasons(show_url, delay=2)
+        all_results = extractor.extract_all_seasons(show_url)
         
         if all_results:
             extractor.print_results(all_results)
@@ -1,20 +1,44 @@
 import re
 import requests
-from bs4 import BeautifulSoup
 from urllib.parse import urljoin
+from datetime import datetime, timezone
+import asyncio
 import json
 import time
 import os
+import socket
+
+try:
+    from crawler import AsyncFetcher, CircuitOpenError, Frontier, InventoryStore, Journal, PageStore, RetryQueue, SitemapDiscovery, build_session, call_with_retries, detectors, pagination, parsing, print_run_summary, streaming, urls
+    from crawler.pipeline import ParseStage
+    from crawler.priority import CrawlPriorities, StreamVaultCatalog
+    from crawler.sitemap import category_slug
+except ImportError:  # root copy run from the repository root
+    from scripts.crawler import AsyncFetcher, CircuitOpenError, Frontier, InventoryStore, Journal, PageStore, RetryQueue, SitemapDiscovery, build_session, call_with_retries, detectors, pagination, parsing, print_run_summary, streaming, urls
+    from scripts.crawler.pipeline import ParseStage
+    from scripts.crawler.priority import CrawlPriorities, StreamVaultCatalog
+    from scripts.crawler.sitemap import category_slug
+
+CATEGORIES = {
+    "English Seasons": "https://www.worthcrete.com/literature/seasons/english-seasons/",
+    "Hindi Seasons": "https://www.worthcrete.com/literature/seasons/hindi-seasons/",
+    "Hindi Dubbed Seasons": "https://www.worthcrete.com/literature/seasons/hindi-dubbed-seasons/"
+}
 
 class WorthCreteExtractor:
-    def __init__(self, base_url="https://www.worthcrete.com/"):
+    def __init__(self, base_url="https://www.worthcrete.com/",
+                 history_file="extracted_history.json", checkpoint_file="extraction_checkpoint.jsonl", session=None,
+                 retries_file="episode_retries.db", inventory_file="crawl_inventory.db"):
         self.base_url = base_url
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        })
-        self.history_file = "extracted_history.json"
-        self.checkpoint_file = "extraction_checkpoint.json"
+        self.session = session or build_session()
+        self.pages = PageStore(self.session)
+        self.history_file = history_file
+        self.checkpoint_file = checkpoint_file
+        self.sitemap_state_file = "sitemap_state.json"
+        self.inventory = InventoryStore(inventory_file)  # season/episode URLs seen per show, for delta crawls
+        # Seasons listing the same episodes as last crawl reuse their stored sources (CRAWL_FINGERPRINTS=off re-fetches)
+        self.skip_unchanged = os.getenv('CRAWL_FINGERPRINTS', 'on').lower() not in ('0', 'off', 'false', 'no')
+        self.retries = RetryQueue(retries_file)  # episode pages that failed, retried later with backoff
         self.load_history()
         self.load_checkpoint()
     
@@ -40,32 +64,82 @@ class WorthCreteExtractor:
             print(f"❌ Error saving history: {e}")
     
     def load_checkpoint(self):
-        """Load extraction checkpoint from JSON file"""
-        if os.path.exists(self.checkpoint_file):
+        """Rebuild the extraction checkpoint by replaying the checkpoint journal"""
+        is_new = not os.path.exists(self.checkpoint_file)
+        self.journal = Journal(self.checkpoint_file, self.apply_checkpoint_record)
+        
+        # One-time import of a checkpoint written by older versions as a single JSON file
+        legacy_file = os.path.splitext(self.checkpoint_file)[0] + ".json"
+        if is_new and os.path.exists(legacy_file):
             try:
-                with open(self.checkpoint_file, 'r', encoding='utf-8') as f:
-                    self.checkpoint = json.load(f)
-                print(f"📍 Loaded checkpoint: {self.checkpoint}")
+                with open(legacy_file, 'r', encoding='utf-8') as f:
+                    self.journal.reset(json.load(f))
+                print(f"📍 Imported legacy checkpoint: {legacy_file}")
             except Exception as e:
-                print(f"⚠️  Error loading checkpoint: {e}. Starting fresh.")
-                self.checkpoint = {}
-        else:
-            self.checkpoint = {}
-    
-    def save_checkpoint(self, all_results, current_category=None, current_show_index=None):
-        """Save extraction checkpoint and current results"""
-        checkpoint_data = {
-            'all_results': all_results,
-            'current_category': current_category,
-            'current_show_index': current_show_index
-        }
+                print(f"⚠️  Error importing legacy checkpoint: {e}. Starting fresh.")
+        
+        self.checkpoint = self.journal.state
+        if self.journal.dropped:
+            print(f"⚠️  Dropped {self.journal.dropped} unreadable checkpoint record(s)")
+        if self.checkpoint:
+            shows = sum(len(shows) for shows in self.checkpoint.get('all_results', {}).values())
+            print(f"📍 Loaded checkpoint: {shows} shows, category {self.checkpoint.get('current_category')} "
+                  f"show {self.checkpoint.get('current_show_index') or 'N/A'}")
+    
+    def apply_checkpoint_record(self, state, record):
+        """Fold one checkpoint journal record into the checkpoint state"""
+        if record['type'] == 'episode':
+            state.setdefault('seasons', {}).setdefault(record['season'], {})[record['url']] = record['result']
+        if record['type'] == 'show':
+            state.setdefault('all_results', {}).setdefault(record['category'], {})[record['show']] = record['seasons']
+            # Episodes of a finished show are part of its results now (season URLs nest under the show URL)
+            seasons = state.get('seasons', {})
+            if record.get('show_url'):
+                for season_url in [url for url in seasons if url.startswith(record['show_url'])]:
+                    del seasons[season_url]
+        if 'index' in record:
+            state['current_category'] = record['category']
+            state['current_show_index'] = record['index']
+    
+    def checkpoint_episode(self, season_url, episode_url, result):
+        """Journal a finished episode so an interrupted show resumes from the next one"""
         try:
-            with open(self.checkpoint_file, 'w', encoding='utf-8') as f:
-                json.dump(checkpoint_data, f, indent=2, ensure_ascii=False)
-            print(f"📍 Checkpoint saved at {current_category} show {current_show_index if current_show_index else 'N/A'}")
+            self.journal.append({'type': 'episode', 'season': season_url, 'url': episode_url, 'result': result})
         except Exception as e:
             print(f"❌ Error saving checkpoint: {e}")
     
+    def resumed_episodes(self, season_url):
+        """Episodes of a season finished before an interruption, {episode_url: result}"""
+        return self.checkpoint.get('seasons', {}).get(season_url, {})
+    
+    def checkpoint_show(self, category_name, show_name, show_results, show_index=None, show_url=None):
+        """Journal a finished show (and the show index to resume from, if sequential)"""
+        record = {'type': 'show', 'category': category_name, 'show': show_name, 'show_url': show_url,
+                  'seasons': show_results}
+        if show_index is not None:
+            record['index'] = show_index
+        try:
+            self.journal.append(record)
+            print(f"📍 Checkpoint saved at {category_name} show {show_index if show_index else 'N/A'}")
+        except Exception as e:
+            print(f"❌ Error saving checkpoint: {e}")
+    
+    def checkpoint_position(self, category_name=None, show_index=None):
+        """Journal the category and show index to resume from"""
+        try:
+            self.journal.append({'type': 'position', 'category': category_name, 'index': show_index})
+        except Exception as e:
+            print(f"❌ Error saving checkpoint: {e}")
+    
+    def clear_checkpoint(self):
+        """Discard the checkpoint journal once a run has completed"""
+        try:
+            self.journal.reset()
+            self.checkpoint = self.journal.state
+            print("🗑️  Checkpoint cleared (extraction complete)")
+        except Exception as e:
+            print(f"❌ Error clearing checkpoint: {e}")
+    
     def is_show_extracted(self, category, show_name):
         """Check if a show in a category has been extracted"""
         if category not in self.history:
@@ -82,213 +156,64 @@ class WorthCreteExtractor:
     
     def extract_google_drive_id(self, content):
         """Extract Google Drive file ID from content with multiple patterns"""
-        patterns = [
-            r'drive\.google\.com/file/d/([a-zA-Z0-9_-]+)',  # Standard iframe
-            r'drive-video-([a-zA-Z0-9_-]+)',                # Video ID attribute
-            r'/file/d/([a-zA-Z0-9_-]+)/preview',            # Preview URL
-            r'id="drive-video-([a-zA-Z0-9_-]+)"',           # ID with drive-video
-            r'data-id="([a-zA-Z0-9_-]+)"',                  # Data attribute
-            r'fileId["\s:=]+([a-zA-Z0-9_-]+)',              # fileId variable
-            r'video[_-]?id["\s:=]+([a-zA-Z0-9_-]+)',        # video_id/videoId
-            r'src="[^"]*?/d/([a-zA-Z0-9_-]+)',              # src attribute
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, content, re.IGNORECASE)
-            if match:
-                return match.group(1)
-        
-        return None
+        return detectors.extract_google_drive_id(content)
     
     def extract_video_source(self, html_content):
         """Detect and extract video source from HTML content for various players"""
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        # Look for iframe with video sources
-        iframes = soup.find_all('iframe', src=re.compile(r'(drive\.google\.com|mega\.nz|youtube\.com|youtu\.be|vimeo\.com)', re.I))
-        if iframes:
-            src = iframes[0]['src']  # Take the first matching iframe
-            if 'drive.google.com' in src:
-                drive_id = self.extract_google_drive_id(src)
-                if drive_id:
-                    embed_src = f"https://drive.google.com/file/d/{drive_id}/preview"
-                    return {
-                        'type': 'google_drive',
-                        'embed_code': f'<iframe src="{embed_src}" width="100%" height="480" allowfullscreen></iframe>',
-                        'direct_link': f"https://drive.google.com/file/d/{drive_id}/view"
-                    }
-            elif 'mega.nz' in src:
-                return {
-                    'type': 'mega',
-                    'embed_code': f'<iframe src="{src}" width="100%" height="480" frameborder="0" allowfullscreen></iframe>',
-                    'direct_link': src
-                }
-            elif 'youtube.com' in src or 'youtu.be' in src:
-                return {
-                    'type': 'youtube',
-                    'embed_code': f'<iframe src="{src}" width="560" height="315" frameborder="0" allowfullscreen></iframe>',
-                    'direct_link': src
-                }
-            # General iframe fallback
-            return {
-                'type': 'iframe_embed',
-                'embed_code': f'<iframe src="{src}" width="100%" height="480" frameborder="0" allowfullscreen></iframe>',
-                'direct_link': src
-            }
-        
-        # Look for video tag (HTML5 player)
-        video = soup.find('video')
-        if video:
-            src_attr = video.get('src')
-            if not src_attr:
-                source = video.find('source')
-                if source:
-                    src_attr = source.get('src')
-            if src_attr:
-                full_src = urljoin(self.base_url, src_attr) if not src_attr.startswith('http') else src_attr
-                return {
-                    'type': 'html5',
-                    'embed_code': f'<video src="{full_src}" controls width="100%" height="480"></video>',
-                    'direct_link': full_src
-                }
-        
-        # Fallback regex for Google Drive
-        drive_id = self.extract_google_drive_id(html_content)
-        if drive_id:
-            embed_src = f"https://drive.google.com/file/d/{drive_id}/preview"
-            return {
-                'type': 'google_drive',
-                'embed_code': f'<iframe src="{embed_src}" width="100%" height="480" allowfullscreen></iframe>',
-                'direct_link': f"https://drive.google.com/file/d/{drive_id}/view"
-            }
-        
-        # Fallback regex for Mega
-        mega_match = re.search(r'mega\.nz/(?:file|embed)/([A-Za-z0-9]+)#?([A-Za-z0-9]+)?', html_content, re.I)
-        if mega_match:
-            file_id = mega_match.group(1)
-            key = mega_match.group(2) or ''
-            embed_src = f"https://mega.nz/embed/{file_id}#{key}"
-            return {
-                'type': 'mega',
-                'embed_code': f'<iframe src="{embed_src}" width="100%" height="480" frameborder="0" allowfullscreen></iframe>',
-                'direct_link': embed_src
-            }
-        
-        # Additional regex for other direct video URLs (e.g., .mp4 links)
-        video_match = re.search(r'(?:src|href|data-src)=["\']([^"\']*\.(?:mp4|webm|ogg|avi|mkv)[^"\']*)["\']', html_content, re.I)
-        if video_match:
-            video_src = video_match.group(1)
-            full_src = urljoin(self.base_url, video_src) if not video_src.startswith('http') else video_src
-            return {
-                'type': 'direct_video',
-                'embed_code': f'<video src="{full_src}" controls width="100%" height="480"></video>',
-                'direct_link': full_src
-            }
-        
-        return None
+        return detectors.extract_video_source(html_content, self.base_url)
     
     def extract_season_number(self, url):
         """Extract season number from URL"""
-        match = re.search(r'season[s]?-(\d+)', url.lower())
-        if match:
-            return int(match.group(1))
-        return None
+        return urls.season_number(url)
     
     def extract_episode_number(self, url):
         """Extract episode number from URL"""
-        match = re.search(r'episode[s]?-(\d+)', url.lower())
-        if match:
-            return int(match.group(1))
-        return None
+        return urls.episode_number(url)
+    
+    def parse_episode_links(self, html_content, season_url):
+        """Parse episode links from season page HTML, sorted by episode number"""
+        # Extract the season number from the current URL
+        current_season_num = self.extract_season_number(season_url)
+        
+        if current_season_num is None:
+            print("⚠️  Could not determine season number from URL")
+            return []
+        
+        # Episodes of the current season with an extractable number, once each (see crawler/urls.py)
+        return urls.episode_links(parsing.iter_hrefs(html_content), current_season_num, self.base_url)
     
     def get_episode_links_from_season_page(self, season_url):
         """Extract all episode links from a season page, sorted by episode number"""
         try:
-            response = self.session.get(season_url, timeout=15)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Extract the season number from the current URL
-            current_season_num = self.extract_season_number(season_url)
-            
-            if current_season_num is None:
-                print("⚠️  Could not determine season number from URL")
-                return []
-            
-            episode_links = []
-            
-            # Find all links containing "episode" in the URL
-            for link in soup.find_all('a', href=True):
-                href = link['href']
-                
-                # Must contain 'episode' keyword
-                if 'episode' not in href.lower():
-                    continue
-                
-                # Must contain the same season number as current page
-                episode_season_num = self.extract_season_number(href)
-                
-                # Only add if it matches the current season
-                if episode_season_num == current_season_num:
-                    full_url = urljoin(self.base_url, href)
-                    ep_num = self.extract_episode_number(full_url)
-                    if ep_num:  # Only include if episode number is extractable
-                        episode_links.append((ep_num, full_url))
-            
-            # Remove duplicates (by URL) and sort by episode number
-            seen_urls = set()
-            unique_episodes = []
-            for ep_num, url in episode_links:
-                if url not in seen_urls:
-                    seen_urls.add(url)
-                    unique_episodes.append((ep_num, url))
-            
-            unique_episodes.sort(key=lambda x: x[0])  # Sort by episode number
-            
-            # Extract just the URLs
-            episode_links = [url for _, url in unique_episodes]
-            
-            return episode_links
+            return self.pages.parse(season_url, 'episode_links',
+                                    lambda response: self.parse_episode_links(response.content, season_url))
         
         except Exception as e:
             print(f"❌ Error fetching season page: {e}")
             return []
     
+    def episode_source(self, episode_url):
+        """One attempt at an episode's video source, raising on request errors"""
+        # Streamed: the download stops once the player iframe is in
+        return self.pages.scan(episode_url, 'video_source', self.extract_video_source,
+                               streaming.PlayerIframeWatch)
+    
     def extract_video_from_episode(self, episode_url, retries=3):
-        """Extract video source from an episode page with retry logic"""
-        for attempt in range(retries):
-            try:
-                response = self.session.get(episode_url, timeout=15)
-                response.raise_for_status()
-                
-                video_source = self.extract_video_source(response.text)
-                if video_source:
-                    return video_source
-                
-                # If no video source found on last attempt, show debug info
-                if attempt == retries - 1:
-                    print(f"\n⚠️  No video source found in HTML")
-                return None
-            
-            except requests.exceptions.Timeout:
-                if attempt < retries - 1:
-                    print(f"⏱️  Timeout, retry {attempt + 2}/{retries}...", end=" ")
-                    time.sleep(3)
-                else:
-                    print(f"❌ Timeout after {retries} attempts")
-                    return None
-            
-            except requests.exceptions.RequestException as e:
-                if attempt < retries - 1:
-                    print(f"⚠️  Error, retry {attempt + 2}/{retries}...", end=" ")
-                    time.sleep(3)
-                else:
-                    print(f"❌ Failed: {str(e)[:50]}")
-                    return None
+        """Extract video source from an episode page, retrying timeouts, connection errors and 5xx"""
+        try:
+            video_source = call_with_retries(lambda: self.episode_source(episode_url), retries)
+        except CircuitOpenError as e:
+            print(f"🔌 {e}")
+            return None
+        except requests.exceptions.RequestException as e:
+            print(f"❌ Failed: {str(e)[:50]}")
+            return None
         
-        return None
+        if not video_source:
+            print(f"\n⚠️  No video source found in HTML")
+        return video_source
     
-    def extract_season(self, season_url, delay=2):
+    def extract_season(self, season_url):
         """Extract all video sources from a season"""
         print(f"\n🔍 Extracting season from: {season_url}")
         print("=" * 80)
@@ -306,11 +231,22 @@ class WorthCreteExtractor:
             return []
         
         print(f"✅ Found {len(episode_links)} episodes\n")
+        reused = self.unchanged_season(season_url, episode_links)
+        if reused is not None:
+            print(f"🧬 Unchanged since the last crawl: {len(reused)} stored sources reused, "
+                  f"{len(episode_links)} episode fetches saved")
+            return reused
+        self.inventory.record_season(season_url, episode_links,
+                                     [self.extract_episode_number(url) for url in episode_links])
         
         results = []
         failed_episodes = []
+        retrying = self.retries.pending(episode_links)
+        resumed = self.resumed_episodes(season_url)
+        if resumed:
+            print(f"📍 Resuming season: {len(resumed)} episodes already done\n")
         
-        for idx, episode_url in enumerate(episode_links):
+        for episode_url in episode_links:
             episode_num = self.extract_episode_number(episode_url)
             if episode_num is None:
                 print(f"⚠️  Skipping invalid episode URL: {episode_url}")
@@ -318,7 +254,20 @@ class WorthCreteExtractor:
                 
             print(f"📥 [Episode {episode_num}] Processing...", end=" ")
             
-            video_source = self.extract_video_from_episode(episode_url)
+            queued = False
+            if episode_url in resumed:
+                video_source = resumed[episode_url]
+            else:
+                try:
+                    video_source = self.episode_source(episode_url)
+                except requests.exceptions.RequestException as e:
+                    # One attempt only: the retry pass picks it up after a backoff
+                    video_source = None
+                    queued = self.queue_failed_episode(episode_url, season_url, e)
+                else:
+                    # Failures are not journaled: a resumed run fetches them again
+                    self.record_episode(episode_url, video_source, retrying)
+                    self.checkpoint_episode(season_url, episode_url, video_source)
             
             if video_source:
                 results.append({
@@ -329,11 +278,7 @@ class WorthCreteExtractor:
                 print(f"✓ Success ({video_source['type']})")
             else:
                 failed_episodes.append({'episode': episode_num, 'url': episode_url})
-                print(f"✗ Failed")
-            
-            # Delay between requests
-            if idx < len(episode_links) - 1:
-                time.sleep(delay)
+                print(f"⏳ Failed, queued for retry" if queued else f"✗ Failed")
         
         # Show summary
         print("\n" + "=" * 80)
@@ -346,32 +291,45 @@ class WorthCreteExtractor:
         
         return results
     
+    def unchanged_season(self, season_url, episode_links):
+        """Stored results of a season that lists the same episodes as last crawl, None to crawl it"""
+        if not self.skip_unchanged:
+            return None
+        return self.inventory.unchanged_season(season_url, episode_links, self.retries.pending(episode_links))
+    
+    def queue_failed_episode(self, episode_url, season_url, error):
+        """Queue an episode page whose fetch failed, returns False once it is given up
+        
+        A page refused by an open circuit was never sent, so it waits for
+        the breaker's next probe without using up one of its attempts.
+        """
+        if isinstance(error, CircuitOpenError):
+            self.retries.defer(episode_url, season_url, error, error.retry_in)
+            return True
+        return self.retries.add(episode_url, season_url, error)
+    
+    def record_episode(self, episode_url, video_source, retrying=()):
+        """Record a downloaded episode page, taking it off the retry queue if it was waiting there"""
+        self.inventory.record_episode(episode_url, video_source)
+        if episode_url in retrying:
+            self.retries.resolve(episode_url)
+    
+    def parse_season_links(self, html_content):
+        """Parse season links from show page HTML, sorted by season number"""
+        # Match season pages (e.g., "seasons-1", "seasons-2"), once each
+        return urls.season_links(parsing.iter_hrefs(html_content), self.base_url)
+    
     def get_season_links_from_show_page(self, show_url):
         """Extract all season links from a show's main page"""
         try:
-            response = self.session.get(show_url, timeout=15)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            season_links = []
-            for link in soup.find_all('a', href=True):
-                href = link['href']
-                # Match season pages (e.g., "seasons-1", "seasons-2")
-                if re.search(r'season[s]?-\d+', href.lower()) and 'episode' not in href.lower():
-                    full_url = urljoin(self.base_url, href)
-                    season_links.append(full_url)
-            
-            # Remove duplicates and sort by season number
-            season_links = list(set(season_links))
-            season_links.sort(key=lambda x: self.extract_season_number(x) or 0)
-            
-            return season_links
+            return self.pages.parse(show_url, 'season_links',
+                                    lambda response: self.parse_season_links(response.content))
         
         except Exception as e:
             print(f"❌ Error fetching show page: {e}")
             return []
     
-    def extract_show(self, show_url, show_name, delay=2):
+    def extract_show(self, show_url, show_name, category_name=None):
         """Extract all seasons and episodes from a show"""
         print(f"\n🎬 Extracting show: {show_name}")
         print(f"URL: {show_url}")
@@ -383,6 +341,9 @@ class WorthCreteExtractor:
             print("❌ No seasons found!")
             return {}
         
+        if category_name:
+            self.inventory.record_show(category_name, show_name, show_url, season_links)
+        
         print(f"✅ Found {len(season_links)} seasons\n")
         
         all_results = {}
@@ -392,12 +353,12 @@ class WorthCreteExtractor:
         for season_num, season_url in enumerate(season_links, 1):
             print(f"\n{'='*80}")
             print(f"🎯 SEASON {season_num}")
-            results = self.extract_season(season_url, delay)
+            results = self.extract_season(season_url)
             all_results[f"Season {season_num}"] = results
             
             # Count successes
             total_success += len(results)
-            episode_links = self.get_episode_links_from_season_page(season_url)
+            episode_links = self.get_episode_links_from_season_page(season_url)  # memoized, no refetch
             total_failed += len(episode_links) - len(results)
         
         # Show summary
@@ -408,67 +369,57 @@ class WorthCreteExtractor:
         
         return all_results
     
-    def get_show_links_from_category(self, category_url):
-        """Extract all show links from a category page with pagination support"""
-        print(f"🔍 Fetching shows from {category_url} with pagination...")
-        show_links = []
-        page = 1
-        max_pages = 100  # Safety limit
+    def parse_show_links(self, html_content):
+        """Parse show links from a category page's HTML"""
+        page_shows = []
+        for href in parsing.iter_hrefs(html_content):
+            # Show links end with -online-something/ and name no season or episode
+            if urls.parse_url(href).kind == 'show':
+                full_url = urljoin(self.base_url, href)
+                show_name = self.show_name_from_url(href)
+                if show_name:
+                    page_shows.append({
+                        'name': show_name,
+                        'url': full_url
+                    })
         
-        while page <= max_pages:
-            page_url = f"{category_url}?pg={page}" if page > 1 else category_url
-            try:
-                print(f"   Processing page {page}...")
-                response = self.session.get(page_url, timeout=15)
-                response.raise_for_status()
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                page_shows = []
-                for link in soup.find_all('a', href=True):
-                    href = link['href']
-                    # Improved regex for show links: ends with -online-something/
-                    if (re.search(r'/[^/]+-online-[^/]+/?$', href) and 
-                        'seasons-' not in href.lower() and 'episode' not in href.lower()):
-                        full_url = urljoin(self.base_url, href)
-                        # Extract show name from the segment before 'online'
-                        segments = href.rstrip('/').split('/')
-                        if segments:
-                            last_seg = segments[-1]
-                            show_name = re.sub(r'-online-[^-]+$', '', last_seg).replace('-', ' ').title()
-                            if show_name:
-                                page_shows.append({
-                                    'name': show_name,
-                                    'url': full_url
-                                })
-                
-                if not page_shows:
-                    print(f"   No more shows on page {page}. Stopping.")
-                    break
-                
-                show_links.extend(page_shows)
-                print(f"   Found {len(page_shows)} shows on page {page}")
-                page += 1
-                time.sleep(1)  # Delay between pages
-                
-            except requests.exceptions.RequestException as e:
-                print(f"   Error on page {page}: {e}")
-                break
-        
-        # Remove duplicates based on URL
-        seen_urls = set()
+        return page_shows
+    
+    def show_name_from_url(self, show_url):
+        """Derive a show name from the URL segment before 'online'"""
+        last_seg = show_url.rstrip('/').split('/')[-1]
+        return re.sub(r'-online-[^-]+$', '', last_seg).replace('-', ' ').title()
+    
+    def dedupe_shows(self, show_links):
+        """Remove duplicate shows (the same show page under any spelling of its URL) and sort them by name"""
+        seen_shows = set()
         unique_shows = []
         for show in show_links:
-            if show['url'] not in seen_urls:
-                seen_urls.add(show['url'])
+            key = urls.parse_url(show['url']).key
+            if key not in seen_shows:
+                seen_shows.add(key)
                 unique_shows.append(show)
         
         # Sort alphabetically by name
         unique_shows.sort(key=lambda x: x['name'])
+        return unique_shows
+    
+    def get_show_links_from_category(self, category_url):
+        """Extract all show links from a category page with pagination support"""
+        print(f"🔍 Fetching shows from {category_url} with pagination...")
+        # Pages listed by the pagination widget are fetched concurrently
+        pager = pagination.walk_category(category_url, lambda page_url: self.pages.get(page_url).content,
+                                         self.parse_show_links, max_pages=100)
+        for page, page_shows in pager.pages():
+            print(f"   Found {len(page_shows)} shows on page {page}")
+        for page, e in pager.errors.items():
+            print(f"   Error on page {page}: {e}")
         
+        unique_shows = self.dedupe_shows(pager.shows())
         print(f"✅ Total unique shows loaded: {len(unique_shows)}")
         return unique_shows
     
-    def extract_category(self, category_url, category_name, all_results, delay=2, force=False):
+    def extract_category(self, category_url, category_name, all_results, force=False):
         """Extract all shows from a category with checkpointing"""
         print(f"\n🌐 Extracting category: {category_name}")
         print(f"URL: {category_url}")
@@ -482,7 +433,7 @@ class WorthCreteExtractor:
         
         print(f"✅ Found {len(show_links)} shows\n")
         
-        category_results = {}
+        category_results = dict(all_results.get(category_name, {}))
         skipped = 0
         extracted = 0
         
@@ -503,19 +454,16 @@ class WorthCreteExtractor:
                 skipped += 1
                 continue
             
-            show_results = self.extract_show(show_url, show_name, delay)
+            show_results = self.extract_show(show_url, show_name, category_name)
             if show_results:
                 category_results[show_name] = show_results
                 self.mark_show_extracted(category_name, show_name)
                 extracted += 1
                 all_results[category_name] = category_results  # Update all_results
                 # Checkpoint after each show
-                self.save_checkpoint(all_results, category_name, i+1)
+                self.checkpoint_show(category_name, show_name, show_results, i+1, show_url)
             else:
                 print("❌ Failed to extract show")
-            
-            # Delay between shows
-            time.sleep(delay * 2)  # Longer delay between shows
         
         # Category summary
         print("\n" + "=" * 80)
@@ -523,20 +471,14 @@ class WorthCreteExtractor:
         print(f"✅ Extracted: {extracted}")
         print(f"⏭️  Skipped: {skipped}")
         
-        # Clear checkpoint for this category if completed
-        if len(show_links) == i + 1:
-            current_checkpoint = self.checkpoint.copy()
-            if 'current_category' in current_checkpoint:
-                del current_checkpoint['current_category']
-            if 'current_show_index' in current_checkpoint:
-                del current_checkpoint['current_show_index']
-            self.save_checkpoint(all_results, **current_checkpoint)
+        # Clear the resume position once the category is completed
+        self.checkpoint_position()
         
         return all_results
     
-    def extract_all_categories(self, categories, delay=2, force=False):
+    def extract_all_categories(self, categories, force=False):
         """Extract from all provided categories with checkpointing"""
-        all_results = self.checkpoint.get('all_results', {}) if self.checkpoint else {}
+        all_results = dict(self.checkpoint.get('all_results', {}))
         total_extracted_shows = sum(len(shows) for shows in all_results.values()) if all_results else 0
         
         # Resume from checkpoint if available
@@ -554,11 +496,11 @@ class WorthCreteExtractor:
             print(f"🚀 STARTING CATEGORY: {category_name}")
             print(f"{'='*100}")
             
-            all_results = self.extract_category(category_url, category_name, all_results, delay, force)
+            all_results = self.extract_category(category_url, category_name, all_results, force)
             total_extracted_shows = sum(len(shows) for shows in all_results.values())
-            
-            # Checkpoint after each category
-            self.save_checkpoint(all_results, category_name)
+        
+        # Failed episodes whose backoff has already passed
+        self.retry_due_episodes(all_results)
         
         # Final summary
         print("\n" + "=" * 100)
@@ -568,16 +510,485 @@ class WorthCreteExtractor:
         print(f"✅ Total Shows Extracted: {total_extracted_shows}")
         print(f"💾 Check history file: {self.history_file}")
         print(f"📍 Checkpoint file: {self.checkpoint_file}")
+        print(f"🧬 Fingerprints: {self.inventory.summary()}")
+        print_run_summary(self.session, self.pages)
         
         # Clear checkpoint on completion
+        self.clear_checkpoint()
+        
+        return all_results
+    
+    def load_sitemap_state(self):
+        """Return the time of the last sitemap-driven run, or None"""
+        if os.path.exists(self.sitemap_state_file):
+            try:
+                with open(self.sitemap_state_file, 'r', encoding='utf-8') as f:
+                    return datetime.fromisoformat(json.load(f)['last_run'])
+            except Exception as e:
+                print(f"⚠️  Error loading sitemap state: {e}. Re-extracting everything.")
+        return None
+    
+    def save_sitemap_state(self, last_run):
+        """Remember when the sitemap-driven run started"""
         try:
-            os.remove(self.checkpoint_file)
-            print("🗑️  Checkpoint cleared (extraction complete)")
-        except:
-            pass
+            with open(self.sitemap_state_file, 'w', encoding='utf-8') as f:
+                json.dump({'last_run': last_run.isoformat()}, f, indent=2)
+        except Exception as e:
+            print(f"❌ Error saving sitemap state: {e}")
+    
+    def load_results(self, filename):
+        """Load a previous results file, or an empty dict"""
+        if os.path.exists(filename):
+            try:
+                with open(filename, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except Exception as e:
+                print(f"⚠️  Error loading {filename}: {e}")
+        return {}
+    
+    def extract_all_categories_from_sitemap(self, categories, force=False, previous_results="all_categories_links.json"):
+        """Discover shows, seasons and episodes from the XML sitemaps and extract only changed episodes"""
+        run_started = datetime.now(timezone.utc)
+        discovery = SitemapDiscovery(self.session, self.base_url)
+        tree = discovery.discover()
+        
+        total_shows = sum(len(shows) for shows in tree.values())
+        total_episodes = sum(len(season['episodes']) for shows in tree.values()
+                             for show in shows.values() for season in show['seasons'].values())
+        print(f"🗺️  Sitemap discovery: {total_shows} shows, {total_episodes} episodes from {discovery.requests} requests")
+        
+        since = None if force else self.load_sitemap_state()
+        if since:
+            print(f"📅 Re-extracting episodes modified since {since.isoformat()}")
+        all_results = {} if force else self.load_results(previous_results)
+        extracted_episodes = 0
+        
+        for category_name, category_url in categories.items():
+            shows = tree.get(category_slug(category_url), {})
+            category_results = all_results.get(category_name, {})
+            print(f"\n🌐 {category_name}: {len(shows)} shows in sitemap")
+            
+            for show_url in sorted(shows, key=self.show_name_from_url):
+                show = shows[show_url]
+                show_name = self.show_name_from_url(show_url)
+                changed = set(SitemapDiscovery.changed_episodes(show, since))
+                show_results = category_results.get(show_name, {})
+                known = {ep['episode_url'] for episodes in show_results.values() for ep in episodes}
+                
+                season_urls = sorted(show['seasons'], key=lambda x: self.extract_season_number(x) or 0)
+                todo = [url for season_url in season_urls for url in show['seasons'][season_url]['episodes']
+                        if url in changed or url not in known]
+                if not todo:
+                    continue
+                
+                print(f"🎬 {show_name}: {len(todo)} new or changed episodes")
+                todo = set(todo)
+                for season_num, season_url in enumerate(season_urls, 1):
+                    season_key = f"Season {season_num}"
+                    episodes = {ep['episode_url']: ep for ep in show_results.get(season_key, [])}
+                    for episode_url in show['seasons'][season_url]['episodes']:
+                        if episode_url not in todo:
+                            continue
+                        video_source = self.extract_video_from_episode(episode_url)
+                        extracted_episodes += 1
+                        if video_source:
+                            episodes[episode_url] = {
+                                'episode': self.extract_episode_number(episode_url),
+                                'episode_url': episode_url,
+                                'video_source': video_source
+                            }
+                    if episodes:
+                        show_results[season_key] = sorted(episodes.values(), key=lambda ep: ep['episode'] or 0)
+                
+                category_results[show_name] = show_results
+                all_results[category_name] = category_results
+                self.mark_show_extracted(category_name, show_name)
+                self.checkpoint_show(category_name, show_name, show_results, show_url=show_url)
+        
+        if discovery.failed:
+            # Pages in the skipped sitemaps were not looked at: check them again next run
+            print(f"⚠️  {len(discovery.failed)} sitemaps could not be read, last-run time not advanced")
+        else:
+            self.save_sitemap_state(run_started)
+        
+        print("\n" + "=" * 100)
+        print("🎊 SITEMAP RUN SUMMARY")
+        print("=" * 100)
+        print(f"🗺️  Sitemap requests: {discovery.requests}")
+        print(f"📥 Episode pages extracted: {extracted_episodes} of {total_episodes} listed")
+        print_run_summary(self.session, self.pages)
+        
+        self.clear_checkpoint()
         
         return all_results
     
+    def extract_all_categories_delta(self, categories):
+        """Fetch only show and season index pages and extract episodes missing from the inventory"""
+        started = time.time()
+        new_seasons = 0
+        new_episodes = 0
+        recovered = 0
+        
+        for category_name, category_url in categories.items():
+            print(f"\n{'='*100}")
+            print(f"🔄 DELTA CRAWL: {category_name}")
+            print(f"{'='*100}")
+            
+            for show_info in self.get_show_links_from_category(category_url):
+                show_name = show_info['name']
+                show_url = show_info['url']
+                
+                season_links = self.get_season_links_from_show_page(show_url)
+                if not season_links:
+                    continue
+                known_seasons = self.inventory.known_seasons(show_url)
+                self.inventory.record_show(category_name, show_name, show_url, season_links)
+                
+                for season_url in season_links:
+                    if season_url not in known_seasons:
+                        new_seasons += 1
+                        print(f"🆕 {show_name}: new season {season_url}")
+                    
+                    episode_links = self.get_episode_links_from_season_page(season_url)
+                    self.inventory.record_season(season_url, episode_links,
+                                                 [self.extract_episode_number(url) for url in episode_links])
+                    extracted = self.inventory.extracted_episodes(season_url)
+                    todo = [url for url in episode_links if url not in extracted]
+                    retrying = self.retries.pending(todo)
+                    
+                    for episode_url in todo:
+                        episode_num = self.extract_episode_number(episode_url)
+                        print(f"📥 {show_name} [Episode {episode_num}] Processing...", end=" ")
+                        try:
+                            video_source = self.episode_source(episode_url)
+                        except requests.exceptions.RequestException as e:
+                            # Not recorded: the next delta crawl or the retry pass tries it again
+                            queued = self.queue_failed_episode(episode_url, season_url, e)
+                            print(f"⏳ Failed, queued for retry" if queued else f"✗ Failed")
+                            continue
+                        self.record_episode(episode_url, video_source, retrying)
+                        new_episodes += 1
+                        if video_source:
+                            recovered += 1
+                            print(f"✓ Success ({video_source['type']})")
+                        else:
+                            print(f"✗ No video source")
+                
+                self.mark_show_extracted(category_name, show_name)
+        
+        print("\n" + "=" * 100)
+        print("🎊 DELTA CRAWL SUMMARY")
+        print("=" * 100)
+        print(f"🆕 New seasons: {new_seasons}")
+        print(f"📥 Episode pages fetched: {new_episodes} ({recovered} with a video source)")
+        print(f"⏱️  Wall-clock time: {time.time() - started:.1f}s")
+        print_run_summary(self.session, self.pages)
+        
+        return self.inventory.export()
+    
+    def extract_all_categories_async(self, categories, force=False, max_concurrency=32, per_host_limit=8,
+                                     parse_workers=None):
+        """Extract all categories concurrently (same traversal and output as extract_all_categories)
+        
+        Episode pages are parsed on a process pool of parse_workers (default: one per core).
+        """
+        return asyncio.run(self._crawl_all_categories(categories, force, max_concurrency, per_host_limit, parse_workers))
+    
+    async def _crawl_all_categories(self, categories, force, max_concurrency, per_host_limit, parse_workers=None):
+        """Crawl every category with many requests in flight"""
+        fetcher = AsyncFetcher(self.session, max_concurrency, per_host_limit, pages=self.pages,
+                               parse_stage=ParseStage(parse_workers, metrics=self.session.metrics))
+        all_results = dict(self.checkpoint.get('all_results', {}))
+        started = time.time()
+        
+        print(f"⚡ Async crawl: {max_concurrency} requests in flight, {per_host_limit} per host")
+        
+        try:
+            category_results = await asyncio.gather(*[
+                self._crawl_category(fetcher, category_url, category_name, all_results, force)
+                for category_name, category_url in categories.items()
+            ])
+        finally:
+            fetcher.close()
+        
+        # Rebuild in the order the categories were given
+        for category_name, shows in zip(categories, category_results):
+            if shows:
+                all_results[category_name] = shows
+        
+        # Failed episodes whose backoff has already passed
+        self.retry_due_episodes(all_results)
+        
+        total_extracted_shows = sum(len(shows) for shows in all_results.values())
+        
+        print("\n" + "=" * 100)
+        print("🎊 GRAND FINAL SUMMARY (ASYNC)")
+        print("=" * 100)
+        print(f"📊 Total Categories Processed: {len(categories)}")
+        print(f"✅ Total Shows Extracted: {total_extracted_shows}")
+        print(f"⏱️  Wall-clock time: {time.time() - started:.1f}s")
+        for line in fetcher.stage_summary():
+            print(f"🚦 {line}")
+        print(f"💾 Check history file: {self.history_file}")
+        print(f"🧬 Fingerprints: {self.inventory.summary()}")
+        print_run_summary(self.session, self.pages)
+        
+        # Clear checkpoint on completion
+        self.clear_checkpoint()
+        
+        return all_results
+    
+    async def _crawl_category(self, fetcher, category_url, category_name, all_results, force):
+        """Crawl all shows of one category concurrently"""
+        pager = await pagination.walk_category_async(category_url, fetcher.get_text, self.parse_show_links, max_pages=100)
+        for page, e in pager.errors.items():
+            print(f"   [{category_name}] Error on page {page}: {e}")
+        
+        show_links = self.dedupe_shows(pager.shows())
+        print(f"🌐 {category_name}: {len(show_links)} shows")
+        
+        category_results = dict(all_results.get(category_name, {}))
+        pending = [show for show in show_links
+                   if force or not self.is_show_extracted(category_name, show['name'])]
+        skipped = len(show_links) - len(pending)
+        
+        async def crawl_show(show_info):
+            show_results = await self._crawl_show(fetcher, show_info['url'], show_info['name'], category_name)
+            if show_results:
+                category_results[show_info['name']] = show_results
+                all_results[category_name] = category_results
+                self.mark_show_extracted(category_name, show_info['name'])
+                self.checkpoint_show(category_name, show_info['name'], show_results, show_url=show_info['url'])
+                episodes = sum(len(eps) for eps in show_results.values())
+                print(f"✓ [{category_name}] {show_info['name']}: {len(show_results)} seasons, {episodes} episodes")
+            else:
+                print(f"✗ [{category_name}] {show_info['name']}: no seasons extracted")
+        
+        await asyncio.gather(*[crawl_show(show) for show in pending])
+        
+        print(f"📊 {category_name}: {len(pending)} shows crawled, {skipped} skipped")
+        
+        # Keep shows in the same alphabetical order as the sequential crawl
+        order = {show['name']: i for i, show in enumerate(show_links)}
+        return dict(sorted(category_results.items(), key=lambda item: order.get(item[0], len(order))))
+    
+    async def _crawl_show(self, fetcher, show_url, show_name, category_name):
+        """Crawl all seasons of a show concurrently"""
+        try:
+            html_content = await fetcher.get_text(show_url)
+        except requests.exceptions.RequestException as e:
+            print(f"❌ Error fetching show page {show_url}: {e}")
+            return {}
+        
+        season_links = self.parse_season_links(html_content)
+        if season_links:
+            self.inventory.record_show(category_name, show_name, show_url, season_links)
+        seasons = await asyncio.gather(*[self._crawl_season(fetcher, url) for url in season_links])
+        
+        return {f"Season {season_num}": results for season_num, results in enumerate(seasons, 1)}
+    
+    async def _crawl_season(self, fetcher, season_url):
+        """Crawl all episodes of a season concurrently"""
+        try:
+            html_content = await fetcher.get_text(season_url)
+        except requests.exceptions.RequestException as e:
+            print(f"❌ Error fetching season page {season_url}: {e}")
+            return []
+        
+        episode_links = self.parse_episode_links(html_content, season_url)
+        reused = self.unchanged_season(season_url, episode_links)
+        if reused is not None:
+            return reused
+        self.inventory.record_season(season_url, episode_links,
+                                     [self.extract_episode_number(url) for url in episode_links])
+        sources = await asyncio.gather(*[self._resume_episode(fetcher, season_url, url) for url in episode_links])
+        
+        results = []
+        # Queued episodes without a source failed (now or before): there is no result to record
+        retrying = self.retries.pending(episode_links)
+        for episode_url, video_source in zip(episode_links, sources):
+            if video_source or episode_url not in retrying:
+                self.record_episode(episode_url, video_source, retrying)
+            if video_source:
+                results.append({
+                    'episode': self.extract_episode_number(episode_url),
+                    'episode_url': episode_url,
+                    'video_source': video_source
+                })
+        return results
+    
+    async def _resume_episode(self, fetcher, season_url, episode_url):
+        """Result of an episode finished before an interruption, otherwise crawl and journal it"""
+        resumed = self.resumed_episodes(season_url)
+        if episode_url in resumed:
+            return resumed[episode_url]
+        try:
+            result = await self._crawl_episode(fetcher, episode_url)
+        except requests.exceptions.RequestException as e:
+            # Queued, not journaled: the retry pass or a resumed run fetches it again
+            self.queue_failed_episode(episode_url, season_url, e)
+            print(f"⏳ Failed {episode_url}, queued for retry: {str(e)[:50]}")
+            return None
+        self.checkpoint_episode(season_url, episode_url, result)
+        return result
+    
+    async def _crawl_episode(self, fetcher, episode_url):
+        """Fetch one episode page and extract its video source, raising on request errors"""
+        # Fetched on a thread, parsed on the process pool
+        return await fetcher.fetch_and_parse(episode_url, detectors.extract_video_source, self.base_url,
+                                             watch=streaming.PlayerIframeWatch)
+    
+    def retry_episode(self, episode_url):
+        """One more attempt at a queued episode page, raising on request errors
+        
+        Returns the episode's result record, or None if the page has no
+        source. Subclasses that keep other per-episode data override this.
+        """
+        video_source = self.episode_source(episode_url)
+        self.inventory.record_episode(episode_url, video_source)
+        if not video_source:
+            return None
+        return {
+            'episode': self.extract_episode_number(episode_url),
+            'episode_url': episode_url,
+            'video_source': video_source
+        }
+    
+    def retry_due_episodes(self, all_results):
+        """Retry the queued episode pages whose backoff has passed
+        
+        Each recovered episode is merged into its season's list in
+        all_results (replacing an older record of the same episode), so
+        the rest of the show is left as it is. Returns the number of
+        episodes recovered.
+        """
+        due = self.retries.due()
+        if not due:
+            return 0
+        print(f"\n🔁 Retrying {len(due)} failed episodes ({self.retries.summary()})")
+        recovered = 0
+        for entry in due:
+            print(f"📥 {entry['url']} (attempt {entry['attempts'] + 1})...", end=" ")
+            try:
+                result = self.retry_episode(entry['url'])
+            except CircuitOpenError as e:
+                # The host is still down: leave the entry as it is for a later pass
+                print(f"🔌 {e}")
+                continue
+            except requests.exceptions.RequestException as e:
+                requeued = self.retries.add(entry['url'], entry['season_url'], e)
+                print(f"✗ {str(e)[:50]}" + ("" if requeued else " (giving up)"))
+                continue
+            
+            self.retries.resolve(entry['url'])
+            if not result:
+                print("✗ No video source")
+                continue
+            place = self.inventory.season_place(entry['season_url']) if entry['season_url'] else None
+            if not place:
+                print("✓ Recovered, but its show is not in the inventory")
+                continue
+            print("✓ Success")
+            category_name, show_name, season_name = place
+            episodes = all_results.setdefault(category_name, {}).setdefault(show_name, {}).setdefault(season_name, [])
+            episodes[:] = [ep for ep in episodes if ep['episode_url'] != entry['url']] + [result]
+            episodes.sort(key=lambda ep: ep['episode'] or 0)
+            recovered += 1
+        
+        print(f"🔁 Retry queue: {self.retries.summary()}")
+        return recovered
+    
+    def process_frontier_item(self, item, priorities=None):
+        """Fetch one frontier URL and return (result, child URLs), raising on request errors
+        
+        With CrawlPriorities, each child URL is queued with its priority tier.
+        """
+        url = item['url']
+        if item['kind'] == 'category':
+            pager = pagination.walk_category(url, lambda page_url: self.pages.get(page_url).content,
+                                             self.parse_show_links, max_pages=100)
+            if pager.errors and not pager.pages():
+                raise next(iter(pager.errors.values()))
+            return None, [{'url': show['url'], 'kind': 'show', 'category': item['category'], 'name': show['name'],
+                           'priority': priorities.show(show['name']) if priorities else 0}
+                          for show in self.dedupe_shows(pager.shows())]
+        
+        if item['kind'] == 'show':
+            season_links = self.pages.parse(url, 'season_links',
+                                            lambda response: self.parse_season_links(response.content))
+            children = []
+            for season_url in season_links:
+                season_num = self.extract_season_number(season_url) or 0
+                children.append({'url': season_url, 'kind': 'season', 'category': item['category'], 'name': item['name'],
+                                 'position': season_num,
+                                 'priority': priorities.season(item['name'], season_num) if priorities else 0})
+            return None, children
+        
+        if item['kind'] == 'season':
+            episode_links = self.pages.parse(url, 'episode_links',
+                                             lambda response: self.parse_episode_links(response.content, url))
+            children = []
+            for episode_url in episode_links:
+                episode_num = self.extract_episode_number(episode_url)
+                children.append({'url': episode_url, 'kind': 'episode', 'category': item['category'], 'name': item['name'],
+                                 'position': episode_num,
+                                 'priority': priorities.episode(item['name'], item['position'], episode_num) if priorities else 0})
+            return None, children
+        
+        video_source = self.pages.scan(url, 'video_source', self.extract_video_source, streaming.PlayerIframeWatch)
+        return video_source, []
+    
+    def work_frontier(self, frontier, worker_id, batch_size=10, lease_seconds=300, idle_wait=5,
+                      priorities=None, time_limit=None):
+        """Claim, process and complete frontier batches until the frontier is empty
+        
+        Any number of processes can run this against the same frontier database.
+        With a time_limit (seconds) no new batch is claimed once it has passed,
+        so a time-boxed run ends with the highest-priority work done.
+        """
+        print(f"👷 Worker {worker_id} on {frontier.path} (batches of {batch_size}, {lease_seconds}s leases)")
+        processed = failed = parked = 0
+        started = time.time()
+        
+        while time_limit is None or time.time() - started < time_limit:
+            batch = frontier.claim(worker_id, batch_size, lease_seconds)
+            if not batch:
+                if not frontier.outstanding():
+                    break
+                # Other workers still hold leases; they may add children or expire
+                time.sleep(idle_wait)
+                continue
+            
+            for item in batch:
+                try:
+                    result, children = self.process_frontier_item(item, priorities)
+                except CircuitOpenError as e:
+                    # Held back until the breaker probes the host again
+                    frontier.park(item['url'], worker_id, max(e.retry_in, 1), e)
+                    parked += 1
+                    print(f"🔌 [{item['kind']}] {item['url']} parked for {e.retry_in:.0f}s: {e.host} is down")
+                    continue
+                except Exception as e:
+                    frontier.fail(item['url'], worker_id, e)
+                    failed += 1
+                    print(f"✗ [{item['kind']}] {item['url']} (attempt {item['attempts']}): {str(e)[:50]}")
+                    continue
+                
+                if frontier.complete(item['url'], worker_id, result, children):
+                    processed += 1
+                    if item['kind'] == 'episode':
+                        print(f"✓ [episode] {item['name']} E{item['position']}: {result['type'] if result else 'no source'}")
+                    else:
+                        print(f"✓ [{item['kind']}] {item['name'] or item['category']}: {len(children)} URLs queued")
+                else:
+                    print(f"⚠️  Lease lost on {item['url']}, result dropped")
+                frontier.renew(worker_id, lease_seconds)
+        
+        print(f"\n✅ Worker {worker_id}: {processed} URLs done, {failed} failures, {parked} parked "
+              f"in {time.time() - started:.1f}s")
+        print_run_summary(self.session, self.pages)
+        return processed
+    
     def save_to_json(self, data, filename="all_links.json"):
         """Save extracted data to JSON file"""
         try:
@@ -639,6 +1050,17 @@ class WorthCreteExtractor:
             print("No results to display.")
 
 
+def load_priorities(data_file="data/streamvault-data.json"):
+    """Frontier priorities from the StreamVault data, or None if it cannot be read"""
+    try:
+        catalog = StreamVaultCatalog(data_file)
+    except (OSError, ValueError) as e:
+        print(f"⚠️  No StreamVault data ({e}); crawling without priorities")
+        return None
+    print(f"🎯 Prioritising against {catalog.show_count} StreamVault shows")
+    return CrawlPriorities(catalog)
+
+
 def main():
     """Main execution function"""
     print("\n" + "="*100)
@@ -650,7 +1072,7 @@ def main():
     print("• HTML5 video players")
     print("• YouTube and general iframes")
     print("\nPagination: Automatically fetches all pages via ?pg=N until no more shows.")
-    print("\nCheckpoint System: Saves progress after each show and category. Resumes automatically if interrupted.")
+    print("\nCheckpoint System: Journals each finished show. Resumes automatically if interrupted.")
     print("\nEpisode Fix: Now extracts and sorts episodes by actual episode number from URL.")
     print("\nCategories:")
     print("1. English Seasons: https://www.worthcrete.com/literature/seasons/english-seasons/")
@@ -659,24 +1081,43 @@ def main():
     print("\nOptions:")
     print("1. Extract all categories (skip already extracted shows)")
     print("2. Extract all categories (FORCE re-extract everything)")
+    print("3. Extract all categories with the FAST async crawler (skip already extracted shows)")
+    print("4. Discover from XML sitemaps and extract only new or changed episodes")
+    print("5. Delta crawl (fetch index pages, extract only episodes missing from the inventory)")
+    print("6. Work through the shared crawl frontier (add workers with scripts/frontier_worker.py)")
+    print("7. Retry failed episodes whose backoff has passed (updates all_categories_links.json)")
     
-    choice = input("\nEnter your choice (1/2): ").strip()
+    choice = input("\nEnter your choice (1/2/3/4/5/6/7): ").strip()
     
-    if choice not in ['1', '2']:
-        print("❌ Invalid choice! Please run again and choose 1 or 2.")
+    if choice not in ['1', '2', '3', '4', '5', '6', '7']:
+        print("❌ Invalid choice! Please run again and choose 1, 2, 3, 4, 5, 6 or 7.")
         return
     
     force = (choice == "2")
     
     extractor = WorthCreteExtractor()
     
-    categories = {
-        "English Seasons": "https://www.worthcrete.com/literature/seasons/english-seasons/",
-        "Hindi Seasons": "https://www.worthcrete.com/literature/seasons/hindi-seasons/",
-        "Hindi Dubbed Seasons": "https://www.worthcrete.com/literature/seasons/hindi-dubbed-seasons/"
-    }
+    categories = CATEGORIES
     
-    all_results = extractor.extract_all_categories(categories, delay=2, force=force)
+    if choice == "3":
+        all_results = extractor.extract_all_categories_async(categories, force=force)
+    elif choice == "4":
+        all_results = extractor.extract_all_categories_from_sitemap(categories)
+    elif choice == "5":
+        all_results = extractor.extract_all_categories_delta(categories)
+    elif choice == "6":
+        frontier = Frontier()
+        frontier.seed(categories)
+        extractor.work_frontier(frontier, f"{socket.gethostname()}-{os.getpid()}", priorities=load_priorities())
+        print(frontier.summary())
+        all_results = frontier.export()
+    elif choice == "7":
+        all_results = extractor.load_results("all_categories_links.json")
+        if not extractor.retry_due_episodes(all_results):
+            print(f"\n🔁 Nothing recovered ({extractor.retries.summary()})")
+            return
+    else:
+        all_results = extractor.extract_all_categories(categories, force=force)
     
     if all_results:
         extractor.print_results(all_results)